@@ -1,19 +1,16 @@
-from app.core.config import settings
 from app.services.crawler import CrawlerService
-from app.services.job_store import JobStore
-from app.services.parser import HtmlToMarkdownParser
-from app.services.storage import FileSystemStorage
+from app.services.crawler_factory import build_crawler_service
+from app.services.job_manager import JobManager, job_manager
+from app.services.job_store import JobStore, job_store
 
 
 def get_job_store() -> JobStore:
-    return JobStore()
+    return job_store
+
+
+def get_job_manager() -> JobManager:
+    return job_manager
 
 
 def get_crawler_service() -> CrawlerService:
-    storage = FileSystemStorage(base_path=settings.HTML_STORAGE_PATH)
-    job_store = get_job_store()
-    md_storage = FileSystemStorage(base_path=settings.MARKDOWN_STORAGE_PATH)
-    parser = HtmlToMarkdownParser()
-    return CrawlerService(
-        storage=storage, job_store=job_store, md_storage=md_storage, parser=parser
-    )
+    return build_crawler_service()
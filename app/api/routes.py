@@ -1,20 +1,27 @@
+import asyncio
+import json
 import logging
 import os
 import uuid
+from typing import Optional
 
-import aiofiles
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from app.api.deps import get_crawler_service, get_job_store
+from app.api.deps import get_crawler_service, get_job_manager, get_job_store
 from app.core.config import settings
 from app.models.models import (
+    CancelResponse,
     LogResponse,
     StatusResponse,
     TriggerRequest,
     TriggerResponse,
 )
 from app.services.crawler import CrawlerService
-from app.services.job_store import JobStore
+from app.services.frontier import FrontierCheckpoint
+from app.services.job_manager import JobManager, QueueFullError
+from app.services.job_store import FINISHED_STATUSES, JobStore
+from app.services.log_reader import read_since, tail
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -24,19 +31,67 @@ router = APIRouter()
 async def trigger_scraper(
     request: TriggerRequest,
     req_info: Request,
-    background_tasks: BackgroundTasks,
     crawler: CrawlerService = Depends(get_crawler_service),
     job_store: JobStore = Depends(get_job_store),
+    job_manager: JobManager = Depends(get_job_manager),
 ):
     """
-    Starts scraping task and instantly returns ID of the task.
+    Queues a scraping task and instantly returns ID of the task.
+    With resume_task_id an interrupted task continues from its checkpoint.
+    Tasks run in priority order, at most MAX_RUNNING_JOBS at once.
     """
     client_host = req_info.client.host
+
+    if request.resume_task_id:
+        task_id = request.resume_task_id
+        job_data = await job_store.get_job(task_id)
+        if not job_data or not FrontierCheckpoint.exists(
+            task_id, settings.FRONTIER_STORAGE_PATH
+        ):
+            raise HTTPException(status_code=404, detail="No checkpoint for task")
+        if job_manager.is_active(task_id):
+            raise HTTPException(status_code=409, detail="Task is already queued")
+
+        logger.info(f"Resume trigger received from IP: {client_host} for {task_id}")
+        _submit(
+            job_manager,
+            task_id,
+            lambda: crawler.start(
+                job_data["url"],
+                task_id,
+                resume=True,
+                profile=request.profile,
+                profile_parse=request.profile_parse,
+            ),
+            request.priority,
+        )
+        await job_store.update_job(task_id, {"status": "queued"})
+        return TriggerResponse(task_id=task_id, status="queued")
+
+    if not request.url:
+        raise HTTPException(status_code=422, detail="url is required")
+
     logger.info(
         f"Manual trigger received from IP: {client_host} for URL: {request.url}"
     )
     task_id = str(uuid.uuid4())
+    max_depth = (
+        settings.MAX_CRAWL_DEPTH if request.max_depth is None else request.max_depth
+    )
 
+    _submit(
+        job_manager,
+        task_id,
+        lambda: crawler.start(
+            request.url,
+            task_id,
+            max_depth=max_depth,
+            max_pages=request.max_pages,
+            profile=request.profile,
+            profile_parse=request.profile_parse,
+        ),
+        request.priority,
+    )
     await job_store.create_job(
         task_id,
         {
@@ -45,13 +100,45 @@ async def trigger_scraper(
             "status": "queued",
             "processed_links": 0,
             "total_links_found": 0,
+            "max_depth": max_depth,
+            "priority": request.priority,
         },
     )
-    background_tasks.add_task(crawler.start, request.url, task_id)
 
     return TriggerResponse(task_id=task_id, status="queued")
 
 
+def _submit(job_manager: JobManager, task_id: str, factory, priority: int):
+    try:
+        job_manager.submit(task_id, factory, priority=priority)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=f"Run queue is full: {e}")
+
+
+@router.post("/scraper/cancel/{task_id}", response_model=CancelResponse)
+async def cancel_scraper(
+    task_id: str,
+    job_store: JobStore = Depends(get_job_store),
+    job_manager: JobManager = Depends(get_job_manager),
+):
+    """
+    Drops a queued task or stops a running one. Returns once the crawl's
+    workers are stopped and their tabs closed; the checkpoint is kept, so
+    the task can be resumed later.
+    """
+    job_data = await job_store.get_job(task_id)
+    if not job_data:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not await job_manager.cancel(task_id):
+        raise HTTPException(
+            status_code=409, detail=f"Task is not active ({job_data['status']})"
+        )
+
+    await job_store.update_job(task_id, {"status": "cancelled"})
+    logger.info(f"Task {task_id} cancelled", extra={"task_id": task_id})
+    return CancelResponse(task_id=task_id, status="cancelled")
+
+
 @router.get("/scraper/status/{task_id}", response_model=StatusResponse)
 async def get_scraper_status(
     task_id: str, job_store: JobStore = Depends(get_job_store)
@@ -65,8 +152,64 @@ async def get_scraper_status(
     return StatusResponse(**job_data)
 
 
+@router.get("/scraper/stream/{task_id}")
+async def stream_scraper_progress(
+    task_id: str, request: Request, job_store: JobStore = Depends(get_job_store)
+):
+    """
+    Server-Sent Events stream of task progress.
+    The first event is the full task, then only changed fields
+    (processed_links, ETA, current_url, errors, ...) until the task finishes.
+    """
+    job_data = await job_store.get_job(task_id)
+
+    if not job_data:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    queue = job_store.subscribe(task_id)
+
+    async def events():
+        try:
+            yield _sse("snapshot", job_data)
+            status = job_data.get("status")
+            while status not in FINISHED_STATUSES:
+                if await request.is_disconnected():
+                    break
+                try:
+                    delta = await asyncio.wait_for(
+                        queue.get(), timeout=settings.STREAM_KEEPALIVE_INTERVAL
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                status = delta.get("status", status)
+                yield _sse("progress", delta)
+        finally:
+            job_store.unsubscribe(task_id, queue)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.get("/scraper/logs", response_model=LogResponse)
-async def get_logs(limit: int = 50):
+async def get_logs(
+    limit: int = Query(50, ge=1, le=5000),
+    before: Optional[int] = Query(None, ge=0),
+    after: Optional[int] = Query(None, ge=0),
+    task_id: Optional[str] = None,
+    level: Optional[str] = None,
+):
+    """
+    Latest log entries, read from the end of the file.
+    Page back with before=start_offset, fetch new entries with after=end_offset.
+    """
     log_path = settings.LOG_FILE
 
     if not os.path.exists(log_path):
@@ -75,16 +218,46 @@ async def get_logs(limit: int = 50):
         )
 
     try:
-        async with aiofiles.open(
-            log_path, mode="r", encoding="utf-8", errors="ignore"
-        ) as f:
-            lines = await f.readlines()
-
-            last_lines = lines[-limit:]
+        if after is not None:
+            lines, end_offset = await asyncio.to_thread(
+                read_since, log_path, after, task_id, level, limit
+            )
+            return LogResponse(logs=lines, start_offset=after, end_offset=end_offset)
 
-            cleaned_logs = [line.strip() for line in last_lines if line.strip()]
-
-            return LogResponse(logs=cleaned_logs)
+        lines, start_offset, end_offset = await asyncio.to_thread(
+            tail, log_path, limit, before, task_id, level
+        )
+        return LogResponse(logs=lines, start_offset=start_offset, end_offset=end_offset)
 
     except Exception as e:
         return LogResponse(logs=[f"Error reading logs: {str(e)}"])
+
+
+@router.get("/scraper/logs/stream")
+async def stream_logs(
+    request: Request,
+    after: Optional[int] = Query(None, ge=0),
+    task_id: Optional[str] = None,
+    level: Optional[str] = None,
+):
+    """Server-Sent Events stream of new log entries (tail -f)"""
+    log_path = settings.LOG_FILE
+
+    async def events():
+        offset = after
+        while not await request.is_disconnected():
+            if os.path.exists(log_path):
+                if offset is None:
+                    offset = os.path.getsize(log_path)
+                lines, offset = await asyncio.to_thread(
+                    read_since, log_path, offset, task_id, level
+                )
+                if lines:
+                    yield _sse("log", {"logs": lines, "end_offset": offset})
+            await asyncio.sleep(settings.LOG_FOLLOW_INTERVAL)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
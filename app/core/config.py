@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -8,17 +10,89 @@ class Settings(BaseSettings):
 
     SCRAPE_SCHEDULE_TIME: str = "12:00"
     TIMEZONE: str = "GMT"
+    SCRAPE_PROFILE: bool = False  # Chrome trace of the scheduled crawl
+    SCRAPE_PROFILE_PARSE: bool = False  # cProfile dump of its parse step
 
     TARGET_URL: str
     MAX_CRAWL_DEPTH: int = 3
+    MAX_RUNNING_JOBS: int = 2  # crawls running at once, others wait in the queue
+    MAX_QUEUED_JOBS: int = 100  # further triggers are refused with 429
     MAX_WORKERS: int = 5
     RETRY_ATTEMPTS: int = 3
+    REQUEST_TIMEOUT: int = 30
+
+    PAGE_LOAD_TIMEOUT: float = 15.0  # hard limit for the browser readiness wait
+    PAGE_QUIET_WINDOW: float = 0.5  # no DOM mutations / requests for that long
+    PAGE_QUIET_MAX_WAIT: float = 3.0  # once loaded, stop waiting for quiet after
+    READY_SELECTORS: Dict[str, str] = {}  # host -> CSS selector marking content
+
+    HTTP_FIRST: bool = True  # try plain HTTP before rendering in the browser
+    HTTP_MAX_CONNECTIONS: int = 20
+    HTTP_MIN_CONTENT_LENGTH: int = 1024  # smaller responses go to the browser
+    HTTP_MIN_TEXT_LENGTH: int = 200  # less visible text -> page is JS-rendered
+    HTTP_TIER_PIN_MISSES: int = 3  # HTTP misses in a row before a prefix skips HTTP
+    HTTP_TIER_PIN_TTL: float = 600.0  # seconds until a pinned prefix tries HTTP again
+
+    BROWSER_HEADLESS: bool = False
+    BROWSER_POOL_SIZE: int = 2
+    BROWSER_MAX_PAGES: int = 500  # browser is recycled after rendering that many pages
+
+    PARSER_BACKEND: str = "html.parser"  # html.parser | lxml
+    PARSE_EXECUTOR: str = "process"  # process | thread | inline
+    PARSE_WORKERS: int = 0  # 0 -> number of CPU cores
+    PARSE_CONCURRENCY: int = 0  # pages parsed at once, 0 -> PARSE_WORKERS
+    PARSE_QUEUE_SIZE: int = 32  # fetched pages waiting for a parser
 
     HTML_STORAGE_PATH: str = "./storage/html"
     MARKDOWN_STORAGE_PATH: str = "./storage/markdown"
+    STORAGE_BACKEND: str = "filesystem"  # filesystem | blob
+    BLOB_STORAGE_PATH: str = "./storage/blobs"
+    ZSTD_LEVEL: int = 10  # 1 (fastest) - 22 (smallest)
+    WRITE_QUEUE_SIZE: int = 256  # files buffered before workers wait for the disk
+    WRITE_BATCH_SIZE: int = 64  # max files handed to storage per write
+    WRITE_FSYNC: bool = False  # fsync every written file
+    FRONTIER_STORAGE_PATH: str = "./storage/frontier"
+    FRONTIER_CHECKPOINT_INTERVAL: float = 5.0  # seconds between frontier commits
+    FRONTIER_STRATEGY: str = "priority"  # priority or fifo (plain BFS)
+    FRONTIER_BACKEND: str = "local"  # local | sqlite | redis | memory (shared by nodes)
+    SHARED_FRONTIER_PATH: str = "./storage/shared_frontier.sqlite"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    FRONTIER_LEASE_SECONDS: float = 300.0  # unrenewed claims return to the queue after
+    FRONTIER_CLAIM_BATCH: int = 4  # URLs a worker claims at once
+    FRONTIER_POLL_INTERVAL: float = 1.0  # idle wait while other nodes hold URLs
+    URL_PATTERN_WEIGHTS: Dict[str, float] = {}  # regex -> depth levels to jump
+    MAX_PAGES: int = 0  # page budget per task, 0 = unlimited
+    DEDUP_CONTENT: bool = True  # skip writing exact / near duplicate pages
+    DEDUP_SIMHASH_DISTANCE: int = 3  # max differing SimHash bits, 0 = exact only
+    DEDUP_SKIP_LINKS: bool = False  # don't follow links found on duplicates
+    SEEN_MEMORY_LIMIT: int = 0  # URL fingerprints kept in RAM, 0 = no disk spill
+    SEEN_SPILL_PATH: str = "./storage/seen"
+    SEEN_BLOOM_CAPACITY: int = 1_000_000
+    SITEMAP_SEEDING: bool = False  # seed the frontier from robots.txt / sitemap.xml
+    SITEMAP_MAX_URLS: int = 50000
+
+    INCREMENTAL_CRAWL: bool = True  # skip pages unchanged since the last crawl
+    MANIFEST_PATH: str = "./storage/manifest.sqlite"
+
+    HOST_MAX_CONCURRENCY: int = 4  # upper bound of the adaptive per-host limit
+    HOST_RATE_LIMIT: float = 2.0  # requests per second per host
+    HOST_BURST: int = 2
+    RESPECT_ROBOTS_TXT: bool = True
+    ROBOTS_USER_AGENT: str = "*"
+    ROBOTS_CACHE_TTL: float = 86400.0  # seconds a host's robots.txt is trusted
+    BACKOFF_BASE: float = 1.0  # seconds, doubled per consecutive failure
+    BACKOFF_MAX: float = 60.0
+
+    JOB_FLUSH_INTERVAL: float = 1.0  # seconds between task progress writes
+    STREAM_KEEPALIVE_INTERVAL: float = 15.0  # idle seconds before an SSE ping
 
     LOG_LEVEL: str = "INFO"
     LOG_FILE: str = "./logs/scraper.log"
+    LOG_FORMAT: str = "text"  # text or json (one JSON object per line)
+    LOG_SAMPLING: Dict[str, float] = {}  # logger prefix -> share of INFO/DEBUG kept
+    LOG_FOLLOW_INTERVAL: float = 0.5  # seconds between checks in the log stream
+
+    METRICS_RETAIN_TASKS: int = 20  # finished tasks whose series stay on /metrics
 
     model_config = SettingsConfigDict(
         env_file=".env", env_ignore_empty=True, extra="ignore"
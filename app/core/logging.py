@@ -1,25 +1,130 @@
+import atexit
+import copy
+import json
 import logging
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Dict, Optional
 
 from app.core.config import settings
 
+# Passed by the crawler through `extra=` and kept as JSON fields
+EXTRA_FIELDS = (
+    "task_id",
+    "url",
+    "depth",
+    "fetch_time",
+    "parse_time",
+    "write_time",
+    "total_time",
+)
+
+# task_id is "-" on records not tied to a task
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(task_id)s - %(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            # Formatted by TracebackQueueHandler before the record was queued
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def text_formatter() -> logging.Formatter:
+    return logging.Formatter(TEXT_FORMAT, defaults={"task_id": "-"})
+
+
+class TracebackQueueHandler(QueueHandler):
+    """
+    QueueHandler.prepare folds the traceback into the message and drops
+    exc_info. This keeps the message as is and the traceback in exc_text,
+    so the formatters on the listener side render both their own way.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a share of the records below WARNING for the given logger
+    prefixes, e.g. {"app.services.crawler": 0.1} keeps every 10th.
+    Warnings and errors always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix wins
+        self.rates = sorted(rates.items(), key=lambda item: -len(item[0]))
+        self._counters: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+
+        for prefix, rate in self.rates:
+            if record.name == prefix or record.name.startswith(prefix + "."):
+                if rate >= 1:
+                    return True
+                if rate <= 0:
+                    return False
+                count = self._counters.get(prefix, 0)
+                self._counters[prefix] = count + 1
+                return count % round(1 / rate) == 0
+        return True
+
 
 def setup_logging():
+    """
+    Root logger only puts records on a queue, a listener thread formats
+    them and does the console and file I/O off the event loop.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
     log_path = Path(settings.LOG_FILE)
     log_path.parent.mkdir(parents=True, exist_ok=True)
 
-    log_format = logging.Formatter(
-        "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-    )
+    if settings.LOG_FORMAT == "json":
+        log_format = JsonFormatter()
+    else:
+        log_format = text_formatter()
 
     logger = logging.getLogger()
     logger.setLevel(settings.LOG_LEVEL)
 
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(log_format)
-    logger.addHandler(console_handler)
 
     file_handler = RotatingFileHandler(
         settings.LOG_FILE,
@@ -28,6 +133,25 @@ def setup_logging():
         encoding="utf-8",
     )
     file_handler.setFormatter(log_format)
-    logger.addHandler(file_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = TracebackQueueHandler(log_queue)
+    if settings.LOG_SAMPLING:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(
+        log_queue, console_handler, file_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(shutdown_logging)
 
     logging.info("Logging setup complete.")
+
+
+def shutdown_logging():
+    """Drains the queue and stops the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
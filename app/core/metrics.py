@@ -0,0 +1,128 @@
+from collections import deque
+from typing import Deque, List, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_client.metrics import MetricWrapperBase
+
+from app.core.config import settings
+
+# Seconds, from a cached HTTP hit to a slow rendered page
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+FETCH_TIERS = ("http", "browser")
+PARSE_PHASES = ("soup", "markdown")
+QUEUES = ("frontier_queue", "parse_queue", "write_queue")
+STAGES = ("fetching", "parsing")
+
+FETCH_SECONDS = Histogram(
+    "scraper_fetch_seconds",
+    "Time to fetch a page, by tier",
+    ["task", "tier"],
+    buckets=TIME_BUCKETS,
+)
+PAGE_LOAD_WAIT_SECONDS = Histogram(
+    "scraper_page_load_wait_seconds",
+    "Time spent waiting for a browser tab to be ready",
+    ["task"],
+    buckets=TIME_BUCKETS,
+)
+PARSE_SECONDS = Histogram(
+    "scraper_parse_seconds",
+    "Parse time by phase: soup (DOM, metadata, links, cleanup) or markdown",
+    ["task", "phase"],
+    buckets=TIME_BUCKETS,
+)
+STORAGE_WRITE_SECONDS = Histogram(
+    "scraper_storage_write_seconds",
+    "Time to write one batch of page outputs",
+    ["task"],
+    buckets=TIME_BUCKETS,
+)
+JOB_STORE_UPDATE_SECONDS = Histogram(
+    "scraper_job_store_update_seconds",
+    "Time of a task progress update, flushes included, across all tasks",
+    buckets=TIME_BUCKETS,
+)
+RETRIES = Counter("scraper_retries", "Fetch retries", ["task"])
+BLOCKED_PAGES = Counter(
+    "scraper_blocked_pages", "Pages that showed a block or challenge page", ["task"]
+)
+DUPLICATE_PAGES = Counter(
+    "scraper_duplicate_pages", "Pages not written as duplicates", ["task"]
+)
+QUEUE_DEPTH = Gauge(
+    "scraper_queue_depth", "Items waiting in a pipeline queue", ["task", "queue"]
+)
+OPEN_TABS = Gauge("scraper_open_tabs", "Browser tabs open", ["task"])
+ACTIVE_WORKERS = Gauge(
+    "scraper_active_workers", "Workers busy in a pipeline stage", ["task", "stage"]
+)
+
+Series = Tuple[MetricWrapperBase, Tuple[str, ...]]
+
+# Finished tasks whose series are still exported, oldest first
+_finished: Deque["TaskMetrics"] = deque()
+
+
+class TaskMetrics:
+    """
+    Metric children of one crawl task.
+    Labels are resolved once per task, so the hot path only observes or
+    increments. Gauges are read from the crawler on each scrape and dropped
+    when the task ends; the other series stay for the last
+    METRICS_RETAIN_TASKS finished tasks.
+    """
+
+    def __init__(self, task_id: str):
+        self.task_id = task_id
+        for finished in list(_finished):
+            if finished.task_id == task_id:
+                # Resumed task: its series continue
+                _finished.remove(finished)
+
+        self._series: List[Series] = []
+        self._gauges: List[Series] = []
+        self.fetch = {tier: self._child(FETCH_SECONDS, tier) for tier in FETCH_TIERS}
+        self.page_load_wait = self._child(PAGE_LOAD_WAIT_SECONDS)
+        self.parse = {
+            phase: self._child(PARSE_SECONDS, phase) for phase in PARSE_PHASES
+        }
+        self.storage_write = self._child(STORAGE_WRITE_SECONDS)
+        self.retries = self._child(RETRIES)
+        self.blocked_pages = self._child(BLOCKED_PAGES)
+        self.duplicate_pages = self._child(DUPLICATE_PAGES)
+
+    def _child(self, metric: MetricWrapperBase, *labels: str):
+        labelvalues = (self.task_id, *labels)
+        self._series.append((metric, labelvalues))
+        return metric.labels(*labelvalues)
+
+    def track(self, crawler):
+        """Exports the crawler's queue depths, busy workers and open tabs"""
+        for name in QUEUES:
+            self._gauge(QUEUE_DEPTH, name, lambda n=name: crawler.pipeline_stats()[n])
+        for name in STAGES:
+            self._gauge(
+                ACTIVE_WORKERS, name, lambda n=name: crawler.pipeline_stats()[n]
+            )
+        self._gauge(OPEN_TABS, None, lambda: crawler.open_tabs)
+
+    def _gauge(self, metric: Gauge, label, read):
+        labelvalues = (self.task_id,) if label is None else (self.task_id, label)
+        self._gauges.append((metric, labelvalues))
+        metric.labels(*labelvalues).set_function(read)
+
+    def release(self):
+        """Called when the task ends"""
+        _remove(self._gauges)
+        self._gauges = []
+        _finished.append(self)
+        while len(_finished) > settings.METRICS_RETAIN_TASKS:
+            _remove(_finished.popleft()._series)
+
+
+def _remove(series: List[Series]):
+    for metric, labelvalues in series:
+        try:
+            metric.remove(*labelvalues)
+        except KeyError:
+            pass
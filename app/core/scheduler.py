@@ -6,10 +6,9 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 
 from app.core.config import settings
-from app.services.crawler import CrawlerService
-from app.services.job_store import JobStore
-from app.services.parser import HtmlToMarkdownParser
-from app.services.storage import FileSystemStorage
+from app.services.crawler_factory import build_crawler_service
+from app.services.job_manager import QueueFullError, job_manager
+from app.services.job_store import job_store
 
 logger = logging.getLogger(__name__)
 
@@ -21,14 +20,7 @@ async def run_scheduled_scrape():
 
     task_id = f"auto_{uuid.uuid4()}"
 
-    html_storage = FileSystemStorage(settings.HTML_STORAGE_PATH)
-    md_storage = FileSystemStorage(settings.MARKDOWN_STORAGE_PATH)
-    job_store = JobStore()
-    parser = HtmlToMarkdownParser()
-
-    crawler = CrawlerService(
-        storage=html_storage, md_storage=md_storage, job_store=job_store, parser=parser
-    )
+    crawler = build_crawler_service()
 
     max_depth = settings.MAX_CRAWL_DEPTH
     target_url = settings.TARGET_URL
@@ -53,10 +45,20 @@ async def run_scheduled_scrape():
     )
 
     try:
-        await crawler.start(start_url=target_url, task_id=task_id, max_depth=max_depth)
-        logger.info(f"Scheduled job {task_id} finished successfully.")
-    except Exception as e:
-        logger.error(f"Scheduled job {task_id} failed: {e}")
+        job_manager.submit(
+            task_id,
+            lambda: crawler.start(
+                start_url=target_url,
+                task_id=task_id,
+                max_depth=max_depth,
+                profile=settings.SCRAPE_PROFILE,
+                profile_parse=settings.SCRAPE_PROFILE_PARSE,
+            ),
+        )
+        logger.info(f"Scheduled job {task_id} queued.")
+    except QueueFullError as e:
+        logger.error(f"Scheduled job {task_id} refused: {e}")
+        await job_store.update_job(task_id, {"status": "failed", "error": str(e)})
 
 
 def setup_scheduler():
@@ -3,10 +3,19 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from app.api.metrics import router as metrics_router
 from app.api.routes import router as api_router
 from app.core.config import settings
 from app.core.logging import setup_logging
 from app.core.scheduler import setup_scheduler, shutdown_scheduler
+from app.services.browser_pool import browser_pool
+from app.services.fetcher import http_fetcher
+from app.services.job_manager import job_manager
+from app.services.job_store import job_store
+from app.services.manifest import crawl_manifest
+from app.services.parse_executor import parse_executor
+from app.services.shared_frontier import close_shared_frontiers
+from app.services.storage import close_storages
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -15,9 +24,18 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Application starting up..")
+    browser_pool.open()
     setup_scheduler()
     yield
     shutdown_scheduler()
+    await job_manager.close()
+    await browser_pool.close()
+    await http_fetcher.close()
+    await crawl_manifest.close()
+    await job_store.close()
+    await close_shared_frontiers()
+    close_storages()
+    parse_executor.shutdown()
     logger.info("Application shutting down..")
 
 
@@ -29,3 +47,4 @@ app = FastAPI(
 
 
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(metrics_router)
@@ -1,10 +1,16 @@
-from typing import Optional
+from typing import Dict, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class TriggerRequest(BaseModel):
-    url: str
+    url: Optional[str] = None
+    resume_task_id: Optional[str] = None
+    max_pages: Optional[int] = Field(None, ge=0)
+    max_depth: Optional[int] = Field(None, ge=0)
+    priority: int = 0  # higher runs first when tasks are queued
+    profile: bool = False  # Chrome trace of the crawl next to the task file
+    profile_parse: bool = False  # cProfile dump of the parse step
 
 
 class TriggerResponse(BaseModel):
@@ -12,6 +18,11 @@ class TriggerResponse(BaseModel):
     status: str
 
 
+class CancelResponse(BaseModel):
+    task_id: str
+    status: str
+
+
 class StatusRequest(BaseModel):
     task_id: str
 
@@ -26,8 +37,22 @@ class StatusResponse(BaseModel):
     updated_at: Optional[str] = None
     completed_at: Optional[str] = None
     estimated_time_remaining: Optional[str] = None
+    avg_parse_time: Optional[float] = None
+    changed_pages: Optional[int] = None
+    unchanged_pages: Optional[int] = None
+    removed_pages: Optional[int] = None
+    budget_exhausted: Optional[bool] = None
+    duplicate_pages: Optional[int] = None
+    duplicates: Optional[Dict[str, str]] = None
+    failed_writes: Optional[int] = None
+    node_id: Optional[str] = None
+    pipeline: Optional[Dict[str, int]] = None
+    trace_file: Optional[str] = None
+    profile_file: Optional[str] = None
     error: Optional[str] = None
 
 
 class LogResponse(BaseModel):
     logs: list[str]
+    start_offset: Optional[int] = None
+    end_offset: Optional[int] = None
@@ -1,6 +1,6 @@
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +13,26 @@ class BaseStorageBackend(ABC):
         """Save content to storage"""
         pass
 
+    async def save_many(self, items: List[Tuple[str, str]], fsync: bool = False):
+        """Save several (filename, content) pairs, backends may batch them"""
+        for filename, content in items:
+            await self.save(filename, content)
+
     @abstractmethod
     async def retrieve(self, key: str) -> Optional[str]:
         """Retrieve content by key"""
         pass
 
+    async def exists(self, key: str) -> bool:
+        """Whether content is stored under key, backends may check cheaper"""
+        return await self.retrieve(key) is not None
+
+    @staticmethod
+    @abstractmethod
+    def generate_filename(url: str, extension: str = ".html") -> str:
+        """Storage key of the page at url"""
+        pass
+
 
 class BaseParserService(ABC):
     """Interface for parsing (HTML -> Markdown)"""
@@ -26,6 +41,16 @@ class BaseParserService(ABC):
     async def parse(self, html: str) -> Dict[str, Any]:
         pass
 
+    @abstractmethod
+    def parse_sync(
+        self, html: str, timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Blocking parse pipeline, safe to run in a worker thread or process.
+        Fills timings, when given, with seconds per parse phase.
+        """
+        pass
+
     @abstractmethod
     async def clean(self, data: Dict[str, Any]) -> Dict[str, Any]:
         pass
@@ -0,0 +1,201 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import List, Optional, Set, Tuple
+
+import zstandard
+
+from app.core.config import settings
+from app.services.base import BaseStorageBackend
+
+logger = logging.getLogger(__name__)
+
+
+class BlobStorage(BaseStorageBackend):
+    """
+    Content-addressed store of zstd-compressed blobs.
+    Each distinct content is written once, named by its SHA-256, under
+    two levels of sharded directories (objects/ab/cd/<digest>.zst), so no
+    directory grows past a few thousand files. An SQLite index maps keys
+    (one per URL and kind, see generate_filename) to their current blob.
+    Blobs are written to a temp file and renamed, and indexed only after
+    that, so the index never points at a partial blob. A blob no key
+    points at anymore is deleted when its last key is overwritten.
+    """
+
+    def __init__(self, base_path: Optional[str] = None, level: Optional[int] = None):
+        self.base_path = base_path or settings.BLOB_STORAGE_PATH
+        self.level = settings.ZSTD_LEVEL if level is None else level
+        self.objects_path = os.path.join(self.base_path, "objects")
+        os.makedirs(self.objects_path, exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Digests written but not indexed yet, never collected
+        self._unindexed: Counter = Counter()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                os.path.join(self.base_path, "index.sqlite"), check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS keys ("
+                "key TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER, "
+                "stored_size INTEGER, updated_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS keys_digest ON keys (digest)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.objects_path, digest[:2], digest[2:4], f"{digest}.zst")
+
+    @staticmethod
+    def generate_filename(url: str, extension: str = ".html") -> str:
+        """Index key of the page: the kind of content and the full URL"""
+        return f"{extension.lstrip('.')}:{url}"
+
+    async def save(self, filename: str, content: str) -> None:
+        await asyncio.to_thread(self._save, [(filename, content)], False)
+
+    async def save_many(self, items: List[Tuple[str, str]], fsync: bool = False):
+        """Writes the blobs and indexes them all in one transaction"""
+        await asyncio.to_thread(self._save, items, fsync)
+
+    def _save(self, items: List[Tuple[str, str]], fsync: bool):
+        now = time.time()
+        rows = []
+        written: List[str] = []
+        try:
+            for key, content in items:
+                data = content.encode("utf-8")
+                digest = hashlib.sha256(data).hexdigest()
+                with self._lock:
+                    # Registered before the blob is looked for, so an
+                    # overwrite elsewhere can't collect it before it's indexed
+                    self._unindexed[digest] += 1
+                written.append(digest)
+                stored_size = self._write_blob(digest, data, fsync)
+                rows.append((key, digest, len(data), stored_size, now))
+
+            with self._lock:
+                with self.conn:
+                    # Old blobs of the keys, and new ones a later item of
+                    # the batch overwrote again
+                    candidates = {digest for _, digest, *_ in rows}
+                    for key, *_ in rows:
+                        row = self.conn.execute(
+                            "SELECT digest FROM keys WHERE key = ?", (key,)
+                        ).fetchone()
+                        if row is not None:
+                            candidates.add(row[0])
+                    self.conn.executemany(
+                        "INSERT INTO keys (key, digest, size, stored_size, "
+                        "updated_at) VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) "
+                        "DO UPDATE SET digest = excluded.digest, "
+                        "size = excluded.size, stored_size = excluded.stored_size, "
+                        "updated_at = excluded.updated_at",
+                        rows,
+                    )
+                self._release(written)
+                written = []
+                self._collect(candidates)
+        finally:
+            if written:
+                with self._lock:
+                    self._release(written)
+
+    def _release(self, digests: List[str]):
+        for digest in digests:
+            self._unindexed[digest] -= 1
+            if not self._unindexed[digest]:
+                del self._unindexed[digest]
+
+    def _collect(self, digests: Set[str]):
+        """Deletes the blobs no key points at anymore, under the lock"""
+        for digest in digests:
+            if self._unindexed[digest]:
+                continue
+            referenced = self.conn.execute(
+                "SELECT 1 FROM keys WHERE digest = ? LIMIT 1", (digest,)
+            ).fetchone()
+            if referenced is None:
+                try:
+                    os.remove(self._blob_path(digest))
+                except FileNotFoundError:
+                    pass
+
+    def _write_blob(self, digest: str, data: bytes, fsync: bool) -> int:
+        """Writes the blob unless it exists, returns its stored size"""
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            return os.path.getsize(path)
+
+        compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return len(compressed)
+
+    async def retrieve(self, key: str) -> Optional[str]:
+        return await asyncio.to_thread(self._retrieve, key)
+
+    def _retrieve(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest FROM keys WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        try:
+            with open(self._blob_path(row[0]), "rb") as f:
+                data = zstandard.ZstdDecompressor().decompress(f.read())
+        except FileNotFoundError:
+            logger.warning(f"Blob {row[0]} of {key} is missing")
+            return None
+        return data.decode("utf-8")
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._exists, key)
+
+    def _exists(self, key: str) -> bool:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest FROM keys WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and os.path.exists(self._blob_path(row[0]))
+
+    def stats(self) -> dict:
+        """Number of keys and blobs, raw and stored bytes of the blobs"""
+        with self._lock:
+            keys = self.conn.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+            blobs, size, stored_size = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) "
+                "FROM (SELECT DISTINCT digest, size, stored_size FROM keys)"
+            ).fetchone()
+        return {
+            "keys": keys,
+            "blobs": blobs,
+            "size": size,
+            "stored_size": stored_size,
+        }
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+
+import nodriver as uc
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserLease:
+    """
+    Browser handed out by BrowserPool to a single crawl.
+    Every rendered page is opened through tab(), which counts it. Once the
+    browser has served max_pages the next tab goes to a fresh browser and
+    the old one is stopped as soon as its last open tab is closed.
+    """
+
+    def __init__(self, pool: "BrowserPool", browser):
+        self.pool = pool
+        self.browser = browser
+        self.pages = 0
+        self._open_tabs: Dict[int, int] = {}
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def tab(self, url: str):
+        async with self._lock:
+            if self.pages >= self.pool.max_pages:
+                await self._replace()
+            browser = self.browser
+            self.pages += 1
+        key = id(browser)
+        self._open_tabs[key] = self._open_tabs.get(key, 0) + 1
+        try:
+            yield await browser.get(url, new_tab=True)
+        finally:
+            self._open_tabs[key] -= 1
+            if not self._open_tabs[key]:
+                del self._open_tabs[key]
+                if browser is not self.browser:
+                    self.pool._stop(browser)
+
+    async def _replace(self):
+        logger.info(f"Recycling browser after {self.pages} pages")
+        old = self.browser
+        self.browser = await self.pool._launch()
+        self.pages = 0
+        if id(old) not in self._open_tabs:
+            self.pool._stop(old)
+
+
+class BrowserPool:
+    """
+    Process-wide pool of Chrome instances shared between crawls.
+    At most `size` browsers exist at once, further leases wait for a free one.
+    Browsers are health-checked before reuse and recycled after `max_pages`
+    rendered pages, mid-crawl if a lease reaches the limit.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        headless: Optional[bool] = None,
+        max_pages: Optional[int] = None,
+    ):
+        self.size = size or settings.BROWSER_POOL_SIZE
+        self.headless = settings.BROWSER_HEADLESS if headless is None else headless
+        self.max_pages = max_pages or settings.BROWSER_MAX_PAGES
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._idle: List[BrowserLease] = []
+        self._closed = False
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[BrowserLease]:
+        if self._closed:
+            raise RuntimeError("Browser pool is closed")
+
+        async with self._semaphore:
+            lease = await self._acquire()
+            try:
+                yield lease
+            finally:
+                await self._release(lease)
+
+    async def _acquire(self) -> BrowserLease:
+        while self._idle:
+            lease = self._idle.pop()
+            if await self._is_healthy(lease):
+                return lease
+            logger.warning("Pooled browser failed health check, replacing it")
+            self._stop(lease.browser)
+
+        return BrowserLease(self, await self._launch())
+
+    async def _launch(self):
+        logger.info(f"Launching pooled browser (headless={self.headless})")
+        return await uc.start(headless=self.headless)
+
+    async def _release(self, lease: BrowserLease):
+        if self._closed or lease.browser.stopped:
+            self._stop(lease.browser)
+        elif lease.pages >= self.max_pages:
+            logger.info(f"Recycling browser after {lease.pages} pages")
+            self._stop(lease.browser)
+        else:
+            self._idle.append(lease)
+
+    async def _is_healthy(self, lease: BrowserLease) -> bool:
+        if lease.browser.stopped or lease.pages >= self.max_pages:
+            return False
+        try:
+            await asyncio.wait_for(
+                lease.browser.send(uc.cdp.browser.get_version()), timeout=5
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Browser health check failed: {e}")
+            return False
+
+    @staticmethod
+    def _stop(browser):
+        try:
+            browser.stop()
+        except Exception as e:
+            logger.exception(f"Failed stopping browser: {e}")
+
+    def open(self):
+        self._closed = False
+
+    async def close(self):
+        """Stops idle browsers, leased ones are stopped when released"""
+        self._closed = True
+        while self._idle:
+            self._stop(self._idle.pop().browser)
+
+
+browser_pool = BrowserPool()
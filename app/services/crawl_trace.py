@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_NOOP = nullcontext()
+
+
+class _RawStats:
+    """cProfile stats dict returned by a parse worker, loadable by pstats"""
+
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self):
+        pass
+
+
+class CrawlTrace:
+    """
+    Opt-in timeline of a crawl, written as Chrome trace JSON (open it in
+    chrome://tracing or ui.perfetto.dev).
+    Every span is a complete event on the lane of the worker that ran it
+    (fetch-N, parse-N, writer) with the page URL in its args, so the wall
+    time of each page can be attributed to its stages.
+    With profile_path set the parse step also runs under cProfile in the
+    parse pool; the stats of all pages are merged into one pstats file.
+    Without a path tracing is off and spans cost a no-op context manager.
+    """
+
+    def __init__(self, path: Optional[str] = None, profile_path: Optional[str] = None):
+        self.path = path
+        self.profile_path = profile_path
+        self.events: List[Dict[str, Any]] = []
+        self.profile: Optional[pstats.Stats] = None
+        self._lanes: Dict[int, int] = {}
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    @property
+    def profile_parse(self) -> bool:
+        return self.profile_path is not None
+
+    def _lane(self) -> int:
+        task = asyncio.current_task()
+        key = id(task)
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = len(self._lanes) + 1
+            self.events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": lane,
+                    "args": {"name": task.get_name() if task else "main"},
+                }
+            )
+        return lane
+
+    def add(self, name: str, url: Optional[str], started: float, **args):
+        """Records a span from started (perf_counter) until now"""
+        if not self.enabled:
+            return
+        if url is not None:
+            args["url"] = url
+        self.events.append(
+            {
+                "name": name,
+                "cat": "crawl",
+                "ph": "X",
+                "ts": round((started - self._origin) * 1e6, 1),
+                "dur": round((time.perf_counter() - started) * 1e6, 1),
+                "pid": self._pid,
+                "tid": self._lane(),
+                "args": args,
+            }
+        )
+
+    def span(self, name: str, url: Optional[str] = None, **args):
+        if not self.enabled:
+            return _NOOP
+        return self._span(name, url, args)
+
+    @contextmanager
+    def _span(self, name: str, url: Optional[str], args: Dict[str, Any]):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, url, started, **args)
+
+    def add_profile(self, stats: dict):
+        """Merges the cProfile stats of one parse"""
+        if self.profile is None:
+            self.profile = pstats.Stats(_RawStats(stats))
+        else:
+            self.profile.add(_RawStats(stats))
+
+    async def write(self) -> Dict[str, str]:
+        """Writes the trace and the parse profile, returns their paths"""
+        return await asyncio.to_thread(self._write)
+
+    def _write(self) -> Dict[str, str]:
+        files = {}
+        if self.enabled:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+            files["trace_file"] = self.path
+        if self.profile_parse and self.profile is not None:
+            self.profile.dump_stats(self.profile_path)
+            files["profile_file"] = self.profile_path
+        return files
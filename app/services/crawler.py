@@ -1,32 +1,122 @@
 import asyncio
 import logging
+import os
+import socket
 import time
+import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from urllib.parse import urlparse, urljoin
+from functools import partial
+from typing import Any, Dict, List, Optional, Set
+from urllib.parse import urlparse
 
 import nodriver as uc
 
 from app.core.config import settings
+from app.core.metrics import TaskMetrics
 from app.services.base import BaseParserService, BaseStorageBackend
+from app.services.browser_pool import BrowserLease, BrowserPool
+from app.services.crawl_trace import CrawlTrace
+from app.services.dedup import DuplicateIndex
+from app.services.fetcher import FetchedPage, HttpFetcher, ThrottledError
+from app.services.frontier import FrontierCheckpoint
+from app.services.frontier_queue import CrawlStrategy, FrontierQueue
 from app.services.job_store import JobStore
-from app.services.storage import FileSystemStorage
+from app.services.manifest import CrawlManifest, content_hash
+from app.services.page_ready import READY, looks_blocked, wait_until_ready
+from app.services.page_writer import PageWriter
+from app.services.parse_executor import ParseExecutor
+from app.services.politeness import (
+    BLOCKED,
+    ERROR,
+    OK,
+    THROTTLED,
+    PolitenessScheduler,
+)
+from app.services.seen_urls import SeenUrls
+from app.services.shared_frontier import SharedFrontier
+from app.services.sitemap import SitemapSeeder, parse_lastmod
+from app.services.urls import canonicalize_url, normalize_url
 
 logger = logging.getLogger(__name__)
 
+# Progress counters summed over all nodes of a distributed crawl
+PROGRESS_COUNTERS = (
+    "processed_links",
+    "parsed_pages",
+    "changed_pages",
+    "unchanged_pages",
+    "duplicate_pages",
+)
+
+
+def _after_all(count: int, callback):
+    """Writer callback that runs callback once it was called count times"""
+    remaining = [count]
+
+    def on_written():
+        remaining[0] -= 1
+        if remaining[0] == 0:
+            callback()
+
+    return on_written
+
 
 class CrawlerService:
     def __init__(
         self,
-        storage: FileSystemStorage,
+        storage: BaseStorageBackend,
         job_store: JobStore,
         parser: BaseParserService,
         md_storage: BaseStorageBackend,
+        parse_executor: Optional[ParseExecutor] = None,
+        browser_pool: Optional[BrowserPool] = None,
+        fetcher: Optional[HttpFetcher] = None,
+        checkpoint_dir: Optional[str] = None,
+        manifest: Optional[CrawlManifest] = None,
+        politeness: Optional[PolitenessScheduler] = None,
+        strategy: Optional[CrawlStrategy] = None,
+        seeder: Optional[SitemapSeeder] = None,
+        duplicate_distance: Optional[int] = None,
+        shared_frontier: Optional[SharedFrontier] = None,
     ):
         self.storage = storage
         self.job_store = job_store
         self.md_storage = md_storage
         self.parser = parser
-        self.visited_urls = set()
+        self.parse_executor = parse_executor or ParseExecutor(mode="inline")
+        self.browser_pool = browser_pool
+        self.fetcher = fetcher
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint: Optional[FrontierCheckpoint] = None
+        self.manifest = manifest
+        self.politeness = politeness
+        self.seeder = seeder
+        self.sitemap_lastmod: Dict[str, str] = {}
+        self.duplicate_distance = duplicate_distance
+        self.duplicates: Optional[DuplicateIndex] = None
+        self.duplicate_map: Dict[str, str] = {}
+        self.visited_urls = SeenUrls()
+        self.writer = PageWriter()
+        self.parse_queue: asyncio.Queue = asyncio.Queue(settings.PARSE_QUEUE_SIZE)
+        self.parse_concurrency = (
+            settings.PARSE_CONCURRENCY or self.parse_executor.max_workers
+        )
+        self._fetch_tasks: List[asyncio.Task] = []
+        self._parse_tasks: List[asyncio.Task] = []
+        self.fetching = 0
+        self.parsing = 0
+        self.open_tabs = 0
+        self.metrics: Optional[TaskMetrics] = None
+        self.trace = CrawlTrace()
+        self.shared_frontier = shared_frontier
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_seconds = settings.FRONTIER_LEASE_SECONDS
+        self.claim_batch = settings.FRONTIER_CLAIM_BATCH
+        self.poll_interval = settings.FRONTIER_POLL_INTERVAL
+        # Claimed from the shared frontier and not completed yet
+        self._leased: Set[str] = set()
+        self._reported: Dict[str, int] = {}
         self.block_indicators = [
             "Enable JavaScript",
             "Access denied",
@@ -38,71 +128,387 @@ class CrawlerService:
         self.MAX_WORKERS = settings.MAX_WORKERS
         self.MAX_DEPTH = settings.MAX_CRAWL_DEPTH
         self.MAX_RETRIES = 3
+        self.page_budget = 0
+        self.skip_duplicate_links = settings.DEDUP_SKIP_LINKS
 
         self.processed_links = 0
+        self.dispatched_pages = 0
+        self.parsed_pages = 0
+        self.changed_pages = 0
+        self.unchanged_pages = 0
+        self.duplicate_pages = 0
+        self.failed_pages = 0
+        self.total_parse_time = 0.0
         self.start_time = None
         self.browser = None
+        self.browser_lease: Optional[BrowserLease] = None
         self.base_domain = ""
-        self.queue = asyncio.Queue()
+        # Manifest scope: pages this crawl may prune
+        self.crawl_scope = ""
+        self.task_id = ""
+        self.queue = FrontierQueue(strategy)
 
-    async def start(self, start_url: str, task_id: str, max_depth: int = 2):
+    async def start(
+        self,
+        start_url: str,
+        task_id: str,
+        max_depth: int = 2,
+        resume: bool = False,
+        max_pages: Optional[int] = None,
+        profile: bool = False,
+        profile_parse: bool = False,
+    ):
         """
         Crawler start.
         Crawler will download all HTML files depended on max depth.
+        With resume=True the crawl continues from the task's frontier checkpoint.
+        max_pages caps the pages fetched by the task (0 = no limit).
+        With a shared frontier the crawler joins the task as one of its
+        nodes; the shared frontier replaces the checkpoint.
+        profile writes a Chrome trace of every page's stages next to the
+        task file, profile_parse a cProfile dump of the parse step.
         """
-        logger.info(f"=== Starting crawling: {task_id} | Max Depth: {max_depth} ===")
+        if max_pages is None:
+            max_pages = settings.MAX_PAGES
+
+        if self.checkpoint_dir is not None and self.shared_frontier is None:
+            self.checkpoint = FrontierCheckpoint(task_id, self.checkpoint_dir)
+            if resume:
+                start_url = self.checkpoint.get_meta("start_url") or start_url
+                max_depth = int(self.checkpoint.get_meta("max_depth") or max_depth)
+                max_pages = int(self.checkpoint.get_meta("max_pages") or max_pages)
+            else:
+                self.checkpoint.set_meta(
+                    {
+                        "start_url": start_url,
+                        "max_depth": max_depth,
+                        "max_pages": max_pages,
+                    }
+                )
+
+        logger.info(
+            f"=== Starting crawling: {task_id} | Max Depth: {max_depth} ===",
+            extra={"task_id": task_id, "url": start_url},
+        )
+
+        self.visited_urls = SeenUrls.for_task(task_id)
+        self.sitemap_lastmod = {}
+        self.duplicates = (
+            DuplicateIndex(self.duplicate_distance)
+            if self.duplicate_distance is not None
+            else None
+        )
+        self.duplicate_map = {}
+        self.duplicate_pages = 0
+        self.failed_pages = 0
+        self.processed_links = 0
+        self.dispatched_pages = 0
+        self.parsed_pages = 0
+        self.changed_pages = 0
+        self.unchanged_pages = 0
+        self.total_parse_time = 0.0
+        self.start_time = time.time()
+        self.MAX_DEPTH = max_depth
+        self.page_budget = max_pages
+        self.base_domain = urlparse(start_url).netloc
+        self.crawl_scope = canonicalize_url(start_url)
+        self.task_id = task_id
+        self._reported = {}
+        self.metrics = TaskMetrics(task_id)
+        artifact = self.job_store.artifact_path
+        self.trace = CrawlTrace(
+            artifact(task_id, ".trace.json") if profile else None,
+            artifact(task_id, ".parse.prof") if profile_parse else None,
+        )
+        self.writer = PageWriter(
+            write_seconds=self.metrics.storage_write, trace=self.trace
+        )
+        self.writer.start()
+        self.parse_queue = asyncio.Queue(settings.PARSE_QUEUE_SIZE)
+        self.fetching = 0
+        self.parsing = 0
+        self.open_tabs = 0
+        self.metrics.track(self)
+
+        try:
+            async with self._browser_session():
+                if self.shared_frontier is not None:
+                    await self._crawl_shared(start_url, task_id)
+                else:
+                    await self._crawl(start_url, task_id, resume)
+
+        except asyncio.CancelledError:
+            logger.info(f"Task {task_id} cancelled", extra={"task_id": task_id})
+            await self.job_store.update_job(task_id, {"status": "cancelled"})
+            raise
+
+        except Exception as e:
+            logger.exception(f"Error within main loop: {e}", extra={"task_id": task_id})
+            await self.job_store.update_job(
+                task_id, {"status": "failed", "error": str(e)}
+            )
+
+        finally:
+            await self._stop_stages()
+            if self.checkpoint is not None:
+                await self.checkpoint.close()
+            self.visited_urls.close()
+            self.metrics.release()
+            await self._write_trace(task_id)
+
+    async def _crawl(self, start_url: str, task_id: str, resume: bool = False):
+        if resume and self.checkpoint is not None:
+            known, todo, self.processed_links = self.checkpoint.load()
+            self.visited_urls.update(canonicalize_url(url) for url in known)
+            self.dispatched_pages = self.processed_links
+            logger.info(
+                f"Resuming {task_id} from checkpoint: {len(todo)} queued, "
+                f"{self.processed_links} done"
+            )
+        else:
+            start_url = normalize_url(start_url, start_url) or start_url
+            self._mark_seen(start_url)
+            todo = [(start_url, 0)]
+            if self.checkpoint is not None:
+                self.checkpoint.add(start_url, 0)
+            if self.seeder is not None:
+                todo.extend(await self._seed_from_sitemaps(start_url))
 
         await self.job_store.update_job(
             task_id,
             {
                 "status": "running",
                 "total_links_found": len(self.visited_urls),
-                "processed_links": 0,
+                "processed_links": self.processed_links,
             },
         )
-        self.visited_urls = set()
-        self.processed_links = 0
-        self.start_time = time.time()
-        self.MAX_DEPTH = max_depth
-        self.base_domain = urlparse(start_url).netloc
 
-        self.browser = await uc.start(headless=False)
+        for url, depth in todo:
+            await self.queue.put((url, depth))
 
-        try:
-            await self.queue.put((start_url, 0))
-            self.visited_urls.add(start_url)
+        self._start_stages(task_id, self._worker)
 
-            workers = [
-                asyncio.create_task(self._worker(task_id))
-                for _ in range(self.MAX_WORKERS)
-            ]
+        # A URL is done once the parse stage has queued its links
+        await self.queue.join()
 
-            await self.queue.join()
+        # Completed means every page is on disk
+        await self._stop_stages()
+        if self.writer.failed:
+            logger.error(
+                f"{self.writer.failed} files of {task_id} could not be written",
+                extra={"task_id": task_id},
+            )
 
-            for w in workers:
-                w.cancel()
+        # None: unknown, the crawl did not see the whole site
+        removed_pages = None
+        if self._can_prune():
+            removed_pages = await self.manifest.prune(
+                self.crawl_scope, task_id, self.MAX_DEPTH
+            )
 
-            total_time = str(timedelta(seconds=int(time.time() - self.start_time)))
-            await self.job_store.update_job(
+        total_time = str(timedelta(seconds=int(time.time() - self.start_time)))
+        await self.job_store.update_job(
+            task_id,
+            {
+                "status": "completed",
+                "completed_at": datetime.now().isoformat(),
+                "total_links_found": len(self.visited_urls),
+                "total_time": total_time,
+                "total_parse_time": round(self.total_parse_time, 3),
+                "changed_pages": self.changed_pages,
+                "unchanged_pages": self.unchanged_pages,
+                "removed_pages": removed_pages,
+                "budget_exhausted": self._budget_reached(),
+                "duplicate_pages": self.duplicate_pages,
+                "duplicates": self.duplicate_map,
+                "failed_writes": self.writer.failed,
+            },
+        )
+        if self.checkpoint is not None:
+            await self.checkpoint.delete()
+            self.checkpoint = None
+
+        log_extra = {"task_id": task_id, "total_time": total_time}
+        logger.info(f"Task {task_id} completed successfully", extra=log_extra)
+        logger.info(
+            f"=== Parsed {self.processed_links} links in {total_time} ===",
+            extra=log_extra,
+        )
+
+    def _can_prune(self) -> bool:
+        """
+        Only a complete crawl tells which pages are gone: no page budget
+        ran out, no page failed, and it went at least as deep as the crawl
+        the manifest was last pruned by.
+        """
+        if self.manifest is None:
+            return False
+        if self._budget_reached() or self.failed_pages or self.writer.failed:
+            return False
+        depth = self.manifest.crawl_depth(self.crawl_scope)
+        return depth is None or self.MAX_DEPTH >= depth
+
+    async def _crawl_shared(self, start_url: str, task_id: str):
+        """
+        Crawls as one node of a distributed task. Workers claim URLs from
+        the shared frontier under a lease and add new links back to it;
+        every node joins with the same task_id and the task is done once
+        nothing is queued or leased anymore.
+        The manifest is not pruned, since other nodes crawled part of the
+        site, and content dedup only sees this node's pages.
+        """
+        start_url = normalize_url(start_url, start_url) or start_url
+        seeds = [(start_url, 0)]
+        self._mark_seen(start_url)
+        if self.seeder is not None:
+            seeds.extend(await self._seed_from_sitemaps(start_url))
+        await self._share(seeds)
+
+        await self.job_store.update_job(
+            task_id, {"status": "running", "node_id": self.node_id}
+        )
+        logger.info(
+            f"Joined distributed task {task_id} as {self.node_id}",
+            extra={"task_id": task_id},
+        )
+
+        renewer = asyncio.create_task(self._renew_leases(task_id), name="lease-renewal")
+        try:
+            self._start_stages(task_id, self._shared_worker)
+            await asyncio.gather(*self._fetch_tasks)
+            await self._stop_stages()
+        finally:
+            renewer.cancel()
+        totals = await self._push_counters(task_id)
+        progress = await self.shared_frontier.progress(task_id)
+
+        total_time = str(timedelta(seconds=int(time.time() - self.start_time)))
+        await self.job_store.update_job(
+            task_id,
+            {
+                **totals,
+                "status": "completed",
+                "completed_at": datetime.now().isoformat(),
+                "total_links_found": progress["seen"],
+                "total_time": total_time,
+                "total_parse_time": round(self.total_parse_time, 3),
+                "budget_exhausted": 0 < self.page_budget <= progress["done"],
+                "duplicates": self.duplicate_map,
+                "failed_writes": self.writer.failed,
+            },
+        )
+        logger.info(
+            f"Task {task_id} completed, this node crawled "
+            f"{self.processed_links} of {totals.get('processed_links', 0)} pages",
+            extra={"task_id": task_id, "total_time": total_time},
+        )
+
+    async def _shared_worker(self, task_id: str):
+        while True:
+            claimed = await self.shared_frontier.claim(
                 task_id,
-                {
-                    "status": "completed",
-                    "completed_at": datetime.now().isoformat(),
-                    "total_links_found": len(self.visited_urls),
-                    "total_time": total_time,
-                },
+                self.node_id,
+                self.claim_batch,
+                self.lease_seconds,
+                self.page_budget,
             )
-            logger.info(f"Task {task_id} completed successfully")
-            logger.info(f"=== Parsed {self.processed_links} links in {total_time} ===")
+            if not claimed:
+                progress = await self.shared_frontier.progress(task_id)
+                budget_spent = 0 < self.page_budget <= progress["done"]
+                if progress["in_flight"] == 0 and (
+                    progress["queued"] == 0 or budget_spent
+                ):
+                    return
+                # Other nodes may still add links, or their leases run out
+                await asyncio.sleep(self.poll_interval)
+                continue
 
-        except Exception as e:
-            logger.exception(f"Error within main loop: {e}")
+            self._leased.update(url for url, _ in claimed)
+            for url, depth in claimed:
+                self.dispatched_pages += 1
+                try:
+                    await self._process_url(url, depth, task_id)
+                except Exception as e:
+                    logger.exception(f"Worker error: {e}")
 
+    async def _renew_leases(self, task_id: str):
+        """
+        Keeps the leases of claimed URLs alive while this node works on
+        them, a third of the lease before they would run out.
+        """
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self._leased:
+                continue
+            try:
+                await self.shared_frontier.renew(
+                    task_id, self.node_id, list(self._leased), self.lease_seconds
+                )
+            except Exception as e:
+                logger.warning(f"Failed renewing frontier leases: {e}")
+
+    async def _seed_from_sitemaps(self, start_url: str):
+        """
+        Bulk-loads the frontier with the site's sitemap URLs at depth 1,
+        remembering their <lastmod> and feeding <priority> to the strategy.
+        A crawl of the start page alone (max_depth 0) does not seed.
+        """
+        todo = []
+        if self.MAX_DEPTH < 1:
+            return todo
+        add_hint = getattr(self.queue.strategy, "add_hint", None)
+
+        async for entry in self.seeder.entries(start_url):
+            url = normalize_url(entry.url, start_url, host=self.base_domain)
+            if not url:
+                continue
+            if entry.lastmod:
+                self.sitemap_lastmod[url] = entry.lastmod
+            if entry.priority is not None and add_hint is not None:
+                add_hint(url, entry.priority)
+            if not self._mark_seen(url):
+                continue
+
+            if self.checkpoint is not None:
+                self.checkpoint.add(url, 1)
+            todo.append((url, 1))
+
+        logger.info(f"Seeded {len(todo)} URLs from sitemaps")
+        return todo
+
+    @asynccontextmanager
+    async def _browser_session(self):
+        """
+        Leases a browser from the shared pool.
+        Without a pool a dedicated browser is launched and stopped afterwards.
+        """
+        if self.browser_pool is not None:
+            async with self.browser_pool.lease() as lease:
+                self.browser_lease = lease
+                try:
+                    yield
+                finally:
+                    self.browser_lease = None
+            return
+
+        self.browser = await uc.start(headless=settings.BROWSER_HEADLESS)
+        try:
+            yield
         finally:
             try:
                 self.browser.stop()
             except Exception as e:
                 logger.exception(f"Failed stopping browser: {e}")
+            self.browser = None
+
+    @asynccontextmanager
+    async def _new_tab(self, url: str):
+        """Pooled tabs are counted by the lease, which recycles its browser"""
+        if self.browser_lease is not None:
+            async with self.browser_lease.tab(url) as tab:
+                yield tab
+        else:
+            yield await self.browser.get(url, new_tab=True)
 
     async def _worker(self, task_id: str):
         while True:
@@ -111,148 +517,510 @@ class CrawlerService:
             except asyncio.CancelledError:
                 break
 
+            if self._budget_reached():
+                # Drain what is left so queue.join() returns, the URLs stay
+                # queued in the checkpoint
+                self.queue.task_done()
+                continue
+            self.dispatched_pages += 1
+
+            if self.checkpoint is not None:
+                self.checkpoint.mark_in_flight(url, depth)
             try:
                 await self._process_url(url, depth, task_id)
             except Exception as e:
                 logger.exception(f"Worker error: {e}")
-            finally:
+
+    async def _finish(self, url: str, depth: int):
+        """
+        Called once per dispatched URL, when the pipeline is done with it
+        (handled by the parse stage, or dropped by the fetch stage).
+        """
+        try:
+            if self.shared_frontier is not None:
+                await self.shared_frontier.complete(self.task_id, url)
+                self._leased.discard(url)
+            elif self.checkpoint is not None:
+                self.checkpoint.mark_done(url, depth)
+                await self.checkpoint.maybe_checkpoint()
+        finally:
+            if self.shared_frontier is None:
                 self.queue.task_done()
 
+    def _budget_reached(self) -> bool:
+        return 0 < self.page_budget <= self.dispatched_pages
+
     async def _process_url(self, url, depth, task_id: str):
+        """
+        Fetch stage: fetches the page and hands it to the parse stage.
+        URLs that are not handed off are finished here.
+        """
+        self.fetching += 1
+        try:
+            handed_off = await self._fetch_stage(url, depth, task_id)
+        finally:
+            self.fetching -= 1
+        if not handed_off:
+            await self._finish(url, depth)
+
+    async def _fetch_stage(self, url, depth, task_id: str) -> bool:
+        self.job_store.publish(task_id, {"current_url": url})
+        log_extra = {"task_id": task_id, "url": url, "depth": depth}
+        if self.politeness is not None and not await self.politeness.allowed(url):
+            logger.info(f"Disallowed by robots.txt: {url}", extra=log_extra)
+            return False
+
+        previous = await self._stored_page(url)
         for attempt in range(self.MAX_RETRIES + 1):
-            tab = None
             try:
-                tab = await self.browser.get(url, new_tab=True)
+                fetch_started = time.perf_counter()
+                page = self._unchanged_per_sitemap(url, previous)
+                if page is None:
+                    page = await self._fetch_politely(url, previous)
+                self.trace.add("fetch", url, fetch_started, attempt=attempt)
+                fetch_time = round(time.perf_counter() - fetch_started, 3)
+                logger.debug(
+                    f"Fetched {url} in {fetch_time:.3f}s",
+                    extra={**log_extra, "fetch_time": fetch_time},
+                )
 
-                html = await self._wait_for_page_load(tab)
+                if page is not None and page.gone:
+                    # 404/410: nothing to retry or render
+                    logger.info(f"Page is gone: {url}", extra=log_extra)
+                    return False
 
-                if not html or len(html) < 50:
+                if page is None or (
+                    not page.not_modified and (not page.html or len(page.html) < 50)
+                ):
                     if attempt < self.MAX_RETRIES:
-                        await asyncio.sleep(1)
+                        self.metrics.retries.inc()
+                        await self._retry_pause()
                         continue
                     else:
-                        logger.warning(f"Skipping empty/blocked: {url}")
-                        return
+                        logger.warning(
+                            f"Skipping empty/blocked: {url}", extra=log_extra
+                        )
+                        self.failed_pages += 1
+                        return False
 
-                filename = self.storage.generate_filename(url)
-                await self.storage.save(filename, html)
+                # Waits here while the parse stage is behind
+                with self.trace.span("parse_queue_put", url):
+                    await self.parse_queue.put((url, depth, page, previous))
+                return True
 
-                parsed_data = await self.parser.parse(html)
-                markdown_content = parsed_data["content"]
-                filename_md = self.storage.generate_filename(url, ".md")
+            except Exception as e:
+                logger.exception(f"Error processing {url}: {e}", extra=log_extra)
+                self.job_store.publish(task_id, {"error": f"{url}: {e}"})
+                if attempt < self.MAX_RETRIES:
+                    self.metrics.retries.inc()
+                    await self._retry_pause()
+        self.failed_pages += 1
+        return False
 
-                full_content = (
-                    f"# {parsed_data['title']}\n"
-                    f"Source: {url}\n\n"
-                    f"{markdown_content}"
-                )
-                await self.md_storage.save(filename_md, full_content)
+    async def _parse_worker(self, task_id: str):
+        """Parse stage: parses and stores fetched pages, queues their links"""
+        while True:
+            url, depth, page, previous = await self.parse_queue.get()
+            self.parsing += 1
+            try:
+                links = await self._handle_page(url, page, previous, task_id)
+                if self.manifest is not None:
+                    await self.manifest.maybe_flush()
 
                 self.processed_links += 1
-                eta_str = "Calculating"
-                if self.processed_links > 0 and self.start_time:
-                    elapsed_time = time.time() - self.start_time
-                    avg_time_per_link = elapsed_time / self.processed_links
+                with self.trace.span("job_store_update", url):
+                    await self._report_progress(task_id)
+                if depth < self.MAX_DEPTH:
+                    with self.trace.span("enqueue_links", url, links=len(links)):
+                        # Relative links resolve against where the page ended up
+                        await self._enqueue_links(
+                            links, depth + 1, current_url=page.url or url
+                        )
+            except Exception as e:
+                self.failed_pages += 1
+                logger.exception(
+                    f"Error processing {url}: {e}",
+                    extra={"task_id": task_id, "url": url, "depth": depth},
+                )
+                self.job_store.publish(task_id, {"error": f"{url}: {e}"})
+            finally:
+                self.parsing -= 1
+                self.parse_queue.task_done()
+            # Not reached when cancelled, the URL stays in flight for a resume
+            await self._finish(url, depth)
 
-                    remaining_items = len(self.visited_urls) - self.processed_links
+    async def _write_trace(self, task_id: str):
+        if not (self.trace.enabled or self.trace.profile_parse):
+            return
+        try:
+            files = await self.trace.write()
+        except Exception as e:
+            logger.exception(f"Failed to write the trace of {task_id}: {e}")
+            return
+        if files:
+            await self.job_store.update_job(task_id, files)
+            await self.job_store.flush()
 
-                    if remaining_items < 0:
-                        remaining_items = 0
+    def _start_stages(self, task_id: str, fetch_worker):
+        self._fetch_tasks = [
+            asyncio.create_task(fetch_worker(task_id), name=f"fetch-{i}")
+            for i in range(self.MAX_WORKERS)
+        ]
+        self._parse_tasks = [
+            asyncio.create_task(self._parse_worker(task_id), name=f"parse-{i}")
+            for i in range(self.parse_concurrency)
+        ]
 
-                    eta_seconds = int(avg_time_per_link * remaining_items)
-                    eta_str = str(timedelta(seconds=eta_seconds))
-                await self.job_store.update_job(
-                    task_id,
-                    {
-                        "processed_links": self.processed_links,
-                        "total_links_found": len(self.visited_urls),
-                        "estimated_time_remaining": eta_str,
-                    },
+    async def _stop_stages(self):
+        """
+        Stops the fetch and parse workers and waits for the writer to drain.
+        Cancelled fetch workers close their tabs on the way out.
+        """
+        for tasks in (self._fetch_tasks, self._parse_tasks):
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._fetch_tasks = []
+        self._parse_tasks = []
+        await self.writer.close()
+
+    def pipeline_stats(self) -> Dict[str, int]:
+        """Queue depths and busy workers of each pipeline stage"""
+        return {
+            "frontier_queue": self.queue.qsize(),
+            "fetching": self.fetching,
+            "parse_queue": self.parse_queue.qsize(),
+            "parsing": self.parsing,
+            "write_queue": self.writer.queue.qsize(),
+        }
+
+    async def _report_progress(self, task_id: str):
+        """
+        Publishes the task's progress. In a distributed crawl this node's
+        counters are added to the shared totals and the totals are reported.
+        """
+        counters = {name: getattr(self, name) for name in PROGRESS_COUNTERS}
+        total_links_found = len(self.visited_urls)
+        if self.shared_frontier is not None:
+            counters = await self._push_counters(task_id)
+            total_links_found = (await self.shared_frontier.progress(task_id))["seen"]
+
+        eta_str = "Calculating"
+        processed = counters.get("processed_links", 0)
+        if processed > 0 and self.start_time:
+            elapsed_time = time.time() - self.start_time
+            avg_time_per_link = elapsed_time / processed
+
+            remaining_items = total_links_found - processed
+
+            if remaining_items < 0:
+                remaining_items = 0
+
+            eta_seconds = int(avg_time_per_link * remaining_items)
+            eta_str = str(timedelta(seconds=eta_seconds))
+        await self.job_store.update_job(
+            task_id,
+            {
+                **counters,
+                "total_links_found": total_links_found,
+                "estimated_time_remaining": eta_str,
+                "avg_parse_time": round(
+                    self.total_parse_time / max(self.parsed_pages, 1), 4
+                ),
+                "pipeline": self.pipeline_stats(),
+            },
+        )
+
+    async def _push_counters(self, task_id: str) -> Dict[str, int]:
+        """Adds what changed since the last push to the shared totals"""
+        counters = {name: getattr(self, name) for name in PROGRESS_COUNTERS}
+        delta = {
+            name: value - self._reported.get(name, 0)
+            for name, value in counters.items()
+        }
+        self._reported = counters
+        return await self.shared_frontier.incr(task_id, delta)
+
+    async def _retry_pause(self):
+        # With politeness the next slot already waits out the host's backoff
+        if self.politeness is None:
+            await asyncio.sleep(1)
+
+    async def _handle_page(
+        self,
+        url: str,
+        page: FetchedPage,
+        previous: Optional[Dict[str, Any]],
+        task_id: str,
+    ):
+        """
+        Parses and stores a fetched page, returns its links.
+        Pages the manifest knows as unchanged (304, same HTML, or same
+        Markdown) are neither parsed nor written again. Exact and near
+        duplicates of a page seen earlier in the task are not written.
+        """
+        html_hash = content_hash(page.html) if page.html is not None else None
+
+        if previous and (page.not_modified or previous["html_hash"] == html_hash):
+            self.unchanged_pages += 1
+            self._record_manifest(url, task_id, page, previous, previous["links"])
+            return previous["links"]
+
+        parse_started = time.perf_counter()
+        parsed_data = await self.parse_executor.parse(
+            self.parser,
+            page.html,
+            fingerprint=self.duplicates is not None,
+            profile=self.trace.profile_parse,
+        )
+        self.parsed_pages += 1
+        self.total_parse_time += parsed_data["parse_time"]
+        timings = parsed_data.get("parse_timings", {})
+        for phase, histogram in self.metrics.parse.items():
+            if phase in timings:
+                histogram.observe(timings[phase])
+        # Wall time seen by the crawler, the phases as measured in the pool
+        self.trace.add(
+            "parse",
+            url,
+            parse_started,
+            **{phase: round(seconds, 6) for phase, seconds in timings.items()},
+        )
+        if "parse_profile" in parsed_data:
+            self.trace.add_profile(parsed_data.pop("parse_profile"))
+        logger.debug(
+            f"Parsed {url} in {parsed_data['parse_time']:.3f}s",
+            extra={
+                "task_id": task_id,
+                "url": url,
+                "parse_time": round(parsed_data["parse_time"], 4),
+            },
+        )
+        markdown_content = parsed_data["content"]
+
+        full_content = (
+            f"# {parsed_data['title']}\n" f"Source: {url}\n\n" f"{markdown_content}"
+        )
+        markdown_hash = content_hash(full_content)
+
+        canonical_url = None
+        if self.duplicates is not None:
+            canonical_url = self.duplicates.check(
+                url, markdown_content, parsed_data.get("simhash")
+            )
+
+        record = partial(
+            self._record_manifest,
+            url,
+            task_id,
+            page,
+            {"html_hash": html_hash, "content_hash": markdown_hash},
+            parsed_data["links"],
+        )
+        if canonical_url:
+            self.duplicate_pages += 1
+            self.metrics.duplicate_pages.inc()
+            self.duplicate_map[url] = canonical_url
+            logger.info(
+                f"Duplicate of {canonical_url}: {url}",
+                extra={"task_id": task_id, "url": url},
+            )
+            record()
+        elif previous and previous["content_hash"] == markdown_hash:
+            # Only markup noise (nonces, timestamps) changed
+            self.unchanged_pages += 1
+            record()
+        else:
+            # Known to the manifest once both files are on disk, so a failed
+            # write is retried by the next incremental crawl
+            on_written = _after_all(2, record)
+            filename = self.storage.generate_filename(url)
+            with self.trace.span("save_html", url):
+                await self.writer.put(self.storage, filename, page.html, on_written)
+
+            filename_md = self.md_storage.generate_filename(url, ".md")
+            with self.trace.span("save_markdown", url):
+                await self.writer.put(
+                    self.md_storage, filename_md, full_content, on_written
                 )
-                if depth < self.MAX_DEPTH:
-                    await self._extract_and_enqueue_links(
-                        tab, depth + 1, current_url=url
-                    )
+            self.changed_pages += 1
 
-                return
+        if canonical_url and self.skip_duplicate_links:
+            return []
+        return parsed_data["links"]
 
-            except Exception as e:
-                logger.exception(f"Error processing {url}: {e}")
-                if attempt < self.MAX_RETRIES:
-                    await asyncio.sleep(1)
+    def _unchanged_per_sitemap(
+        self, url: str, previous: Optional[Dict[str, Any]]
+    ) -> Optional[FetchedPage]:
+        """Sitemap <lastmod> not newer than on the last crawl: skip the fetch"""
+        lastmod = parse_lastmod(self.sitemap_lastmod.get(url))
+        if lastmod is None:
+            return None
+        seen = parse_lastmod(previous["lastmod"]) if previous else None
+        if seen is not None and lastmod <= seen:
+            return FetchedPage(None, not_modified=True)
+        return None
+
+    async def _stored_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Manifest entry of the page, if its files are still in the current
+        storage. Pages deleted since, or written to another backend, are
+        fetched and written as new.
+        """
+        previous = self.manifest.get(url) if self.manifest is not None else None
+        if previous is None:
+            return None
+        html_file = self.storage.generate_filename(url)
+        md_file = self.md_storage.generate_filename(url, ".md")
+        if not await self.storage.exists(html_file):
+            return None
+        if not await self.md_storage.exists(md_file):
+            return None
+        return previous
+
+    def _record_manifest(self, url, task_id, page, hashes, links):
+        if self.manifest is None:
+            return
+        previous = self.manifest.get(url) or {}
+        self.manifest.record(
+            url,
+            scope=self.crawl_scope,
+            task_id=task_id,
+            html_hash=hashes["html_hash"],
+            content_hash=hashes["content_hash"],
+            links=links,
+            etag=page.etag or previous.get("etag"),
+            last_modified=page.last_modified or previous.get("last_modified"),
+            lastmod=self.sitemap_lastmod.get(url) or previous.get("lastmod"),
+        )
+
+    async def _fetch_politely(
+        self, url: str, previous: Optional[Dict[str, Any]] = None
+    ) -> Optional[FetchedPage]:
+        """
+        Fetches within the host's politeness slot and reports the outcome.
+        Returns None when the host throttled or blocked us.
+        """
+        if self.politeness is None:
+            return await self._fetch_page(url, previous)
+
+        async with self.politeness.slot(url):
+            try:
+                page = await self._fetch_page(url, previous)
+            except ThrottledError as e:
+                self.politeness.report(url, THROTTLED, e.retry_after)
+                return None
+            except Exception:
+                self.politeness.report(url, ERROR)
+                raise
+
+        if page.blocked:
+            self.politeness.report(url, BLOCKED)
+            return None
+        self.politeness.report(url, OK)
+        return page
+
+    async def _fetch_page(
+        self, url: str, previous: Optional[Dict[str, Any]] = None
+    ) -> FetchedPage:
+        """
+        HTTP tier first, browser otherwise. The HTTP request is conditional
+        on the validators of the previous crawl, if any.
+        The tab is closed as soon as its content is pulled, links and
+        everything else are taken from the HTML string afterwards.
+        """
+        page = None
+        if self.fetcher is not None:
+            started = time.perf_counter()
+            page = await self.fetcher.fetch(url, self.block_indicators, previous)
+            self.metrics.fetch["http"].observe(time.perf_counter() - started)
+            self.trace.add("http_fetch", url, started, hit=page is not None)
+
+        if page is None:
+            started = time.perf_counter()
+            page = await self._fetch_rendered(url)
+            self.metrics.fetch["browser"].observe(time.perf_counter() - started)
+            if self.fetcher is not None and page.html and not page.blocked:
+                self.fetcher.browser_worked(url)
+
+        if page.blocked:
+            self.metrics.blocked_pages.inc()
+        return page
+
+    async def _fetch_rendered(self, url: str) -> FetchedPage:
+        started = time.perf_counter()
+        async with self._new_tab(url) as tab:
+            self.trace.add("tab_open", url, started)
+            self.open_tabs += 1
+            try:
+                return await self._wait_for_page_load(tab, url)
             finally:
-                if tab:
-                    try:
+                try:
+                    with self.trace.span("tab_close", url):
                         await tab.close()
-                    except Exception as e:
-                        logger.exception(f"Error occurred with closing the tab: {e}")
+                except Exception as e:
+                    logger.exception(f"Error occurred with closing the tab: {e}")
+                self.open_tabs -= 1
 
-    async def _extract_and_enqueue_links(self, tab, next_depth, current_url: str):
-        try:
-            links_elements = await tab.select_all("a")
-            count_added = 0
+    def _mark_seen(self, url: str) -> bool:
+        """
+        False if the page was queued before under any spelling.
+        Only the dedup key is canonical, the URL is fetched as linked.
+        """
+        return self.visited_urls.add(canonicalize_url(url))
 
-            for link in links_elements:
-                try:
-                    raw_href = link.attrs.get("href")
+    async def _enqueue_links(self, hrefs, next_depth, current_url: str):
+        if self._budget_reached():
+            return
 
-                    if not raw_href:
-                        continue
+        count_added = 0
+        shared = []
 
-                    raw_href = raw_href.split("#")[0]
-                    if not raw_href:
-                        continue
+        for raw_href in hrefs:
+            full_url = normalize_url(raw_href, current_url, host=self.base_domain)
 
-                    full_url = urljoin(current_url, raw_href)
-
-                    parsed_href = urlparse(full_url)
-
-                    if (
-                        parsed_href.netloc == self.base_domain
-                        and full_url not in self.visited_urls
-                        and not full_url.endswith(
-                            (
-                                ".png",
-                                ".jpg",
-                                ".jpeg",
-                                ".pdf",
-                                ".css",
-                                ".js",
-                                ".zip",
-                                ".ico",
-                                ".xml",
-                            )
-                        )
-                    ):
-                        self.visited_urls.add(full_url)
-                        await self.queue.put((full_url, next_depth))
-                        count_added += 1
-                except Exception as e:
-                    logger.exception(f"Error extracting links: {e}")
+            if full_url and self._mark_seen(full_url):
+                if self.shared_frontier is not None:
+                    # New to this node, the shared seen set has the last word
+                    shared.append((full_url, next_depth))
                     continue
+                if self.checkpoint is not None:
+                    self.checkpoint.add(full_url, next_depth)
+                await self.queue.put((full_url, next_depth))
+                count_added += 1
 
-            if count_added > 0:
-                logger.info(
-                    f"  -> Found {count_added} new links. Queue size: {self.queue.qsize()}"
-                )
+        if shared:
+            count_added = await self._share(shared)
 
-        except Exception as e:
-            logger.exception(f"Error extracting links: {e}")
+        if count_added > 0:
+            logger.info(
+                f"  -> Found {count_added} new links. Queue size: {self.queue.qsize()}",
+                extra={"url": current_url, "depth": next_depth},
+            )
 
-    async def _wait_for_page_load(self, tab):
+    async def _share(self, items) -> int:
+        score = self.queue.strategy.score
+        return await self.shared_frontier.add(
+            self.task_id, [(url, depth, score(url, depth)) for url, depth in items]
+        )
+
+    async def _wait_for_page_load(self, tab, url: str) -> FetchedPage:
         try:
-            await tab.sleep(2)
-            html = await tab.get_content()
-
-            attempts = 0
-            while (
-                any(indicator in html for indicator in self.block_indicators)
-                and attempts < 10
-            ):
-                await tab.sleep(1.5)
+            started = time.perf_counter()
+            state = await wait_until_ready(tab, url, self.block_indicators)
+            self.metrics.page_load_wait.observe(time.perf_counter() - started)
+            self.trace.add("page_load_wait", url, started, state=state)
+            if state != READY:
+                logger.warning(f"Page not ready after timeout: {url}")
+            with self.trace.span("get_content", url):
                 html = await tab.get_content()
-                attempts += 1
-            return html
+            final_url = getattr(tab, "url", None)
+            if not (isinstance(final_url, str) and final_url.startswith("http")):
+                final_url = None
+            # Classified once settled: a challenge that did not clear
+            # within PAGE_LOAD_TIMEOUT, not a mention
+            blocked = html is not None and looks_blocked(html, self.block_indicators)
+            return FetchedPage(html, blocked=blocked, url=final_url)
         except Exception as e:
             logger.exception(f"Error load check: {e}")
-            return None
+            return FetchedPage(None)
@@ -0,0 +1,38 @@
+from app.core.config import settings
+from app.services.browser_pool import browser_pool
+from app.services.crawler import CrawlerService
+from app.services.fetcher import http_fetcher
+from app.services.frontier_queue import get_strategy
+from app.services.job_store import job_store
+from app.services.manifest import crawl_manifest
+from app.services.parse_executor import parse_executor
+from app.services.parser import get_parser
+from app.services.politeness import politeness
+from app.services.shared_frontier import get_shared_frontier
+from app.services.sitemap import sitemap_seeder
+from app.services.storage import get_storage
+
+
+def build_crawler_service() -> CrawlerService:
+    """
+    Crawler wired to the process-wide services, as configured in settings.
+    Used by the API, the scheduler and the frontier worker alike.
+    """
+    return CrawlerService(
+        storage=get_storage(settings.HTML_STORAGE_PATH),
+        job_store=job_store,
+        md_storage=get_storage(settings.MARKDOWN_STORAGE_PATH),
+        parser=get_parser(),
+        parse_executor=parse_executor,
+        browser_pool=browser_pool,
+        fetcher=http_fetcher if settings.HTTP_FIRST else None,
+        checkpoint_dir=settings.FRONTIER_STORAGE_PATH,
+        manifest=crawl_manifest if settings.INCREMENTAL_CRAWL else None,
+        politeness=politeness,
+        strategy=get_strategy(),
+        seeder=sitemap_seeder if settings.SITEMAP_SEEDING else None,
+        duplicate_distance=(
+            settings.DEDUP_SIMHASH_DISTANCE if settings.DEDUP_CONTENT else None
+        ),
+        shared_frontier=get_shared_frontier(),
+    )
@@ -0,0 +1,100 @@
+import hashlib
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.services.manifest import content_hash
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+SHINGLE_SIZE = 3
+# Shorter texts share too many shingles by chance to compare them fuzzily
+MIN_WORDS = 30
+
+
+def simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash over word 3-shingles weighted by frequency.
+    Near-identical texts get fingerprints a few bits apart.
+    Returns None for texts shorter than MIN_WORDS.
+    """
+    words = WORD_RE.findall(text.lower())
+    if len(words) < MIN_WORDS:
+        return None
+
+    shingles = Counter(
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    )
+    weights = [0] * 64
+    for shingle, count in shingles.items():
+        value = int.from_bytes(
+            hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        for bit in range(64):
+            weights[bit] += count if value >> bit & 1 else -count
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DuplicateIndex:
+    """
+    Per-task index of page contents, maps a duplicate to the first URL
+    seen with that content.
+    Exact duplicates match by content hash. Near duplicates match by SimHash
+    within max_distance bits: the fingerprint is cut into max_distance + 1
+    bands, and two fingerprints that close must share at least one band
+    exactly, so only pages in the same band buckets are compared.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = 64 // bands
+        self._bands = [
+            (i * width, 64 if i == bands - 1 else (i + 1) * width) for i in range(bands)
+        ]
+        self._exact: Dict[str, str] = {}
+        self._buckets: List[Dict[int, List[Tuple[int, str]]]] = [
+            {} for _ in self._bands
+        ]
+
+    def _band_keys(self, fingerprint: int):
+        for index, (start, end) in enumerate(self._bands):
+            yield index, (fingerprint >> start) & ((1 << (end - start)) - 1)
+
+    def check(
+        self, url: str, content: str, fingerprint: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Returns the canonical URL if content duplicates an earlier page.
+        Only originals are indexed, so a copy of a duplicate maps to the
+        original too.
+        """
+        digest = content_hash(content)
+        if digest in self._exact:
+            return self._exact[digest]
+
+        canonical = None
+        if fingerprint is not None and self.max_distance > 0:
+            canonical = self._near(fingerprint)
+        self._exact[digest] = canonical or url
+
+        if fingerprint is not None and canonical is None:
+            for band, key in self._band_keys(fingerprint):
+                self._buckets[band].setdefault(key, []).append((fingerprint, url))
+        return canonical
+
+    def _near(self, fingerprint: int) -> Optional[str]:
+        for band, key in self._band_keys(fingerprint):
+            for other, other_url in self._buckets[band].get(key, ()):
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    return other_url
+        return None
@@ -0,0 +1,281 @@
+import logging
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+TIER_HTTP = "http"
+TIER_BROWSER = "browser"
+
+# The page is gone, not blocked: says nothing about which tier works
+NOT_FOUND_CODES = (404, 410)
+# The host asks to slow down, the browser would get the same answer
+THROTTLE_CODES = (429, 503)
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/140.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+NON_VISIBLE_RE = re.compile(
+    r"<(script|style|noscript|template|svg)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+TAG_RE = re.compile(r"<[^>]+>")
+
+
+class ThrottledError(Exception):
+    """Host answered 429/503, retry_after is in seconds when the host sent it"""
+
+    def __init__(self, url: str, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"{url} throttled with status {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay seconds or an HTTP date"""
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class FetchedPage:
+    """
+    HTML of a page plus the HTTP validators it was served with.
+    url is the final URL after redirects, when known; relative links
+    resolve against it. gone is set for a 404/410, a final answer that
+    the browser would not change.
+    """
+
+    def __init__(
+        self,
+        html: Optional[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        not_modified: bool = False,
+        blocked: bool = False,
+        url: Optional[str] = None,
+        gone: bool = False,
+    ):
+        self.html = html
+        self.url = url
+        self.gone = gone
+        self.etag = etag
+        self.last_modified = last_modified
+        self.not_modified = not_modified
+        self.blocked = blocked
+
+
+class HttpFetcher:
+    """
+    Fast fetch tier: plain HTTP through a pooled keep-alive HTTP/2 client.
+    Returns None when the page has to go through the browser instead
+    (blocked, JS-rendered or suspiciously small).
+    Tiers are tracked per domain + first path segment. A prefix is pinned
+    to the browser, skipping HTTP, only after pin_misses HTTP misses in a
+    row and once the browser actually rendered one of its pages; the pin
+    expires after pin_ttl seconds so the prefix is probed again.
+    Transport errors say nothing about the page and are not counted.
+    """
+
+    def __init__(
+        self,
+        min_content_length: Optional[int] = None,
+        min_text_length: Optional[int] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        pin_misses: Optional[int] = None,
+        pin_ttl: Optional[float] = None,
+    ):
+        self.min_content_length = min_content_length or settings.HTTP_MIN_CONTENT_LENGTH
+        self.min_text_length = min_text_length or settings.HTTP_MIN_TEXT_LENGTH
+        self.pin_misses = pin_misses or settings.HTTP_TIER_PIN_MISSES
+        self.pin_ttl = settings.HTTP_TIER_PIN_TTL if pin_ttl is None else pin_ttl
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        # Prefixes HTTP last worked for
+        self._http_ok: Set[str] = set()
+        # Consecutive HTTP misses per prefix
+        self._misses: Dict[str, int] = {}
+        # Prefix -> monotonic time its browser pin expires
+        self._pinned: Dict[str, float] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                transport=self._transport,
+                headers=DEFAULT_HEADERS,
+                follow_redirects=True,
+                timeout=settings.REQUEST_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    @staticmethod
+    def tier_key(url: str) -> str:
+        parsed = urlparse(url)
+        prefix = parsed.path.strip("/").split("/", 1)[0]
+        return f"{parsed.netloc}/{prefix}"
+
+    def tier_for(self, url: str) -> Optional[str]:
+        key = self.tier_key(url)
+        expires = self._pinned.get(key)
+        if expires is not None:
+            if time.monotonic() < expires:
+                return TIER_BROWSER
+            del self._pinned[key]
+            logger.info(f"Fetch tier pin of {key} expired, probing HTTP again")
+        return TIER_HTTP if key in self._http_ok else None
+
+    def _http_worked(self, url: str):
+        key = self.tier_key(url)
+        self._misses.pop(key, None)
+        self._http_ok.add(key)
+
+    def _http_missed(self, url: str):
+        key = self.tier_key(url)
+        self._misses[key] = self._misses.get(key, 0) + 1
+        self._http_ok.discard(key)
+
+    def browser_worked(self, url: str):
+        """
+        Called when the browser rendered a page HTTP missed. Pins the prefix
+        once HTTP missed pin_misses times in a row.
+        """
+        key = self.tier_key(url)
+        if self._misses.get(key, 0) >= self.pin_misses and key not in self._pinned:
+            logger.info(f"Fetch tier for {key}: {TIER_BROWSER}")
+            self._pinned[key] = time.monotonic() + self.pin_ttl
+
+    async def fetch(
+        self,
+        url: str,
+        block_indicators: List[str],
+        validators: Optional[Dict[str, Optional[str]]] = None,
+    ) -> Optional[FetchedPage]:
+        """
+        Returns the fetched page, or None if the browser should handle the URL.
+        With validators (etag / last_modified of the previous crawl) the
+        request is conditional and a 304 comes back as not_modified.
+        Raises ThrottledError on 429/503.
+        """
+        if self.tier_for(url) == TIER_BROWSER:
+            return None
+
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            response = await self.client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            logger.debug(f"HTTP fetch failed for {url}: {e}")
+            return None
+
+        if response.status_code == 304 and headers:
+            self._http_worked(url)
+            return FetchedPage(None, not_modified=True)
+
+        if response.status_code in NOT_FOUND_CODES:
+            return FetchedPage(None, url=str(response.url), gone=True)
+
+        if response.status_code in THROTTLE_CODES:
+            raise ThrottledError(
+                url,
+                response.status_code,
+                parse_retry_after(response.headers.get("retry-after")),
+            )
+
+        reason = self._needs_browser(response, block_indicators)
+        if reason:
+            logger.debug(f"Escalating {url} to browser: {reason}")
+            self._http_missed(url)
+            return None
+
+        self._http_worked(url)
+        return FetchedPage(
+            response.text,
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            url=str(response.url),
+        )
+
+    async def get_text(self, url: str) -> Optional[str]:
+        """Body of a plain resource (robots.txt, ...), None unless it is a 200"""
+        response = await self._get_resource(url)
+        return response.text if response is not None else None
+
+    async def get_bytes(self, url: str) -> Optional[bytes]:
+        """Raw body of a resource (sitemaps, possibly gzipped)"""
+        response = await self._get_resource(url)
+        return response.content if response is not None else None
+
+    async def _get_resource(self, url: str) -> Optional[httpx.Response]:
+        try:
+            response = await self.client.get(url)
+        except httpx.HTTPError as e:
+            logger.debug(f"HTTP fetch failed for {url}: {e}")
+            return None
+        if response.status_code != 200:
+            return None
+        return response
+
+    def _needs_browser(
+        self, response: httpx.Response, block_indicators: List[str]
+    ) -> Optional[str]:
+        if response.status_code != 200:
+            return f"status {response.status_code}"
+
+        content_type = response.headers.get("content-type", "")
+        if "html" not in content_type:
+            return f"content type {content_type or 'missing'}"
+
+        html = response.text
+        if len(html) < self.min_content_length:
+            return f"too small ({len(html)} chars)"
+
+        if any(indicator in html for indicator in block_indicators):
+            return "block indicator"
+
+        if self._looks_js_rendered(html):
+            return "looks JS-rendered"
+
+        return None
+
+    def _looks_js_rendered(self, html: str) -> bool:
+        """Little visible text outside of scripts means content comes from JS"""
+        text = TAG_RE.sub(" ", NON_VISIBLE_RE.sub(" ", html))
+        return len("".join(text.split())) < self.min_text_length
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+http_fetcher = HttpFetcher()
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+
+
+class FrontierCheckpoint:
+    """
+    On-disk copy of a crawl frontier, one SQLite file per task.
+    Every discovered URL is kept with its depth and state
+    (queued -> in_flight -> done). State changes are buffered in memory
+    and written in one transaction per checkpoint interval.
+    """
+
+    def __init__(self, task_id: str, storage_path: str):
+        os.makedirs(storage_path, exist_ok=True)
+        self.path = os.path.join(storage_path, f"{task_id}.sqlite")
+        self.interval = settings.FRONTIER_CHECKPOINT_INTERVAL
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS urls ("
+            "url TEXT PRIMARY KEY, depth INTEGER NOT NULL, state TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self._conn.commit()
+
+        self._pending: Dict[str, Tuple[int, str]] = {}
+        self._last_checkpoint = time.monotonic()
+        self._write_lock = asyncio.Lock()
+
+    @staticmethod
+    def exists(task_id: str, storage_path: str) -> bool:
+        return os.path.exists(os.path.join(storage_path, f"{task_id}.sqlite"))
+
+    def add(self, url: str, depth: int):
+        self._pending[url] = (depth, QUEUED)
+
+    def mark_in_flight(self, url: str, depth: int):
+        self._pending[url] = (depth, IN_FLIGHT)
+
+    def mark_done(self, url: str, depth: int):
+        self._pending[url] = (depth, DONE)
+
+    def set_meta(self, values: Dict[str, str]):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            [(key, str(value)) for key, value in values.items()],
+        )
+        self._conn.commit()
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def load(self) -> Tuple[Set[str], List[Tuple[str, int]], int]:
+        """
+        Returns (all known URLs, URLs still to crawl, number of done URLs).
+        In-flight URLs were interrupted mid-fetch and are crawled again.
+        """
+        known = set()
+        todo = []
+        done = 0
+        for url, depth, state in self._conn.execute(
+            "SELECT url, depth, state FROM urls ORDER BY depth"
+        ):
+            known.add(url)
+            if state == DONE:
+                done += 1
+            else:
+                todo.append((url, depth))
+        return known, todo, done
+
+    async def maybe_checkpoint(self):
+        if time.monotonic() - self._last_checkpoint >= self.interval:
+            await self.checkpoint()
+
+    async def checkpoint(self):
+        """Flushes buffered state changes in a single transaction"""
+        async with self._write_lock:
+            self._last_checkpoint = time.monotonic()
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            await asyncio.to_thread(self._write, batch)
+            logger.debug(f"Frontier checkpoint: {len(batch)} URLs -> {self.path}")
+
+    def _write(self, batch: Dict[str, Tuple[int, str]]):
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO urls (url, depth, state) VALUES (?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET state = excluded.state",
+                [(url, depth, state) for url, (depth, state) in batch.items()],
+            )
+
+    async def close(self):
+        await self.checkpoint()
+        self._conn.close()
+
+    async def delete(self):
+        """Drops the checkpoint of a completed task, nothing is left to resume"""
+        self._pending = {}
+        self._conn.close()
+        await asyncio.to_thread(self._remove_files)
+
+    def _remove_files(self):
+        for path in (self.path, f"{self.path}-wal", f"{self.path}-shm"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,100 @@
+import asyncio
+import heapq
+import itertools
+import re
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+
+
+class CrawlStrategy(ABC):
+    """Orders the frontier: URLs with a lower score are crawled first"""
+
+    @abstractmethod
+    def score(self, url: str, depth: int) -> float:
+        """Priority of a URL found at depth"""
+        pass
+
+
+class FifoStrategy(CrawlStrategy):
+    """Discovery order, i.e. plain BFS"""
+
+    def score(self, url: str, depth: int) -> float:
+        return 0.0
+
+
+class PriorityStrategy(CrawlStrategy):
+    """
+    Shallow pages first, shifted by URL pattern weights and sitemap hints.
+    Both are measured in depth levels: a weight of 1 puts a URL on par
+    with pages one level shallower.
+    """
+
+    def __init__(
+        self,
+        pattern_weights: Optional[Dict[str, float]] = None,
+        hint_weight: float = 1.0,
+    ):
+        weights = (
+            settings.URL_PATTERN_WEIGHTS if pattern_weights is None else pattern_weights
+        )
+        self.patterns = [
+            (re.compile(pattern), weight) for pattern, weight in weights.items()
+        ]
+        self.hint_weight = hint_weight
+        self.hints: Dict[str, float] = {}
+
+    def add_hint(self, url: str, priority: float):
+        """Sitemap <priority> (0.0 - 1.0, 0.5 is neutral)"""
+        self.hints[url] = priority
+
+    def score(self, url: str, depth: int) -> float:
+        score = float(depth)
+        for pattern, weight in self.patterns:
+            if pattern.search(url):
+                score -= weight
+        if url in self.hints:
+            score -= (self.hints[url] - 0.5) * 2 * self.hint_weight
+        return score
+
+
+STRATEGIES = {
+    "fifo": FifoStrategy,
+    "priority": PriorityStrategy,
+}
+
+
+def get_strategy(name: Optional[str] = None) -> CrawlStrategy:
+    name = name or settings.FRONTIER_STRATEGY
+    if name not in STRATEGIES:
+        raise ValueError(
+            f"Unknown frontier strategy {name!r}, expected one of {list(STRATEGIES)}"
+        )
+    return STRATEGIES[name]()
+
+
+class FrontierQueue(asyncio.Queue):
+    """
+    asyncio.Queue of (url, depth) items handed out in strategy order.
+    Equal scores keep their insertion order.
+    """
+
+    def __init__(self, strategy: Optional[CrawlStrategy] = None, maxsize: int = 0):
+        self.strategy = strategy or FifoStrategy()
+        self._counter = itertools.count()
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._queue = []
+
+    def _put(self, item: Tuple[str, int]):
+        url, depth = item
+        heapq.heappush(
+            self._queue,
+            (self.strategy.score(url, depth), next(self._counter), url, depth),
+        )
+
+    def _get(self) -> Tuple[str, int]:
+        _, _, url, depth = heapq.heappop(self._queue)
+        return url, depth
@@ -0,0 +1,114 @@
+import asyncio
+import heapq
+import itertools
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+JobFactory = Callable[[], Awaitable[None]]
+
+
+class QueueFullError(Exception):
+    """The run queue holds max_queued jobs already"""
+
+
+class JobManager:
+    """
+    Admission control for crawl tasks.
+    At most max_running crawls run at once, the others wait in a bounded
+    run queue: higher priority first, equal priorities in submit order.
+    Queued jobs are started as running ones finish. Cancelling a running
+    job cancels its task, so the crawler stops its workers and closes
+    their tabs before cancel() returns.
+    """
+
+    def __init__(
+        self, max_running: Optional[int] = None, max_queued: Optional[int] = None
+    ):
+        self.max_running = max_running or settings.MAX_RUNNING_JOBS
+        self.max_queued = settings.MAX_QUEUED_JOBS if max_queued is None else max_queued
+        self._queued: List[Tuple[int, int, str, JobFactory]] = []
+        # task_id -> sequence number of its live entry in the heap
+        self._queued_ids: Dict[str, int] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._counter = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queued_ids)
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def is_active(self, task_id: str) -> bool:
+        return task_id in self._queued_ids or task_id in self._running
+
+    def submit(self, task_id: str, factory: JobFactory, priority: int = 0):
+        """
+        Queues a job, factory() returns the crawl coroutine once it may run.
+        Raises QueueFullError when the run queue is full.
+        """
+        if self.is_active(task_id):
+            return
+        if self.queued >= self.max_queued:
+            raise QueueFullError(f"{self.queued} jobs are already queued")
+
+        seq = next(self._counter)
+        heapq.heappush(self._queued, (-priority, seq, task_id, factory))
+        self._queued_ids[task_id] = seq
+        logger.info(
+            f"Job {task_id} queued with priority {priority} "
+            f"({self.running} running, {self.queued} queued)",
+            extra={"task_id": task_id},
+        )
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queued and self.running < self.max_running:
+            _, seq, task_id, factory = heapq.heappop(self._queued)
+            if self._queued_ids.get(task_id) != seq:
+                # Cancelled while queued
+                continue
+            del self._queued_ids[task_id]
+            self._running[task_id] = asyncio.create_task(self._run(task_id, factory))
+
+    async def _run(self, task_id: str, factory: JobFactory):
+        try:
+            await factory()
+        except asyncio.CancelledError:
+            logger.info(f"Job {task_id} cancelled", extra={"task_id": task_id})
+        except Exception as e:
+            logger.exception(f"Job {task_id} failed: {e}", extra={"task_id": task_id})
+        finally:
+            self._running.pop(task_id, None)
+            self._dispatch()
+
+    async def cancel(self, task_id: str) -> bool:
+        """Drops a queued job or stops a running one, False if neither"""
+        if task_id in self._queued_ids:
+            del self._queued_ids[task_id]
+            return True
+
+        task = self._running.get(task_id)
+        if task is None:
+            return False
+        task.cancel()
+        await asyncio.wait({task})
+        return True
+
+    async def close(self):
+        """Drops queued jobs and cancels running ones"""
+        self._queued.clear()
+        self._queued_ids.clear()
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+
+job_manager = JobManager()
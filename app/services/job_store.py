@@ -1,62 +1,164 @@
 import asyncio
+import copy
 import json
+import logging
 import os
+import time
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Set
 
-import aiofiles
+from app.core.config import settings
+from app.core.metrics import JOB_STORE_UPDATE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
 
 
 class JobStore:
-    def __init__(self, storage_path: str = "./storage/tasks"):
+    """
+    In-memory registry of tasks, persisted as one JSON file per task.
+    Progress updates only touch memory and are flushed in batches every
+    flush_interval seconds; creation and status changes are flushed at once.
+    Only tasks this process is running are held in memory: a task is
+    dropped once its final state is on disk, and tasks of other processes
+    are read from their file on every lookup.
+    Files are written to a temp file and renamed, so readers never see a
+    half-written task.
+    Subscribers get every update as a delta, straight from memory.
+    """
+
+    def __init__(
+        self,
+        storage_path: str = "./storage/tasks",
+        flush_interval: Optional[float] = None,
+    ):
         self.storage_path = storage_path
+        self.flush_interval = (
+            settings.JOB_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
         os.makedirs(storage_path, exist_ok=True)
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._last_flush = time.monotonic()
         self._lock = asyncio.Lock()
 
     def _get_path(self, task_id: str) -> str:
         return os.path.join(self.storage_path, f"{task_id}.json")
 
+    def artifact_path(self, task_id: str, suffix: str) -> str:
+        """Path of a file kept next to the task file, e.g. its crawl trace"""
+        return os.path.join(self.storage_path, f"{task_id}{suffix}")
+
     async def create_job(self, task_id: str, init_data: Dict[str, Any]):
-        """Creates task file id with initial data"""
+        """Registers a task with initial data and writes its file"""
         init_data["created_at"] = datetime.now().isoformat()
         init_data["updated_at"] = datetime.now().isoformat()
-        filepath = self._get_path(task_id)
 
-        async with self._lock:
-            async with aiofiles.open(filepath, "w", encoding="utf-8") as f:
-                await f.write(json.dumps(init_data, indent=2))
+        self._jobs[task_id] = dict(init_data)
+        self._dirty.add(task_id)
+        await self.flush()
 
     async def update_job(self, task_id: str, updates: Dict[str, Any]):
-        """Updates existing task file"""
-        async with self._lock:
-            current_data = await self._read_job_file(task_id)
+        """Updates a task in memory, the file follows on the next flush"""
+        started = time.perf_counter()
+        current_data = self._jobs.get(task_id) or self._read_job_file(task_id)
+        if not current_data:
+            return
 
-            if not current_data:
-                return
+        current_data.update(updates)
+        current_data["updated_at"] = datetime.now().isoformat()
+        self._jobs[task_id] = current_data
+        self._dirty.add(task_id)
+        self.publish(task_id, updates)
 
-            current_data.update(updates)
-            current_data["updated_at"] = datetime.now().isoformat()
-
-            filepath = self._get_path(task_id)
-            async with aiofiles.open(filepath, "w", encoding="utf-8") as f:
-                await f.write(json.dumps(current_data, indent=2))
+        if "status" in updates:
+            await self.flush()
+        else:
+            await self.maybe_flush()
+        JOB_STORE_UPDATE_SECONDS.observe(time.perf_counter() - started)
 
     async def get_job(self, task_id: str) -> Optional[Dict[str, Any]]:
-        """Reads existing task file (public method)"""
+        """Returns a copy of the task, read from disk if it isn't in memory"""
+        job = self._jobs.get(task_id)
+        if job is None:
+            return self._read_job_file(task_id)
+        return copy.deepcopy(job)
+
+    def subscribe(self, task_id: str, maxsize: int = 100) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.setdefault(task_id, []).append(queue)
+        return queue
+
+    def unsubscribe(self, task_id: str, queue: asyncio.Queue):
+        queues = self._subscribers.get(task_id, [])
+        if queue in queues:
+            queues.remove(queue)
+        if not queues:
+            self._subscribers.pop(task_id, None)
+
+    def publish(self, task_id: str, event: Dict[str, Any]):
+        """
+        Pushes a delta to the task's subscribers without persisting it.
+        A subscriber that falls behind loses its oldest events, not the newest.
+        """
+        for queue in self._subscribers.get(task_id, []):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(dict(event))
+
+    async def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self):
+        """Writes every task changed since the last flush"""
         async with self._lock:
-            return await self._read_job_file(task_id)
+            self._last_flush = time.monotonic()
+            if not self._dirty:
+                return
+            batch = {
+                task_id: json.dumps(self._jobs[task_id], indent=2)
+                for task_id in self._dirty
+            }
+            self._dirty = set()
+            await asyncio.to_thread(self._write, batch)
+
+            for task_id in batch:
+                job = self._jobs.get(task_id)
+                if (
+                    job is not None
+                    and job.get("status") in FINISHED_STATUSES
+                    and task_id not in self._dirty
+                ):
+                    del self._jobs[task_id]
 
-    async def _read_job_file(self, task_id: str) -> Optional[Dict[str, Any]]:
-        """Internal helper to read file without locking logic"""
+    def _write(self, batch: Dict[str, str]):
+        for task_id, content in batch.items():
+            filepath = self._get_path(task_id)
+            tmp_path = f"{filepath}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, filepath)
+
+    def _read_job_file(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Loads a task written by an earlier run"""
         filepath = self._get_path(task_id)
         if not os.path.exists(filepath):
             return None
 
         try:
-            async with aiofiles.open(filepath, "r", encoding="utf-8") as f:
-                content = await f.read()
+            with open(filepath, "r", encoding="utf-8") as f:
+                content = f.read()
                 if not content:
                     return None
                 return json.loads(content)
         except json.JSONDecodeError:
             return None
+
+    async def close(self):
+        await self.flush()
+
+
+job_store = JobStore()
@@ -0,0 +1,105 @@
+import os
+from typing import List, Optional, Tuple
+
+BLOCK_SIZE = 8192
+MAX_FOLLOW_BYTES = 1024 * 1024
+
+
+def line_matches(
+    line: str, task_id: Optional[str] = None, level: Optional[str] = None
+) -> bool:
+    if task_id and task_id not in line:
+        return False
+    if level:
+        level = level.upper()
+        # Text and JSON-lines formats
+        if f" - {level} - " not in line and f'"level": "{level}"' not in line:
+            return False
+    return True
+
+
+def tail(
+    path: str,
+    limit: int,
+    before: Optional[int] = None,
+    task_id: Optional[str] = None,
+    level: Optional[str] = None,
+    block_size: int = BLOCK_SIZE,
+) -> Tuple[List[str], int, int]:
+    """
+    Last `limit` matching lines that start before byte offset `before`
+    (end of file by default), read backwards block by block.
+    Returns the lines oldest first, the offset of the oldest one, which is
+    the `before` of the previous page, and the offset reading started at,
+    which is where following new lines continues from.
+    """
+    matched: List[str] = []
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell() if before is None else min(before, f.tell())
+        end = cursor = position
+        remainder = b""
+
+        while position > 0 and len(matched) < limit:
+            size = min(block_size, position)
+            position -= size
+            f.seek(position)
+            chunk = f.read(size) + remainder
+
+            raw_lines = chunk.split(b"\n")
+            # First piece may be the tail of a line that starts further back
+            remainder = raw_lines.pop(0) if position > 0 else b""
+
+            offset = position + (len(remainder) + 1 if position > 0 else 0)
+            starts = []
+            for raw in raw_lines:
+                starts.append(offset)
+                offset += len(raw) + 1
+
+            for start, raw in zip(reversed(starts), reversed(raw_lines)):
+                cursor = start
+                line = raw.decode("utf-8", errors="ignore").strip()
+                if line and line_matches(line, task_id, level):
+                    matched.append(line)
+                    if len(matched) >= limit:
+                        break
+
+        if position == 0 and len(matched) < limit:
+            cursor = 0
+
+    matched.reverse()
+    return matched, cursor, end
+
+
+def read_since(
+    path: str,
+    offset: int,
+    task_id: Optional[str] = None,
+    level: Optional[str] = None,
+    limit: Optional[int] = None,
+    max_bytes: int = MAX_FOLLOW_BYTES,
+) -> Tuple[List[str], int]:
+    """
+    First `limit` (default all) complete matching lines written after byte
+    offset `offset`. Returns them with the offset to continue from.
+    A file smaller than the offset was rotated, so reading starts over.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell() < offset:
+            offset = 0
+        f.seek(offset)
+        chunk = f.read(max_bytes)
+
+    # Leave a line that is still being written for the next call
+    complete = chunk[: chunk.rfind(b"\n") + 1]
+    matched: List[str] = []
+    for raw in complete.split(b"\n")[:-1]:
+        if limit is not None and len(matched) >= limit:
+            break
+        offset += len(raw) + 1
+        line = raw.decode("utf-8", errors="ignore").strip()
+        if line and line_matches(line, task_id, level):
+            matched.append(line)
+    return matched, offset
@@ -0,0 +1,175 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class CrawlManifest:
+    """
+    Per-URL record of what the previous crawls saw (SQLite).
+    Keeps HTTP validators (ETag / Last-Modified), the sitemap <lastmod>,
+    hashes of the raw HTML and of the produced Markdown, and the page's
+    links, so an unchanged page can be skipped without parsing it and
+    still be expanded.
+    Pages belong to the scope (canonical start URL) of the crawl that
+    last reached them, so crawls of one host from different start URLs
+    only prune their own pages.
+    Writes are buffered and flushed every `flush_interval` seconds.
+    """
+
+    def __init__(self, path: Optional[str] = None, flush_interval: float = 5.0):
+        self.path = path or settings.MANIFEST_PATH
+        self.flush_interval = flush_interval
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pending: Dict[str, Tuple] = {}
+        self._last_flush = time.monotonic()
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                "url TEXT PRIMARY KEY, host TEXT NOT NULL, etag TEXT, "
+                "last_modified TEXT, html_hash TEXT, content_hash TEXT, "
+                "links TEXT, last_task TEXT, lastmod TEXT, scope TEXT)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+            if "lastmod" not in columns:
+                self._conn.execute("ALTER TABLE pages ADD COLUMN lastmod TEXT")
+            if "scope" not in columns:
+                # Rows of older crawls have no scope and are never pruned
+                self._conn.execute("ALTER TABLE pages ADD COLUMN scope TEXT")
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS pages_scope ON pages (scope, last_task)"
+            )
+            # Depth of the last crawl that pruned the scope
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS scopes ("
+                "scope TEXT PRIMARY KEY, max_depth INTEGER)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        if url in self._pending:
+            row = self._pending[url]
+        else:
+            row = self.conn.execute(
+                "SELECT url, host, etag, last_modified, html_hash, content_hash, "
+                "links, last_task, lastmod FROM pages WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+
+        return {
+            "etag": row[2],
+            "last_modified": row[3],
+            "html_hash": row[4],
+            "content_hash": row[5],
+            "links": json.loads(row[6] or "[]"),
+            "lastmod": row[8],
+        }
+
+    def record(
+        self,
+        url: str,
+        scope: str,
+        task_id: str,
+        html_hash: Optional[str],
+        content_hash: Optional[str],
+        links: List[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        lastmod: Optional[str] = None,
+    ):
+        self._pending[url] = (
+            url,
+            urlparse(url).netloc,
+            etag,
+            last_modified,
+            html_hash,
+            content_hash,
+            json.dumps(links),
+            task_id,
+            lastmod,
+            scope,
+        )
+
+    async def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self):
+        async with self._write_lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            batch, self._pending = list(self._pending.values()), {}
+            await asyncio.to_thread(self._write, batch)
+
+    def _write(self, batch: List[Tuple]):
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (url, host, etag, last_modified, "
+                "html_hash, content_hash, links, last_task, lastmod, scope) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+
+    def crawl_depth(self, scope: str) -> Optional[int]:
+        """max_depth of the last complete crawl of the scope"""
+        row = self.conn.execute(
+            "SELECT max_depth FROM scopes WHERE scope = ?", (scope,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    async def prune(self, scope: str, task_id: str, max_depth: int) -> int:
+        """
+        Forgets pages of the scope the given crawl did not reach, returns
+        count. Only valid after a complete crawl, which becomes the scope's
+        reference depth: shallower crawls must not prune.
+        """
+        await self.flush()
+        async with self._write_lock:
+            return await asyncio.to_thread(
+                self._delete_stale, scope, task_id, max_depth
+            )
+
+    def _delete_stale(self, scope: str, task_id: str, max_depth: int) -> int:
+        with self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM pages WHERE scope = ? AND last_task != ?",
+                (scope, task_id),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scopes (scope, max_depth) VALUES (?, ?)",
+                (scope, max_depth),
+            )
+        return cursor.rowcount
+
+    async def close(self):
+        await self.flush()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+crawl_manifest = CrawlManifest()
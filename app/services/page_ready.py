@@ -0,0 +1,144 @@
+import json
+import logging
+import time
+from typing import List, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+from app.services.fetcher import NON_VISIBLE_RE, TAG_RE
+
+logger = logging.getLogger(__name__)
+
+READY = "ready"
+TIMEOUT = "timeout"
+
+# Visible text of a challenge or error page stays below this
+BLOCK_PAGE_MAX_TEXT = 1000
+
+# Resolves once the document is loaded, the optional site selector is
+# present and no node was added or removed and no network request happened
+# for quietMs. Attribute changes (carousels, tickers) are not activity, and
+# the quiet window is given up maxQuietMs after the page is otherwise ready.
+# Everything runs in the page, nothing is pulled over CDP.
+READY_SCRIPT = """
+new Promise((resolve) => {
+    const timeoutMs = %(timeout_ms)d;
+    const quietMs = %(quiet_ms)d;
+    const maxQuietMs = %(max_quiet_ms)d;
+    const selector = %(selector)s;
+    const started = Date.now();
+    let lastActivity = started;
+    let loadedAt = null;
+    const touch = () => { lastActivity = Date.now(); };
+
+    const mutations = new MutationObserver(touch);
+    mutations.observe(document, { childList: true, subtree: true });
+    let network = null;
+    try {
+        network = new PerformanceObserver(touch);
+        network.observe({ type: "resource" });
+    } catch (e) {}
+
+    const finish = (state) => {
+        clearInterval(timer);
+        mutations.disconnect();
+        if (network) network.disconnect();
+        resolve(state);
+    };
+    const timer = setInterval(() => {
+        if (Date.now() - started >= timeoutMs) return finish("timeout");
+        if (location.href === "about:blank") return;
+        if (document.readyState !== "complete") return;
+        if (selector && !document.querySelector(selector)) return;
+        if (loadedAt === null) loadedAt = Date.now();
+        const quiet = Date.now() - lastActivity >= quietMs;
+        if (quiet || Date.now() - loadedAt >= maxQuietMs) finish("ready");
+    }, 50);
+})
+"""
+
+
+# In-page twin of looks_blocked(): a block indicator in the markup and
+# little visible text. Only a boolean comes back over CDP.
+BLOCKED_SCRIPT = """
+(() => {
+    const indicators = %(indicators)s;
+    const html = document.documentElement ? document.documentElement.outerHTML : "";
+    if (!indicators.some((indicator) => html.includes(indicator))) return false;
+    const text = document.body ? document.body.innerText : "";
+    return text.split(/\\s+/).join(" ").trim().length < %(max_text)d;
+})()
+"""
+
+
+def get_ready_selector(url: str) -> Optional[str]:
+    """Per-site CSS selector from READY_SELECTORS, keyed by host"""
+    return settings.READY_SELECTORS.get(urlparse(url).netloc)
+
+
+def looks_blocked(html: str, block_indicators: List[str]) -> bool:
+    """
+    Challenge or error page: a block indicator on a page with little
+    visible text. Real pages that merely mention one are kept.
+    """
+    if not any(indicator in html for indicator in block_indicators):
+        return False
+    text = TAG_RE.sub(" ", NON_VISIBLE_RE.sub(" ", html))
+    return len(" ".join(text.split())) < BLOCK_PAGE_MAX_TEXT
+
+
+async def wait_until_ready(
+    tab, url: str, block_indicators: Optional[List[str]] = None
+) -> str:
+    """
+    Waits for the page to settle instead of sleeping a fixed time.
+    Returns "ready", or "timeout" once PAGE_LOAD_TIMEOUT is spent.
+    A settled page that still shows a challenge is waited on in the same
+    tab, since JS challenges clear themselves and navigate; the caller
+    classifies the final HTML with looks_blocked().
+    """
+    deadline = time.monotonic() + settings.PAGE_LOAD_TIMEOUT
+    selector = get_ready_selector(url)
+    blocked_script = BLOCKED_SCRIPT % {
+        "indicators": json.dumps(block_indicators or []),
+        "max_text": BLOCK_PAGE_MAX_TEXT,
+    }
+
+    while (remaining := deadline - time.monotonic()) > 0:
+        script = READY_SCRIPT % {
+            "timeout_ms": remaining * 1000,
+            "quiet_ms": settings.PAGE_QUIET_WINDOW * 1000,
+            "max_quiet_ms": settings.PAGE_QUIET_MAX_WAIT * 1000,
+            "selector": json.dumps(selector),
+        }
+        try:
+            state = await tab.evaluate(script, await_promise=True, return_by_value=True)
+        except Exception as e:
+            # Navigation (e.g. after a challenge page) destroys the context
+            logger.debug(f"Readiness check interrupted for {url}: {e}")
+            state = None
+
+        if state == TIMEOUT:
+            return state
+        if state == READY:
+            if not block_indicators or not await _shows_challenge(
+                tab, url, blocked_script
+            ):
+                return state
+            logger.debug(f"Challenge page on {url}, waiting for it to clear")
+
+        await tab.sleep(0.1)
+
+    return TIMEOUT
+
+
+async def _shows_challenge(tab, url: str, script: str) -> bool:
+    try:
+        return (
+            await tab.evaluate(script, await_promise=False, return_by_value=True)
+            is True
+        )
+    except Exception as e:
+        # The challenge navigating away destroys the context
+        logger.debug(f"Challenge check interrupted for {url}: {e}")
+        return True
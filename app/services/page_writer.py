@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Histogram
+
+from app.core.config import settings
+from app.services.base import BaseStorageBackend
+from app.services.crawl_trace import CrawlTrace
+
+logger = logging.getLogger(__name__)
+
+OnWritten = Optional[Callable[[], None]]
+WriteItem = Tuple[BaseStorageBackend, str, str, OnWritten]
+
+
+class PageWriter:
+    """
+    Writer stage between the crawl workers and storage.
+    Workers put page outputs on a bounded queue and move on to the next
+    URL; one writer task drains the queue in batches and hands each backend
+    all of its files from a batch in a single save_many call.
+    When the disk lags the queue fills up and put() waits, so workers slow
+    down to the pace of the writes instead of piling up pages in memory.
+    An item's on_written callback runs once its file is saved, never when
+    the write failed.
+    """
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        fsync: Optional[bool] = None,
+        write_seconds: Optional[Histogram] = None,
+        trace: Optional[CrawlTrace] = None,
+    ):
+        self.batch_size = batch_size or settings.WRITE_BATCH_SIZE
+        self.fsync = settings.WRITE_FSYNC if fsync is None else fsync
+        self.queue: asyncio.Queue = asyncio.Queue(
+            max_queue or settings.WRITE_QUEUE_SIZE
+        )
+        # Per-task child of STORAGE_WRITE_SECONDS
+        self.write_seconds = write_seconds
+        self.trace = trace or CrawlTrace()
+        self._task: Optional[asyncio.Task] = None
+        self.written = 0
+        self.failed = 0
+        self.stalls = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="writer")
+
+    async def put(
+        self,
+        storage: BaseStorageBackend,
+        filename: str,
+        content: str,
+        on_written: OnWritten = None,
+    ):
+        if self.queue.full():
+            self.stalls += 1
+            logger.debug("Write queue full, waiting for the disk")
+        await self.queue.put((storage, filename, content, on_written))
+
+    async def _run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _write(self, batch: List[WriteItem]):
+        groups: Dict[int, Tuple[BaseStorageBackend, List[Tuple[str, str]], list]] = {}
+        for storage, filename, content, on_written in batch:
+            _, items, callbacks = groups.setdefault(id(storage), (storage, [], []))
+            items.append((filename, content))
+            if on_written is not None:
+                callbacks.append(on_written)
+
+        start = time.perf_counter()
+        for storage, items, callbacks in groups.values():
+            try:
+                await storage.save_many(items, fsync=self.fsync)
+                self.written += len(items)
+            except Exception as e:
+                self.failed += len(items)
+                logger.exception(f"Failed to write {len(items)} files: {e}")
+                continue
+            for on_written in callbacks:
+                try:
+                    on_written()
+                except Exception as e:
+                    logger.exception(f"Write callback failed: {e}")
+        elapsed = time.perf_counter() - start
+        if self.write_seconds is not None:
+            self.write_seconds.observe(elapsed)
+        self.trace.add("write_batch", None, start, files=len(batch))
+        logger.debug(
+            f"Wrote {len(batch)} files in {elapsed:.3f}s",
+            extra={"write_time": round(elapsed, 4)},
+        )
+
+    async def close(self):
+        """Waits for the queued writes, then stops the writer task"""
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self.queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
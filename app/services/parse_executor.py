@@ -0,0 +1,114 @@
+import asyncio
+import cProfile
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.base import BaseParserService
+from app.services.dedup import simhash
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_MODES = ("process", "thread", "inline")
+
+
+def _run_parse(
+    parser: BaseParserService,
+    html: str,
+    fingerprint: bool = False,
+    profile: bool = False,
+) -> Dict[str, Any]:
+    """Executed inside the pool. Must stay module-level to be picklable."""
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    if profile:
+        profiler = cProfile.Profile()
+        result = profiler.runcall(parser.parse_sync, html, timings)
+        profiler.create_stats()
+        result["parse_profile"] = profiler.stats
+    else:
+        result = parser.parse_sync(html, timings)
+    if fingerprint:
+        result["simhash"] = simhash(result["content"])
+    result["parse_time"] = time.perf_counter() - started
+    result["parse_timings"] = timings
+    return result
+
+
+class ParseExecutor:
+    """
+    Runs CPU-bound HTML parsing outside of the event loop.
+    Modes: "process" (default, sized to CPU cores), "thread" or "inline".
+    """
+
+    def __init__(self, mode: Optional[str] = None, max_workers: Optional[int] = None):
+        self.mode = (mode or settings.PARSE_EXECUTOR).lower()
+        if self.mode not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown parse executor mode: {self.mode}")
+
+        self.max_workers = max_workers or settings.PARSE_WORKERS or os.cpu_count() or 1
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+
+        if self._executor is None:
+            if self.mode == "process":
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                except (OSError, NotImplementedError) as e:
+                    logger.warning(
+                        f"Process pool unavailable ({e}), falling back to threads"
+                    )
+                    self.mode = "thread"
+
+            if self.mode == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="parser"
+                )
+
+            logger.info(
+                f"Parse executor started: {self.mode} pool, {self.max_workers} workers"
+            )
+
+        return self._executor
+
+    async def parse(
+        self,
+        parser: BaseParserService,
+        html: str,
+        fingerprint: bool = False,
+        profile: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Submits raw HTML to the pool.
+        Result contains parser output plus "parse_time" in seconds, the
+        content's "simhash" when fingerprint is set, and the cProfile stats
+        of the parse as "parse_profile" when profile is set.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return _run_parse(parser, html, fingerprint, profile)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, _run_parse, parser, html, fingerprint, profile
+            )
+        except BrokenProcessPool:
+            logger.warning("Parse process pool is broken, it will be recreated")
+            self.shutdown()
+            raise
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+parse_executor = ParseExecutor()
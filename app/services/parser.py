@@ -1,13 +1,21 @@
 import re
-from typing import Any, Dict
+import time
+from typing import Any, Dict, List, Optional
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, CData, NavigableString, Tag
+from markdownify import MarkdownConverter
 from markdownify import markdownify as md
 
+from app.core.config import settings
 from app.services.base import BaseParserService
 
+HAS_TEXT = 1
+HAS_IMG = 2
+
 
 class HtmlToMarkdownParser(BaseParserService):
+    FEATURES = "html.parser"
+
     def __init__(self):
         self.TAGS_TO_REMOVE = [
             "script",
@@ -24,41 +32,123 @@ class HtmlToMarkdownParser(BaseParserService):
             "input",
             "img",
         ]
+        self.EMPTY_CONTAINER_TAGS = {"div", "span"}
+        self.AD_CLASSES = {"ad", "advertisement", "cookie-banner"}
 
     async def parse(self, html: str) -> Dict[str, Any]:
         """
         Essential pipeline: HTML -> Clean HTML -> Markdown
         """
-        soup = BeautifulSoup(html, "html.parser")
+        return self.parse_sync(html)
+
+    def parse_sync(
+        self, html: str, timings: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Blocking version of parse.
+        Used by ParseExecutor to run parsing outside of the event loop.
+        When given, timings receives the seconds spent in the soup phase
+        (DOM, metadata, links, cleanup) and in the markdown phase.
+        """
+        started = time.perf_counter()
+        soup = BeautifulSoup(html, self.FEATURES)
 
         title = soup.title.string if soup.title else "No Title"
+        if title is not None:
+            # Plain str: a NavigableString keeps the whole tree alive when pickled
+            title = str(title)
         metadata = self._extract_metadata(soup)
+        # Before cleaning: navigation links are dropped together with <nav>
+        links = self._extract_links(soup)
 
-        cleaned_soup = await self.clean(soup)
+        cleaned_soup = self._clean(soup)
+        soup_done = time.perf_counter()
 
-        markdown_content = md(str(cleaned_soup), heading_style="ATX", strip=["a"])
+        markdown_content = self._to_markdown(cleaned_soup)
 
         clean_markdown = self._post_process_markdown(markdown_content)
 
-        return {"title": title, "metadata": metadata, "content": clean_markdown}
+        if timings is not None:
+            timings["soup"] = soup_done - started
+            timings["markdown"] = time.perf_counter() - soup_done
+
+        return {
+            "title": title,
+            "metadata": metadata,
+            "content": clean_markdown,
+            "links": links,
+        }
 
     async def clean(self, soup: BeautifulSoup) -> BeautifulSoup:
         """
         Clean DOM-tree.
         Remove duplicate content (headers, footers, navigation)
         """
-        for tag in soup(self.TAGS_TO_REMOVE):
-            tag.decompose()
+        return self._clean(soup)
 
-        for tag in soup.find_all(["div", "span"]):
-            if not tag.get_text(strip=True) and not tag.find("img"):
+    def _clean(self, soup: BeautifulSoup) -> BeautifulSoup:
+        """
+        Single bottom-up traversal.
+        Descendants are visited in reverse document order, so every tag is
+        seen after its whole subtree and decides from flags its children
+        pushed up (HAS_TEXT / HAS_IMG) instead of re-scanning the subtree.
+        Rules, in the order they used to be applied as separate passes:
+          1. TAGS_TO_REMOVE are dropped together with their content;
+          2. div/span without visible text and without images are dropped;
+          3. ad/cookie-banner blocks are dropped. Their text still counts
+             for the parent, as it did when this ran after rule 2.
+        """
+        tags_to_remove = set(self.TAGS_TO_REMOVE)
+        flags: Dict[int, int] = {}
+        to_remove = []
+
+        for node in reversed(list(soup.descendants)):
+            parent_id = id(node.parent)
+
+            if not isinstance(node, Tag):
+                # Same strings get_text() takes into account: no comments,
+                # doctype, script or template strings
+                if type(node) in (NavigableString, CData) and node.strip():
+                    flags[parent_id] = flags.get(parent_id, 0) | HAS_TEXT
+                continue
+
+            if node.name in tags_to_remove:
+                flags.pop(id(node), None)
+                to_remove.append(node)
+                continue
+
+            node_flags = flags.pop(id(node), 0)
+            if node.name == "img":
+                node_flags |= HAS_IMG
+
+            if node.name in self.EMPTY_CONTAINER_TAGS and not node_flags:
+                to_remove.append(node)
+                continue
+
+            if self._is_ad(node):
+                to_remove.append(node)
+
+            if node_flags:
+                flags[parent_id] = flags.get(parent_id, 0) | node_flags
+
+        # Outermost first, nested removals are already gone with their parent
+        for tag in reversed(to_remove):
+            if not tag.decomposed:
                 tag.decompose()
 
-        for tag in soup.select(".ad, .advertisement, .cookie-banner"):
-            tag.decompose()
-
         return soup
 
+    def _is_ad(self, tag: Tag) -> bool:
+        classes = tag.get("class")
+        if not classes:
+            return False
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not self.AD_CLASSES.isdisjoint(classes)
+
+    def _to_markdown(self, soup: BeautifulSoup) -> str:
+        return md(str(soup), heading_style="ATX", strip=["a"])
+
     def _extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
         """Extracts description and keywords for RAG"""
         meta = {}
@@ -68,5 +158,39 @@ class HtmlToMarkdownParser(BaseParserService):
             meta["keywords"] = keywords.get("content", "")
         return meta
 
+    def _extract_links(self, soup: BeautifulSoup) -> List[str]:
+        """Raw href values, resolving them is up to the crawler"""
+        return [str(a["href"]) for a in soup.find_all("a", href=True)]
+
     def _post_process_markdown(self, text: str) -> str:
         return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+class LxmlHtmlToMarkdownParser(HtmlToMarkdownParser):
+    """
+    Same pipeline on top of the C-backed lxml tree builder.
+    The cleaned tree goes to markdownify directly instead of being
+    serialized and parsed a second time with html.parser.
+    """
+
+    FEATURES = "lxml"
+
+    def _to_markdown(self, soup: BeautifulSoup) -> str:
+        # Decomposed tags leave adjacent strings behind, merge them the way
+        # a re-parse would, markdownify's whitespace handling depends on it
+        soup.smooth()
+        return MarkdownConverter(heading_style="ATX", strip=["a"]).convert_soup(soup)
+
+
+PARSER_BACKENDS = {
+    "html.parser": HtmlToMarkdownParser,
+    "lxml": LxmlHtmlToMarkdownParser,
+}
+
+
+def get_parser(backend: Optional[str] = None) -> BaseParserService:
+    """Builds parser selected by PARSER_BACKEND setting"""
+    backend = backend or settings.PARSER_BACKEND
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    return PARSER_BACKENDS[backend]()
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from app.core.config import settings
+from app.services.fetcher import http_fetcher
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+THROTTLED = "throttled"
+BLOCKED = "blocked"
+ERROR = "error"
+
+
+class TokenBucket:
+    """
+    Rate limiter that hands out reservations: a request that finds the
+    bucket empty is told how long to wait instead of polling for a token.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class HostState:
+    def __init__(self, max_concurrency: int, rate: float, burst: int):
+        self.max_concurrency = max_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.bucket = TokenBucket(rate, burst)
+        self.backoff_until = 0.0
+        self.failures = 0
+        self.robots: Optional[RobotFileParser] = None
+        self.robots_expires = 0.0
+        self.robots_lock = asyncio.Lock()
+        self.condition = asyncio.Condition()
+
+
+class PolitenessScheduler:
+    """
+    Per-host admission for the crawler workers.
+    Each host gets a token bucket (HOST_RATE_LIMIT, or the robots.txt
+    Crawl-delay when stricter) and an AIMD concurrency limit: every success
+    raises it a little up to HOST_MAX_CONCURRENCY, every 429/503, block page
+    or fetch error halves it and pushes the host into exponential backoff.
+    """
+
+    def __init__(
+        self,
+        fetch_text: Optional[Callable[[str], Awaitable[Optional[str]]]] = None,
+        max_concurrency: Optional[int] = None,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        respect_robots: Optional[bool] = None,
+        robots_ttl: Optional[float] = None,
+    ):
+        self.fetch_text = fetch_text
+        self.max_concurrency = max_concurrency or settings.HOST_MAX_CONCURRENCY
+        self.rate = rate or settings.HOST_RATE_LIMIT
+        self.burst = burst or settings.HOST_BURST
+        self.respect_robots = (
+            settings.RESPECT_ROBOTS_TXT if respect_robots is None else respect_robots
+        )
+        self.robots_ttl = (
+            settings.ROBOTS_CACHE_TTL if robots_ttl is None else robots_ttl
+        )
+        self._hosts: Dict[str, HostState] = {}
+
+    def host(self, url: str) -> HostState:
+        netloc = urlparse(url).netloc
+        if netloc not in self._hosts:
+            self._hosts[netloc] = HostState(self.max_concurrency, self.rate, self.burst)
+        return self._hosts[netloc]
+
+    async def allowed(self, url: str) -> bool:
+        """robots.txt check, the file is fetched once per host and TTL"""
+        if not self.respect_robots or self.fetch_text is None:
+            return True
+        robots = await self._robots(url)
+        return robots.can_fetch(settings.ROBOTS_USER_AGENT, url)
+
+    async def _robots(self, url: str) -> RobotFileParser:
+        host = self.host(url)
+        async with host.robots_lock:
+            if host.robots is not None and time.monotonic() < host.robots_expires:
+                return host.robots
+
+            parsed = urlparse(url)
+            robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+            robots = RobotFileParser(robots_url)
+            # Missing or unreachable robots.txt allows everything
+            robots.parse((await self.fetch_text(robots_url) or "").splitlines())
+
+            # Crawl-delay may have changed or gone since an earlier fetch
+            delay = robots.crawl_delay(settings.ROBOTS_USER_AGENT)
+            if delay and 1 / float(delay) < self.rate:
+                rate, burst = 1 / float(delay), 1
+            else:
+                rate, burst = self.rate, self.burst
+            if rate != host.bucket.rate:
+                if rate < self.rate:
+                    logger.info(f"Crawl-delay {delay}s for {parsed.netloc}")
+                host.bucket = TokenBucket(rate, burst)
+
+            host.robots = robots
+            host.robots_expires = time.monotonic() + self.robots_ttl
+            return robots
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[None]:
+        """Waits for a free connection, the backoff and a token of the host"""
+        host = self.host(url)
+        async with host.condition:
+            await host.condition.wait_for(lambda: host.in_flight < int(host.limit))
+            host.in_flight += 1
+        try:
+            backoff = host.backoff_until - time.monotonic()
+            if backoff > 0:
+                await asyncio.sleep(backoff)
+            await asyncio.sleep(host.bucket.reserve())
+            yield
+        finally:
+            async with host.condition:
+                host.in_flight -= 1
+                host.condition.notify_all()
+
+    def report(self, url: str, outcome: str, retry_after: Optional[float] = None):
+        host = self.host(url)
+        if outcome == OK:
+            host.failures = 0
+            host.limit = min(host.max_concurrency, host.limit + 1 / host.limit)
+            return
+
+        host.failures += 1
+        host.limit = max(1.0, host.limit / 2)
+        if retry_after is None:
+            retry_after = min(
+                settings.BACKOFF_MAX,
+                settings.BACKOFF_BASE * 2 ** (host.failures - 1),
+            ) * random.uniform(0.5, 1.0)
+        host.backoff_until = max(host.backoff_until, time.monotonic() + retry_after)
+        logger.warning(
+            f"{urlparse(url).netloc} {outcome}: backing off {retry_after:.1f}s, "
+            f"concurrency {int(host.limit)}",
+            extra={"url": url},
+        )
+
+
+politeness = PolitenessScheduler(fetch_text=http_fetcher.get_text)
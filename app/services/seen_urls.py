@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import math
+import os
+import sqlite3
+from typing import Iterable, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def url_fingerprint(url: str) -> int:
+    """Signed 64-bit hash of a canonical URL (fits an SQLite INTEGER)"""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 64-bit fingerprints"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, fingerprint: int):
+        # Double hashing from the two 32-bit halves of the fingerprint
+        value = fingerprint & 0xFFFFFFFFFFFFFFFF
+        first, second = value >> 32, (value & 0xFFFFFFFF) | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, fingerprint: int):
+        for position in self._positions(fingerprint):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(fingerprint)
+        )
+
+
+class SeenUrls:
+    """
+    Dedup set of the URLs a crawl has already queued.
+    Holds 64-bit fingerprints instead of URL strings. With a memory limit,
+    fingerprints beyond it are spilled to an SQLite file, with a Bloom
+    filter in front so most lookups of new URLs never touch the disk.
+    """
+
+    def __init__(
+        self,
+        memory_limit: int = 0,
+        spill_path: Optional[str] = None,
+        bloom_capacity: Optional[int] = None,
+    ):
+        self.memory_limit = memory_limit
+        self.spill_path = spill_path if memory_limit else None
+        self._recent: Set[int] = set()
+        self._count = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._bloom: Optional[BloomFilter] = None
+        if self.spill_path:
+            self._bloom = BloomFilter(bloom_capacity or settings.SEEN_BLOOM_CAPACITY)
+
+    @classmethod
+    def for_task(cls, task_id: str) -> "SeenUrls":
+        if not settings.SEEN_MEMORY_LIMIT:
+            return cls()
+        return cls(
+            memory_limit=settings.SEEN_MEMORY_LIMIT,
+            spill_path=os.path.join(settings.SEEN_SPILL_PATH, f"{task_id}.sqlite"),
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, url: str) -> bool:
+        return self._contains(url_fingerprint(url))
+
+    def _contains(self, fingerprint: int) -> bool:
+        if fingerprint in self._recent:
+            return True
+        if self._bloom is None or fingerprint not in self._bloom:
+            return False
+        return (
+            self._connection()
+            .execute("SELECT 1 FROM seen WHERE fp = ?", (fingerprint,))
+            .fetchone()
+            is not None
+        )
+
+    def add(self, url: str) -> bool:
+        """Adds the URL, returns False if it was already seen"""
+        fingerprint = url_fingerprint(url)
+        if self._contains(fingerprint):
+            return False
+
+        self._recent.add(fingerprint)
+        self._count += 1
+        if self.spill_path and len(self._recent) >= self.memory_limit:
+            self._spill()
+        return True
+
+    def update(self, urls: Iterable[str]):
+        for url in urls:
+            self.add(url)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.spill_path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.spill_path)
+            self._conn.execute("PRAGMA journal_mode=OFF")
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.execute("DROP TABLE IF EXISTS seen")
+            self._conn.execute("CREATE TABLE seen (fp INTEGER PRIMARY KEY)")
+        return self._conn
+
+    def _spill(self):
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen (fp) VALUES (?)",
+                ((fingerprint,) for fingerprint in self._recent),
+            )
+        for fingerprint in self._recent:
+            self._bloom.add(fingerprint)
+        logger.debug(f"Spilled {len(self._recent)} URL fingerprints to disk")
+        self._recent = set()
+
+    def close(self):
+        """Drops the spill file, the frontier checkpoint is the durable copy"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+            os.remove(self.spill_path)
@@ -0,0 +1,487 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Set, Tuple
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+FRONTIER_BACKENDS = ("local", "sqlite", "redis", "memory")
+
+# (url, depth, score): lower scores are claimed first
+FrontierItem = Tuple[str, int, float]
+
+
+class SharedFrontier(ABC):
+    """
+    Frontier and seen set of a task, shared by every node crawling it.
+    URLs are claimed under a lease: a claimed URL that is not completed
+    before its lease runs out (the node died or hung) goes back to the
+    queue for another node. Nodes also add up their progress counters
+    here, so each of them can report the status of the whole task.
+    """
+
+    @abstractmethod
+    async def add(self, task_id: str, items: List[FrontierItem]) -> int:
+        """Queues the URLs never seen in the task, returns how many were new"""
+
+    @abstractmethod
+    async def claim(
+        self,
+        task_id: str,
+        node_id: str,
+        limit: int,
+        lease: float,
+        max_pages: int = 0,
+    ) -> List[Tuple[str, int]]:
+        """
+        Leases up to limit queued URLs to the node, lowest score first.
+        With max_pages, no more than that many URLs are ever handed out.
+        """
+
+    @abstractmethod
+    async def renew(self, task_id: str, node_id: str, urls: List[str], lease: float):
+        """
+        Extends the leases the node still holds on urls, so pages that take
+        longer than a lease are not handed to another node meanwhile.
+        """
+
+    @abstractmethod
+    async def complete(self, task_id: str, url: str):
+        """Marks a claimed URL as done"""
+
+    @abstractmethod
+    async def progress(self, task_id: str) -> Dict[str, int]:
+        """URL counts of the task: seen, queued, in_flight and done"""
+
+    @abstractmethod
+    async def incr(self, task_id: str, counters: Dict[str, int]) -> Dict[str, int]:
+        """Adds a node's counter deltas, returns the task's totals"""
+
+    async def close(self):
+        pass
+
+
+class MemorySharedFrontier(SharedFrontier):
+    """In-process backend for tests and for several crawlers in one process"""
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._seen: Dict[str, Set[str]] = {}
+        self._queued: Dict[str, list] = {}
+        # url -> (node, depth, score, expires)
+        self._leases: Dict[str, Dict[str, Tuple[str, int, float, float]]] = {}
+        self._done: Dict[str, Set[str]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._order = itertools.count()
+
+    async def add(self, task_id: str, items: List[FrontierItem]) -> int:
+        seen = self._seen.setdefault(task_id, set())
+        queued = self._queued.setdefault(task_id, [])
+        added = 0
+        for url, depth, score in items:
+            if url in seen:
+                continue
+            seen.add(url)
+            heapq.heappush(queued, (score, next(self._order), url, depth))
+            added += 1
+        return added
+
+    async def claim(self, task_id, node_id, limit, lease, max_pages=0):
+        now = self.clock()
+        queued = self._queued.setdefault(task_id, [])
+        leases = self._leases.setdefault(task_id, {})
+        for url, (_, depth, score, expires) in list(leases.items()):
+            if expires <= now:
+                del leases[url]
+                heapq.heappush(queued, (score, next(self._order), url, depth))
+
+        if max_pages:
+            used = len(leases) + len(self._done.get(task_id, ()))
+            limit = min(limit, max_pages - used)
+
+        claimed = []
+        while queued and len(claimed) < limit:
+            score, _, url, depth = heapq.heappop(queued)
+            leases[url] = (node_id, depth, score, now + lease)
+            claimed.append((url, depth))
+        return claimed
+
+    async def renew(self, task_id, node_id, urls, lease):
+        leases = self._leases.get(task_id, {})
+        expires = self.clock() + lease
+        for url in urls:
+            held = leases.get(url)
+            if held is not None and held[0] == node_id:
+                leases[url] = (*held[:3], expires)
+
+    async def complete(self, task_id: str, url: str):
+        self._leases.get(task_id, {}).pop(url, None)
+        self._done.setdefault(task_id, set()).add(url)
+
+    async def progress(self, task_id: str) -> Dict[str, int]:
+        return {
+            "seen": len(self._seen.get(task_id, ())),
+            "queued": len(self._queued.get(task_id, ())),
+            "in_flight": len(self._leases.get(task_id, ())),
+            "done": len(self._done.get(task_id, ())),
+        }
+
+    async def incr(self, task_id: str, counters: Dict[str, int]) -> Dict[str, int]:
+        totals = self._counters.setdefault(task_id, {})
+        for name, value in counters.items():
+            totals[name] = totals.get(name, 0) + value
+        return dict(totals)
+
+
+class SqliteSharedFrontier(SharedFrontier):
+    """
+    Backend for worker processes on one host, sharing an SQLite file.
+    Claims run in BEGIN IMMEDIATE transactions, so SQLite's file lock makes
+    each claim atomic across processes.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.SHARED_FRONTIER_PATH
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None, check_same_thread=False
+            )
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS frontier ("
+                "task_id TEXT NOT NULL, url TEXT NOT NULL, depth INTEGER NOT NULL, "
+                "score REAL NOT NULL, state TEXT NOT NULL, node TEXT, "
+                "lease_until REAL, PRIMARY KEY (task_id, url))"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS frontier_state "
+                "ON frontier (task_id, state, score)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS counters ("
+                "task_id TEXT NOT NULL, name TEXT NOT NULL, value INTEGER NOT NULL, "
+                "PRIMARY KEY (task_id, name))"
+            )
+        return self._conn
+
+    def _transaction(self, work, *args):
+        with self._lock:
+            conn = self.conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(conn, *args)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+    async def add(self, task_id: str, items: List[FrontierItem]) -> int:
+        return await asyncio.to_thread(self._transaction, self._add, task_id, items)
+
+    @staticmethod
+    def _add(conn, task_id, items) -> int:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO frontier (task_id, url, depth, score, state) "
+            "VALUES (?, ?, ?, ?, 'queued')",
+            [(task_id, url, depth, score) for url, depth, score in items],
+        )
+        return conn.total_changes - before
+
+    async def claim(self, task_id, node_id, limit, lease, max_pages=0):
+        return await asyncio.to_thread(
+            self._transaction,
+            self._claim,
+            task_id,
+            node_id,
+            limit,
+            lease,
+            max_pages,
+        )
+
+    @staticmethod
+    def _claim(conn, task_id, node_id, limit, lease, max_pages):
+        now = time.time()
+        conn.execute(
+            "UPDATE frontier SET state = 'queued', node = NULL, lease_until = NULL "
+            "WHERE task_id = ? AND state = 'in_flight' AND lease_until <= ?",
+            (task_id, now),
+        )
+        if max_pages:
+            used = conn.execute(
+                "SELECT COUNT(*) FROM frontier WHERE task_id = ? AND state != 'queued'",
+                (task_id,),
+            ).fetchone()[0]
+            limit = min(limit, max_pages - used)
+        if limit <= 0:
+            return []
+
+        claimed = conn.execute(
+            "SELECT url, depth FROM frontier WHERE task_id = ? AND state = 'queued' "
+            "ORDER BY score, rowid LIMIT ?",
+            (task_id, limit),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE frontier SET state = 'in_flight', node = ?, lease_until = ? "
+            "WHERE task_id = ? AND url = ?",
+            [(node_id, now + lease, task_id, url) for url, _ in claimed],
+        )
+        return claimed
+
+    async def renew(self, task_id, node_id, urls, lease):
+        await asyncio.to_thread(
+            self._transaction, self._renew, task_id, node_id, urls, lease
+        )
+
+    @staticmethod
+    def _renew(conn, task_id, node_id, urls, lease):
+        lease_until = time.time() + lease
+        conn.executemany(
+            "UPDATE frontier SET lease_until = ? WHERE task_id = ? AND url = ? "
+            "AND state = 'in_flight' AND node = ?",
+            [(lease_until, task_id, url, node_id) for url in urls],
+        )
+
+    async def complete(self, task_id: str, url: str):
+        await asyncio.to_thread(self._transaction, self._complete, task_id, url)
+
+    @staticmethod
+    def _complete(conn, task_id, url):
+        conn.execute(
+            "UPDATE frontier SET state = 'done', lease_until = NULL "
+            "WHERE task_id = ? AND url = ?",
+            (task_id, url),
+        )
+
+    async def progress(self, task_id: str) -> Dict[str, int]:
+        return await asyncio.to_thread(self._progress, task_id)
+
+    def _progress(self, task_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT state, COUNT(*) FROM frontier WHERE task_id = ? GROUP BY state",
+                (task_id,),
+            ).fetchall()
+        counts = {"queued": 0, "in_flight": 0, "done": 0}
+        counts.update(rows)
+        counts["seen"] = sum(counts.values())
+        return counts
+
+    async def incr(self, task_id: str, counters: Dict[str, int]) -> Dict[str, int]:
+        return await asyncio.to_thread(self._transaction, self._incr, task_id, counters)
+
+    @staticmethod
+    def _incr(conn, task_id, counters) -> Dict[str, int]:
+        conn.executemany(
+            "INSERT INTO counters (task_id, name, value) VALUES (?, ?, ?) "
+            "ON CONFLICT(task_id, name) DO UPDATE SET value = value + excluded.value",
+            [(task_id, name, value) for name, value in counters.items()],
+        )
+        return dict(
+            conn.execute(
+                "SELECT name, value FROM counters WHERE task_id = ?", (task_id,)
+            ).fetchall()
+        )
+
+    async def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# Expired leases go back to the queue before new ones are handed out.
+# The queue keeps URLs by score; "meta" keeps "depth score" per URL so a
+# reclaimed URL is queued again with the score it had, "owners" the node
+# holding each lease.
+CLAIM_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, url in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], url)
+    redis.call('HDEL', KEYS[5], url)
+    local meta = redis.call('HGET', KEYS[3], url)
+    redis.call('ZADD', KEYS[1], string.match(meta, ' (.*)$'), url)
+end
+local limit = tonumber(ARGV[3])
+local max_pages = tonumber(ARGV[4])
+if max_pages > 0 then
+    local used = redis.call('ZCARD', KEYS[2]) + redis.call('SCARD', KEYS[4])
+    limit = math.min(limit, max_pages - used)
+end
+if limit <= 0 then
+    return {}
+end
+local popped = redis.call('ZPOPMIN', KEYS[1], limit)
+local claimed = {}
+for i = 1, #popped, 2 do
+    local url = popped[i]
+    redis.call('ZADD', KEYS[2], ARGV[2], url)
+    redis.call('HSET', KEYS[5], url, ARGV[5])
+    table.insert(claimed, url)
+    table.insert(claimed, redis.call('HGET', KEYS[3], url))
+end
+return claimed
+"""
+
+RENEW_SCRIPT = """
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == ARGV[1] then
+        redis.call('ZADD', KEYS[1], 'XX', ARGV[2], ARGV[i])
+    end
+end
+"""
+
+ADD_SCRIPT = """
+local added = 0
+for i = 1, #ARGV, 3 do
+    if redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+        redis.call('ZADD', KEYS[2], ARGV[i + 2], ARGV[i])
+        redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 1] .. ' ' .. ARGV[i + 2])
+        added = added + 1
+    end
+end
+return added
+"""
+
+
+class RedisSharedFrontier(SharedFrontier):
+    """
+    Backend for nodes on several hosts, on any Redis-protocol server
+    (Redis, Valkey, KeyDB...). Adds and claims are Lua scripts, so each
+    runs atomically on the server. Keys of a task share the prefix
+    frontier:{<task_id>}:, whose hash tag keeps them in one Redis Cluster
+    slot as the scripts require. They stay until removed by hand.
+    """
+
+    def __init__(self, url: Optional[str] = None, client=None):
+        self.url = url or settings.REDIS_URL
+        self.client = client or redis.from_url(self.url, decode_responses=True)
+        self._add = self.client.register_script(ADD_SCRIPT)
+        self._claim = self.client.register_script(CLAIM_SCRIPT)
+        self._renew = self.client.register_script(RENEW_SCRIPT)
+
+    @staticmethod
+    def _keys(task_id: str) -> Dict[str, str]:
+        prefix = f"frontier:{{{task_id}}}:"
+        return {
+            name: prefix + name
+            for name in (
+                "seen",
+                "queue",
+                "leases",
+                "owners",
+                "meta",
+                "done",
+                "counters",
+            )
+        }
+
+    async def add(self, task_id: str, items: List[FrontierItem]) -> int:
+        if not items:
+            return 0
+        keys = self._keys(task_id)
+        args = [value for item in items for value in item]
+        return await self._add(
+            keys=[keys["seen"], keys["queue"], keys["meta"]], args=args
+        )
+
+    async def claim(self, task_id, node_id, limit, lease, max_pages=0):
+        keys = self._keys(task_id)
+        now = time.time()
+        flat = await self._claim(
+            keys=[
+                keys["queue"],
+                keys["leases"],
+                keys["meta"],
+                keys["done"],
+                keys["owners"],
+            ],
+            args=[now, now + lease, limit, max_pages, node_id],
+        )
+        return [
+            (flat[i], int(flat[i + 1].split(" ", 1)[0])) for i in range(0, len(flat), 2)
+        ]
+
+    async def renew(self, task_id, node_id, urls, lease):
+        if not urls:
+            return
+        keys = self._keys(task_id)
+        await self._renew(
+            keys=[keys["leases"], keys["owners"]],
+            args=[node_id, time.time() + lease, *urls],
+        )
+
+    async def complete(self, task_id: str, url: str):
+        keys = self._keys(task_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.zrem(keys["leases"], url)
+            pipe.hdel(keys["owners"], url)
+            pipe.sadd(keys["done"], url)
+            await pipe.execute()
+
+    async def progress(self, task_id: str) -> Dict[str, int]:
+        keys = self._keys(task_id)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.scard(keys["seen"])
+            pipe.zcard(keys["queue"])
+            pipe.zcard(keys["leases"])
+            pipe.scard(keys["done"])
+            seen, queued, in_flight, done = await pipe.execute()
+        return {"seen": seen, "queued": queued, "in_flight": in_flight, "done": done}
+
+    async def incr(self, task_id: str, counters: Dict[str, int]) -> Dict[str, int]:
+        key = self._keys(task_id)["counters"]
+        async with self.client.pipeline(transaction=True) as pipe:
+            for name, value in counters.items():
+                pipe.hincrby(key, name, value)
+            pipe.hgetall(key)
+            results = await pipe.execute()
+        return {name: int(value) for name, value in results[-1].items()}
+
+    async def close(self):
+        await self.client.aclose()
+
+
+_shared_frontiers: Dict[str, SharedFrontier] = {}
+
+
+def get_shared_frontier(backend: Optional[str] = None) -> Optional[SharedFrontier]:
+    """Frontier backend of distributed crawls, None for a single-process crawl"""
+    backend = backend or settings.FRONTIER_BACKEND
+    if backend not in FRONTIER_BACKENDS:
+        raise ValueError(
+            f"Unknown frontier backend {backend!r}, "
+            f"expected one of {list(FRONTIER_BACKENDS)}"
+        )
+    if backend == "local":
+        return None
+    if backend not in _shared_frontiers:
+        if backend == "sqlite":
+            _shared_frontiers[backend] = SqliteSharedFrontier()
+        elif backend == "redis":
+            _shared_frontiers[backend] = RedisSharedFrontier()
+        else:
+            _shared_frontiers[backend] = MemorySharedFrontier()
+    return _shared_frontiers[backend]
+
+
+async def close_shared_frontiers():
+    for frontier in _shared_frontiers.values():
+        await frontier.close()
+    _shared_frontiers.clear()
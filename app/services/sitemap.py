@@ -0,0 +1,149 @@
+import asyncio
+import gzip
+import io
+import logging
+import zlib
+from datetime import datetime, timezone
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+from urllib.parse import urljoin, urlparse
+
+from lxml import etree
+
+from app.core.config import settings
+from app.services.fetcher import http_fetcher
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class SitemapEntry(NamedTuple):
+    url: str
+    lastmod: Optional[str] = None
+    priority: Optional[float] = None
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """W3C datetime of <lastmod>, naive values are taken as UTC"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_sitemap(data: bytes) -> Tuple[List[SitemapEntry], List[str]]:
+    """
+    Streams a (gzipped) sitemap or sitemap index.
+    Returns its page entries and the nested sitemap URLs. Elements are
+    dropped as soon as they are read, so 50k-URL files stay small in memory.
+    """
+    stream = io.BytesIO(data)
+    if data[:2] == GZIP_MAGIC:
+        stream = gzip.GzipFile(fileobj=stream)
+
+    entries: List[SitemapEntry] = []
+    nested: List[str] = []
+    try:
+        for _, element in etree.iterparse(
+            stream, events=("end",), resolve_entities=False, no_network=True
+        ):
+            tag = etree.QName(element).localname
+            if tag not in ("url", "sitemap"):
+                continue
+
+            fields = {
+                etree.QName(child).localname: (child.text or "").strip()
+                for child in element
+                if isinstance(child.tag, str)
+            }
+            loc = fields.get("loc")
+            if loc and tag == "sitemap":
+                nested.append(loc)
+            elif loc:
+                try:
+                    priority = float(fields["priority"])
+                except (KeyError, ValueError):
+                    priority = None
+                entries.append(SitemapEntry(loc, fields.get("lastmod"), priority))
+
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    except (etree.XMLSyntaxError, OSError, EOFError, zlib.error) as e:
+        logger.warning(f"Broken sitemap, keeping {len(entries)} entries: {e}")
+
+    return entries, nested
+
+
+class SitemapSeeder:
+    """
+    Finds a site's sitemaps (robots.txt `Sitemap:` lines, else /sitemap.xml)
+    and yields their page URLs, following nested sitemap indexes.
+    """
+
+    def __init__(
+        self,
+        fetch_bytes: Callable[[str], Awaitable[Optional[bytes]]],
+        max_urls: Optional[int] = None,
+        max_nesting: int = 3,
+    ):
+        self.fetch_bytes = fetch_bytes
+        self.max_urls = max_urls or settings.SITEMAP_MAX_URLS
+        self.max_nesting = max_nesting
+
+    async def sitemap_urls(self, start_url: str) -> List[str]:
+        parsed = urlparse(start_url)
+        root = f"{parsed.scheme}://{parsed.netloc}/"
+
+        robots = await self.fetch_bytes(urljoin(root, "robots.txt"))
+        sitemaps = []
+        for line in (robots or b"").decode("utf-8", errors="ignore").splitlines():
+            key, _, value = line.partition(":")
+            if key.strip().lower() == "sitemap" and value.strip():
+                sitemaps.append(urljoin(root, value.strip()))
+
+        return sitemaps or [urljoin(root, "sitemap.xml")]
+
+    async def entries(self, start_url: str) -> AsyncIterator[SitemapEntry]:
+        seen: Set[str] = set()
+        count = 0
+        pending = [(url, 0) for url in await self.sitemap_urls(start_url)]
+
+        while pending and count < self.max_urls:
+            sitemap_url, nesting = pending.pop(0)
+            if sitemap_url in seen:
+                continue
+            seen.add(sitemap_url)
+
+            data = await self.fetch_bytes(sitemap_url)
+            if not data:
+                continue
+            entries, nested = await asyncio.to_thread(parse_sitemap, data)
+            logger.info(
+                f"Sitemap {sitemap_url}: {len(entries)} URLs, "
+                f"{len(nested)} nested sitemaps"
+            )
+
+            if nesting < self.max_nesting:
+                pending.extend((url, nesting + 1) for url in nested)
+
+            for entry in entries[: self.max_urls - count]:
+                count += 1
+                yield entry
+
+
+sitemap_seeder = SitemapSeeder(fetch_bytes=http_fetcher.get_bytes)
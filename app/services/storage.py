@@ -1,10 +1,16 @@
+import asyncio
+import hashlib
 import os
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
 import aiofiles
 
+from app.core.config import settings
 from app.services.base import BaseStorageBackend
 
+STORAGE_BACKENDS = ("filesystem", "blob")
+
 
 class FileSystemStorage(BaseStorageBackend):
     def __init__(self, base_path: str):
@@ -16,14 +22,82 @@ class FileSystemStorage(BaseStorageBackend):
         async with aiofiles.open(filepath, "w", encoding="utf-8") as f:
             await f.write(content)
 
-    async def retrieve(self, key: str) -> str:
-        pass
+    async def save_many(self, items: List[Tuple[str, str]], fsync: bool = False):
+        """Writes all files in one worker thread instead of one hop per file"""
+        await asyncio.to_thread(self._write_files, items, fsync)
+
+    def _write_files(self, items: List[Tuple[str, str]], fsync: bool):
+        for filename, content in items:
+            with open(
+                os.path.join(self.base_path, filename), "w", encoding="utf-8"
+            ) as f:
+                f.write(content)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        if fsync:
+            # Makes the new directory entries durable too
+            fd = os.open(self.base_path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    async def retrieve(self, key: str) -> Optional[str]:
+        filepath = os.path.join(self.base_path, key)
+        if not os.path.exists(filepath):
+            return None
+        async with aiofiles.open(filepath, "r", encoding="utf-8") as f:
+            return await f.read()
+
+    async def exists(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self.base_path, key))
 
     @staticmethod
     def generate_filename(url: str, extension: str = ".html") -> str:
-        """Generate filename from raw URL"""
-        path = urlparse(url).path.strip("/")
-        name = path.replace("/", "_").replace("-", "_")
+        """
+        Generate filename from raw URL.
+        Paths that would flatten ambiguously (containing "_") and URLs with
+        a query get a short hash of path and query appended.
+        """
+        parsed = urlparse(url)
+        path = parsed.path.strip("/")
+        name = path.replace("/", "_")
         if not name:
             name = "index"
+        if "_" in path or parsed.query:
+            digest = hashlib.blake2b(
+                f"{parsed.path}?{parsed.query}".encode("utf-8"), digest_size=4
+            ).hexdigest()
+            name = f"{name}_{digest}"
         return f"{name}{extension}"
+
+
+_blob_stores: Dict[str, BaseStorageBackend] = {}
+
+
+def get_storage(base_path: str, backend: Optional[str] = None) -> BaseStorageBackend:
+    """
+    Storage for one kind of content (HTML or Markdown).
+    The blob backend is one content-addressed store shared by both,
+    base_path only applies to the filesystem backend.
+    """
+    backend = backend or settings.STORAGE_BACKEND
+    if backend == "filesystem":
+        return FileSystemStorage(base_path)
+    if backend == "blob":
+        from app.services.blob_storage import BlobStorage
+
+        path = settings.BLOB_STORAGE_PATH
+        if path not in _blob_stores:
+            _blob_stores[path] = BlobStorage(path)
+        return _blob_stores[path]
+    raise ValueError(
+        f"Unknown storage backend {backend!r}, expected one of {list(STORAGE_BACKENDS)}"
+    )
+
+
+def close_storages():
+    for store in _blob_stores.values():
+        store.close()
+    _blob_stores.clear()
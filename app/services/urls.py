@@ -0,0 +1,109 @@
+import re
+from typing import Optional
+from urllib.parse import unquote_plus, urldefrag, urljoin, urlsplit, urlunsplit
+
+IGNORED_EXTENSIONS = (
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".pdf",
+    ".css",
+    ".js",
+    ".zip",
+    ".ico",
+    ".xml",
+)
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = (
+    "utm_",
+    "gclid",
+    "fbclid",
+    "msclkid",
+    "yclid",
+    "mc_cid",
+    "mc_eid",
+    "_ga",
+    "_hsenc",
+    "_hsmi",
+)
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+PERCENT_ESCAPE_RE = re.compile(r"%[0-9a-fA-F]{2}")
+
+
+def canonical_netloc(scheme: str, netloc: str) -> str:
+    """Lowercase host, no default port, no credentials"""
+    host = netloc.rsplit("@", 1)[-1].lower()
+    name, _, port = host.rpartition(":")
+    if name and not name.endswith("]") and port.isdigit():
+        if int(port) == DEFAULT_PORTS.get(scheme):
+            return name
+    return host
+
+
+def _is_tracking(param: str) -> bool:
+    param = param.lower()
+    return any(
+        param.startswith(prefix) if prefix.endswith("_") else param == prefix
+        for prefix in TRACKING_PARAMS
+    )
+
+
+def _upper_escapes(value: str) -> str:
+    return PERCENT_ESCAPE_RE.sub(lambda m: m.group(0).upper(), value)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Dedup key of a page: lowercase scheme and host, no default port,
+    no trailing slash (the root is the bare host), uppercase percent
+    escapes, query sorted and stripped of tracking parameters, no fragment.
+    Only used to recognise a page; the crawler fetches the URL as linked.
+    Query parameters are kept as written (no re-encoding), only reordered.
+    """
+    parsed = urlsplit(urldefrag(url)[0])
+    scheme = parsed.scheme.lower()
+
+    path = _upper_escapes(parsed.path).rstrip("/")
+
+    query = "&".join(
+        sorted(
+            _upper_escapes(param)
+            for param in parsed.query.split("&")
+            if param and not _is_tracking(unquote_plus(param.split("=", 1)[0]))
+        )
+    )
+
+    return urlunsplit(
+        (scheme, canonical_netloc(scheme, parsed.netloc), path, query, "")
+    )
+
+
+def normalize_url(
+    href: Optional[str], base_url: str, host: Optional[str] = None
+) -> Optional[str]:
+    """
+    Resolves a raw href against the page it was found on.
+    Returns the absolute URL without its fragment, or None if the crawler
+    should not follow it (other scheme, other host, static asset).
+    See canonicalize_url for the form used to dedup it.
+    """
+    if not href:
+        return None
+
+    url, _ = urldefrag(urljoin(base_url, href.strip()))
+    parsed = urlsplit(url)
+    scheme = parsed.scheme.lower()
+
+    if scheme not in ("http", "https"):
+        return None
+    if host is not None and canonical_netloc(scheme, parsed.netloc) != canonical_netloc(
+        scheme, host
+    ):
+        return None
+    if parsed.path.lower().endswith(IGNORED_EXTENSIONS):
+        return None
+
+    return url
@@ -0,0 +1,74 @@
+"""
+Crawl node for distributed tasks.
+
+Joins a task through the shared frontier (FRONTIER_BACKEND=sqlite or redis)
+and crawls until the task is done:
+
+    python -m app.worker <task_id> <url> [--max-depth N] [--max-pages N]
+
+Start as many as the host (or hosts) can run; the node that triggered the
+task through the API takes part like any other.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.logging import setup_logging
+from app.services.browser_pool import browser_pool
+from app.services.crawler_factory import build_crawler_service
+from app.services.fetcher import http_fetcher
+from app.services.job_store import job_store
+from app.services.manifest import crawl_manifest
+from app.services.parse_executor import parse_executor
+from app.services.shared_frontier import close_shared_frontiers
+from app.services.storage import close_storages
+
+logger = logging.getLogger(__name__)
+
+
+async def run(task_id: str, url: str, max_depth: int, max_pages: int):
+    crawler = build_crawler_service()
+    if crawler.shared_frontier is None:
+        raise SystemExit("Set FRONTIER_BACKEND to sqlite or redis to run workers")
+
+    if await job_store.get_job(task_id) is None:
+        await job_store.create_job(
+            task_id,
+            {
+                "task_id": task_id,
+                "url": url,
+                "status": "queued",
+                "processed_links": 0,
+                "total_links_found": 0,
+            },
+        )
+
+    browser_pool.open()
+    try:
+        await crawler.start(url, task_id, max_depth=max_depth, max_pages=max_pages)
+    finally:
+        await browser_pool.close()
+        await http_fetcher.close()
+        await crawl_manifest.close()
+        await job_store.close()
+        await close_shared_frontiers()
+        close_storages()
+        parse_executor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Join a distributed crawl task")
+    parser.add_argument("task_id")
+    parser.add_argument("url")
+    parser.add_argument("--max-depth", type=int, default=settings.MAX_CRAWL_DEPTH)
+    parser.add_argument("--max-pages", type=int, default=settings.MAX_PAGES)
+    args = parser.parse_args()
+
+    setup_logging()
+    asyncio.run(run(args.task_id, args.url, args.max_depth, args.max_pages))
+
+
+if __name__ == "__main__":
+    main()
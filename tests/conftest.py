@@ -6,8 +6,9 @@ from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, AsyncMock
 
 from app.main import app
+from app.services.job_manager import JobManager
 from app.services.job_store import JobStore
-from app.api.deps import get_crawler_service, get_job_store
+from app.api.deps import get_crawler_service, get_job_manager, get_job_store
 
 
 @pytest.fixture(scope="session")
@@ -37,10 +38,18 @@ def mock_crawler_service():
 
 
 @pytest.fixture
-def client(mock_job_store, mock_crawler_service) -> Generator[TestClient, None, None]:
+def mock_job_manager():
+    return JobManager(max_running=1, max_queued=1)
+
+
+@pytest.fixture
+def client(
+    mock_job_store, mock_crawler_service, mock_job_manager
+) -> Generator[TestClient, None, None]:
 
     app.dependency_overrides[get_job_store] = lambda: mock_job_store
     app.dependency_overrides[get_crawler_service] = lambda: mock_crawler_service
+    app.dependency_overrides[get_job_manager] = lambda: mock_job_manager
 
     with TestClient(app) as c:
         yield c
@@ -1,3 +1,7 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
 import pytest
 from app.core.config import settings
 
@@ -12,6 +16,57 @@ def test_trigger_scraper(client):
     assert data["status"] == "queued"
 
 
+async def hang(*args, **kwargs):
+    await asyncio.Event().wait()
+
+
+def test_trigger_passes_parameters_and_limits_queue(client, mock_crawler_service):
+    mock_crawler_service.start = AsyncMock(side_effect=hang)
+
+    payload = {"url": "https://example.com", "max_depth": 1, "max_pages": 10}
+    first = client.post("/api/v1/scraper/trigger", json=payload)
+    assert first.status_code == 200
+    for _ in range(100):
+        if mock_crawler_service.start.called:
+            break
+        time.sleep(0.01)
+    mock_crawler_service.start.assert_called_once_with(
+        "https://example.com",
+        first.json()["task_id"],
+        max_depth=1,
+        max_pages=10,
+        profile=False,
+        profile_parse=False,
+    )
+
+    # One running, one queued, the next one is refused
+    assert client.post("/api/v1/scraper/trigger", json=payload).status_code == 200
+    assert client.post("/api/v1/scraper/trigger", json=payload).status_code == 429
+
+
+def test_cancel_task(client, mock_crawler_service):
+    mock_crawler_service.start = AsyncMock(side_effect=hang)
+    task_id = client.post(
+        "/api/v1/scraper/trigger", json={"url": "https://example.com"}
+    ).json()["task_id"]
+
+    response = client.post(f"/api/v1/scraper/cancel/{task_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert client.get(f"/api/v1/scraper/status/{task_id}").json()["status"] == (
+        "cancelled"
+    )
+    assert client.post(f"/api/v1/scraper/cancel/{task_id}").status_code == 409
+    assert client.post("/api/v1/scraper/cancel/unknown-id").status_code == 404
+
+
+def test_trigger_resume_without_checkpoint(client):
+    payload = {"resume_task_id": "unknown-id"}
+    response = client.post("/api/v1/scraper/trigger", json=payload)
+
+    assert response.status_code == 404
+
+
 def test_get_status_404(client):
     response = client.get("/api/v1/scraper/status/unknown-id")
     assert response.status_code == 404
@@ -43,3 +98,42 @@ def test_get_logs(client, tmp_path):
     logs = response.json()["logs"]
     assert len(logs) == 2
     assert "Log line 2" in logs
+
+
+@pytest.mark.asyncio
+async def test_stream_finished_task(client, mock_job_store):
+    task_id = "test-stream-task"
+    await mock_job_store.create_job(
+        task_id, {"task_id": task_id, "url": "x", "status": "completed"}
+    )
+
+    with client.stream("GET", f"/api/v1/scraper/stream/{task_id}") as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = "".join(response.iter_text())
+
+    assert body.startswith("event: snapshot\n")
+    assert '"status": "completed"' in body
+
+
+def test_stream_404(client):
+    response = client.get("/api/v1/scraper/stream/unknown-id")
+    assert response.status_code == 404
+
+
+def test_get_logs_incremental(client, tmp_path):
+    log_file = tmp_path / "scraper.log"
+    settings.LOG_FILE = str(log_file)
+    log_file.write_text(
+        "a - app - INFO - one\na - app - ERROR - two\n", encoding="utf-8"
+    )
+
+    data = client.get("/api/v1/scraper/logs", params={"level": "ERROR"}).json()
+    assert data["logs"] == ["a - app - ERROR - two"]
+
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("a - app - INFO - three\n")
+    data = client.get(
+        "/api/v1/scraper/logs", params={"after": data["end_offset"]}
+    ).json()
+    assert data["logs"] == ["a - app - INFO - three"]
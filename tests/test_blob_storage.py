@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from app.services.blob_storage import BlobStorage
+
+
+@pytest.mark.asyncio
+async def test_blob_storage_roundtrip_and_dedup(tmp_path):
+    store = BlobStorage(str(tmp_path / "blobs"), level=3)
+    html = "<html><body>" + "<p>same paragraph</p>" * 200 + "</body></html>"
+
+    first = store.generate_filename("https://test.com/a?x=1")
+    second = store.generate_filename("https://test.com/a?x=2")
+    assert first != second
+    assert (
+        store.generate_filename("https://test.com/a", ".md") == "md:https://test.com/a"
+    )
+
+    await store.save(first, html)
+    await store.save(second, html)
+    assert await store.retrieve(first) == html
+    assert await store.retrieve(second) == html
+    assert await store.retrieve("html:https://test.com/missing") is None
+    assert await store.exists(first)
+    assert not await store.exists("html:https://test.com/missing")
+
+    stats = store.stats()
+    assert stats["keys"] == 2
+    assert stats["blobs"] == 1
+    assert stats["stored_size"] < stats["size"] // 10
+
+    blobs = [files for _, _, files in os.walk(tmp_path / "blobs" / "objects") if files]
+    assert len(blobs) == 1 and len(blobs[0]) == 1
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_blob_storage_overwrite_and_reopen(tmp_path):
+    path = str(tmp_path / "blobs")
+    store = BlobStorage(path)
+    key = store.generate_filename("https://test.com")
+    await store.save(key, "old")
+    await store.save(key, "new")
+    store.close()
+
+    reopened = BlobStorage(path)
+    assert await reopened.retrieve(key) == "new"
+    assert reopened.stats()["keys"] == 1
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_blob_storage_collects_unreferenced_blobs(tmp_path):
+    store = BlobStorage(str(tmp_path / "blobs"))
+    objects = tmp_path / "blobs" / "objects"
+
+    def blob_count():
+        return sum(len(files) for _, _, files in os.walk(objects))
+
+    first = store.generate_filename("https://test.com/a")
+    second = store.generate_filename("https://test.com/b")
+    await store.save(first, "shared")
+    await store.save(second, "shared")
+    await store.save(first, "changed")
+    # Still referenced by the second key
+    assert blob_count() == 2
+    assert await store.retrieve(second) == "shared"
+
+    await store.save(second, "changed")
+    assert blob_count() == 1
+
+    await store.save_many([(first, "draft"), (first, "final")])
+    assert blob_count() == 2
+    assert await store.retrieve(first) == "final"
+    assert store.stats()["blobs"] == 2
+    store.close()
@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from app.services.browser_pool import BrowserPool
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.stopped = False
+        self.healthy = True
+
+    async def send(self, cdp_obj):
+        if not self.healthy:
+            raise ConnectionError("websocket closed")
+        return "Chrome/140"
+
+    async def get(self, url, new_tab=False):
+        return url
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def mock_uc():
+    with patch("app.services.browser_pool.uc") as mock_uc:
+        mock_uc.start = AsyncMock(side_effect=lambda **kwargs: FakeBrowser())
+        yield mock_uc
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_reuses_browser(mock_uc):
+    pool = BrowserPool(size=1, headless=True, max_pages=100)
+
+    async with pool.lease() as lease:
+        first = lease.browser
+        for i in range(10):
+            async with lease.tab(f"https://test.com/{i}"):
+                pass
+
+    async with pool.lease() as lease:
+        assert lease.browser is first
+
+    mock_uc.start.assert_called_once_with(headless=True)
+    await pool.close()
+    assert first.stopped
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_recycles_after_max_pages(mock_uc):
+    pool = BrowserPool(size=1, headless=True, max_pages=5)
+
+    async with pool.lease() as lease:
+        first = lease.browser
+        for i in range(5):
+            async with lease.tab(f"https://test.com/{i}"):
+                pass
+
+    assert first.stopped
+
+    async with pool.lease() as lease:
+        assert lease.browser is not first
+    assert mock_uc.start.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_recycles_mid_lease(mock_uc):
+    pool = BrowserPool(size=1, headless=True, max_pages=2)
+
+    async with pool.lease() as lease:
+        first = lease.browser
+        async with lease.tab("https://test.com/1"):
+            async with lease.tab("https://test.com/2"):
+                pass
+            # Third render goes to a new browser, the old one keeps its open tab
+            async with lease.tab("https://test.com/3"):
+                assert lease.browser is not first
+                assert not first.stopped
+            assert not first.stopped
+        assert first.stopped
+        assert lease.pages == 1
+
+    assert mock_uc.start.call_count == 2
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_replaces_unhealthy_browser(mock_uc):
+    pool = BrowserPool(size=1, headless=True, max_pages=100)
+
+    async with pool.lease() as lease:
+        first = lease.browser
+    first.healthy = False
+
+    async with pool.lease() as lease:
+        assert lease.browser is not first
+    assert first.stopped
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_bounds_concurrent_leases(mock_uc):
+    pool = BrowserPool(size=2, headless=True, max_pages=100)
+    active = 0
+    peak = 0
+
+    async def crawl():
+        nonlocal active, peak
+        async with pool.lease():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*(crawl() for _ in range(6)))
+
+    assert peak == 2
+    assert mock_uc.start.call_count == 2
@@ -0,0 +1,43 @@
+import json
+import pstats
+
+import pytest
+
+from app.services.crawl_trace import CrawlTrace
+from app.services.parse_executor import _run_parse
+from app.services.parser import HtmlToMarkdownParser
+
+
+@pytest.mark.asyncio
+async def test_disabled_trace_records_nothing():
+    trace = CrawlTrace()
+
+    with trace.span("fetch", "https://test.com"):
+        pass
+
+    assert trace.events == []
+    assert await trace.write() == {}
+
+
+@pytest.mark.asyncio
+async def test_trace_writes_chrome_trace_and_parse_profile(tmp_path):
+    trace = CrawlTrace(str(tmp_path / "t.trace.json"), str(tmp_path / "t.parse.prof"))
+    html = "<html><title>T</title><p>Body text</p></html>"
+
+    with trace.span("parse", "https://test.com", attempt=0):
+        result = _run_parse(HtmlToMarkdownParser(), html, profile=True)
+    trace.add_profile(result["parse_profile"])
+    files = await trace.write()
+
+    assert files == {
+        "trace_file": str(tmp_path / "t.trace.json"),
+        "profile_file": str(tmp_path / "t.parse.prof"),
+    }
+    events = json.loads((tmp_path / "t.trace.json").read_text())["traceEvents"]
+    lane, span = events
+    assert lane["ph"] == "M" and lane["tid"] == span["tid"]
+    assert span["name"] == "parse" and span["ph"] == "X" and span["dur"] >= 0
+    assert span["args"] == {"attempt": 0, "url": "https://test.com"}
+
+    stats = pstats.Stats(files["profile_file"])
+    assert any(func[2] == "parse_sync" for func in stats.stats)
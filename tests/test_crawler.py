@@ -1,7 +1,23 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import contextmanager
+
 import pytest
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import AsyncMock, patch
+from app.core.config import settings
+from app.services.blob_storage import BlobStorage
+from app.services.browser_pool import BrowserPool
 from app.services.crawler import CrawlerService
+from app.services.fetcher import FetchedPage, ThrottledError
+from app.services.frontier import FrontierCheckpoint
+from app.services.manifest import CrawlManifest
+from app.services.politeness import PolitenessScheduler
+from app.services.shared_frontier import MemorySharedFrontier
+from app.services.sitemap import SitemapSeeder
 from app.services.storage import FileSystemStorage
+from app.services.parse_executor import _run_parse
 from app.services.parser import HtmlToMarkdownParser
 
 
@@ -18,12 +34,8 @@ class MockTab:
     async def sleep(self, seconds):
         pass
 
-    async def select_all(self, selector):
-        if selector == "a":
-            link_mock = MagicMock()
-            link_mock.attrs.get.return_value = "https://test.com/page2"
-            return [link_mock]
-        return []
+    async def evaluate(self, expression, await_promise=False, return_by_value=False):
+        return "ready"
 
     async def close(self):
         pass
@@ -31,7 +43,7 @@ class MockTab:
 
 class MockBrowser:
     def __init__(self):
-        pass
+        self.stopped = False
 
     async def get(self, url, new_tab=True):
         return MockTab()
@@ -40,43 +52,719 @@ class MockBrowser:
         pass
 
 
-@pytest.mark.asyncio
-async def test_crawler_service_flow(tmp_path, mock_job_store):
-    html_storage = FileSystemStorage(str(tmp_path / "html"))
-    md_storage = FileSystemStorage(str(tmp_path / "md"))
-    parser = HtmlToMarkdownParser()
+@pytest.fixture
+def make_crawler(tmp_path, mock_job_store):
+    """
+    Builds crawlers on the test job store that write under tmp_path, with
+    one worker and no retries. Keyword arguments go to CrawlerService.
+    """
+
+    def make(**kwargs) -> CrawlerService:
+        kwargs.setdefault("storage", FileSystemStorage(str(tmp_path / "html")))
+        kwargs.setdefault("md_storage", FileSystemStorage(str(tmp_path / "md")))
+        kwargs.setdefault("parser", HtmlToMarkdownParser())
+        crawler = CrawlerService(job_store=mock_job_store, **kwargs)
+        crawler.MAX_WORKERS = 1
+        crawler.MAX_RETRIES = 0
+        return crawler
+
+    return make
+
 
-    crawler = CrawlerService(
-        storage=html_storage,
-        job_store=mock_job_store,
-        parser=parser,
-        md_storage=md_storage,
+@contextmanager
+def mock_browser(browser=None):
+    """Crawlers started within launch browser, a MockBrowser by default"""
+    with patch("app.services.crawler.uc") as mock_uc:
+        mock_uc.start = AsyncMock(return_value=browser or MockBrowser())
+        yield mock_uc
+
+
+async def queue_task(job_store, task_id: str, url: str = "https://test.com"):
+    await job_store.create_job(
+        task_id, {"task_id": task_id, "url": url, "status": "queued"}
     )
 
-    crawler.MAX_WORKERS = 1
-    crawler.MAX_RETRIES = 0
 
+async def run_crawl(
+    crawler, task_id: str, start_url: str = "https://test.com", browser=None, **kwargs
+):
+    """Queues the task, crawls it with a mocked browser and returns the task"""
+    await queue_task(crawler.job_store, task_id, start_url)
+    with mock_browser(browser):
+        await crawler.start(start_url, task_id, **kwargs)
+    return await crawler.job_store.get_job(task_id)
+
+
+@pytest.mark.asyncio
+async def test_crawler_service_flow(tmp_path, mock_job_store, make_crawler):
+    crawler = make_crawler()
     task_id = "test-crawl-task"
-    start_url = "https://test.com"
+    await queue_task(mock_job_store, task_id)
+
+    with mock_browser() as mock_uc:
+        await crawler.start("https://test.com", task_id, max_depth=1)
+        mock_uc.start.assert_called_once()
+
+    job = await mock_job_store.get_job(task_id)
+    assert job["status"] == "completed"
+    assert "total_time" in job
+
+    assert (tmp_path / "html" / "index.html").exists()
+    assert (tmp_path / "md" / "index.md").exists()
+
+    md_content = (tmp_path / "md" / "index.md").read_text(encoding="utf-8")
+    assert "Source: https://test.com" in md_content
+
+
+class StaticFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+        self.fetched = []
+
+    async def fetch(self, url, block_indicators, validators=None):
+        self.fetched.append(url)
+        html = self.pages.get(url)
+        return FetchedPage(html, url=url) if html is not None else None
+
+    def browser_worked(self, url):
+        pass
 
-    await mock_job_store.create_job(
-        task_id, {"task_id": task_id, "url": start_url, "status": "queued"}
+
+@pytest.mark.asyncio
+async def test_crawler_uses_http_tier(tmp_path, make_crawler):
+    fetcher = StaticFetcher(
+        {
+            "https://test.com": "<html><title>Home</title><a href='/page2'>next</a></html>",
+            "https://test.com/page2": "<html><title>Page 2</title><p>Second page body</p></html>",
+        }
     )
+    crawler = make_crawler(fetcher=fetcher)
+    browser = MockBrowser()
+    browser.get = AsyncMock()
 
-    with patch("app.services.crawler.uc") as mock_uc:
-        mock_browser = MockBrowser()
-        mock_uc.start = AsyncMock(return_value=mock_browser)
+    job = await run_crawl(crawler, "test-http-tier", browser=browser, max_depth=1)
 
-        await crawler.start(start_url, task_id, max_depth=1)
+    browser.get.assert_not_called()
+    assert job["status"] == "completed"
+    assert job["processed_links"] == 2
+    assert (tmp_path / "md" / "page2.md").exists()
 
-        mock_uc.start.assert_called_once()
 
-        job = await mock_job_store.get_job(task_id)
-        assert job["status"] == "completed"
-        assert "total_time" in job
+@pytest.mark.asyncio
+async def test_crawler_resolves_links_against_directory_url(make_crawler):
+    body = "<p>" + "Body text of the page. " * 5 + "</p>"
+    fetcher = StaticFetcher(
+        {
+            "https://test.com/docs/": "<html><title>Docs</title>"
+            "<a href='intro'>intro</a><a href='/docs'>same</a>"
+            "<a href='search?q=a%20b&x'>search</a></html>",
+            "https://test.com/docs/intro": f"<html><title>Intro</title>{body}</html>",
+            "https://test.com/docs/search?q=a%20b&x": f"<html>{body}</html>",
+        }
+    )
+    crawler = make_crawler(fetcher=fetcher)
+
+    await run_crawl(
+        crawler, "test-directory-links", "https://test.com/docs/", max_depth=1
+    )
+
+    # Fetched as linked; /docs is the same page as /docs/
+    assert fetcher.fetched == [
+        "https://test.com/docs/",
+        "https://test.com/docs/intro",
+        "https://test.com/docs/search?q=a%20b&x",
+    ]
+
+
+class GoneFetcher(StaticFetcher):
+    async def fetch(self, url, block_indicators, validators=None):
+        if url.endswith("/missing"):
+            self.fetched.append(url)
+            return FetchedPage(None, gone=True)
+        return await super().fetch(url, block_indicators, validators)
+
+
+class CountingBrowser(MockBrowser):
+    def __init__(self):
+        self.opened = []
+
+    async def get(self, url, new_tab=True):
+        self.opened.append(url)
+        return MockTab()
+
+
+@pytest.mark.asyncio
+async def test_crawler_does_not_render_gone_pages(make_crawler):
+    fetcher = GoneFetcher(
+        {"https://test.com": "<html><title>Home</title><a href='/missing'>x</a></html>"}
+    )
+    crawler = make_crawler(fetcher=fetcher)
+    crawler.MAX_RETRIES = 2
+    browser = CountingBrowser()
+
+    await run_crawl(crawler, "test-gone", browser=browser, max_depth=1)
+
+    assert fetcher.fetched == ["https://test.com", "https://test.com/missing"]
+    assert browser.opened == []
+    assert crawler.failed_pages == 0
+
+
+@pytest.mark.asyncio
+async def test_crawler_waits_for_challenge_in_same_tab(
+    tmp_path, monkeypatch, make_crawler
+):
+    monkeypatch.setattr(settings, "PAGE_QUIET_MAX_WAIT", 0.02)
+    monkeypatch.setattr(settings, "PAGE_LOAD_TIMEOUT", 2)
+    clears_at = time.monotonic() + 0.3
+
+    class ChallengeTab(MockTab):
+        async def evaluate(
+            self, expression, await_promise=False, return_by_value=False
+        ):
+            if "indicators" in expression:
+                return time.monotonic() < clears_at
+            await asyncio.sleep(settings.PAGE_QUIET_MAX_WAIT)
+            return "ready"
+
+        async def get_content(self):
+            if time.monotonic() < clears_at:
+                return "<html><body>Just a moment...</body></html>"
+            return "<html><title>Home</title><p>The real page body</p></html>"
+
+    class ChallengeBrowser(CountingBrowser):
+        async def get(self, url, new_tab=True):
+            self.opened.append(url)
+            return ChallengeTab()
+
+    browser = ChallengeBrowser()
+    crawler = make_crawler()
+    crawler.MAX_RETRIES = 2
+
+    job = await run_crawl(crawler, "test-challenge", browser=browser, max_depth=0)
+
+    assert job["status"] == "completed"
+    assert browser.opened == ["https://test.com"]
+    md = (tmp_path / "md" / "index.md").read_text(encoding="utf-8")
+    assert "The real page body" in md
+
+
+@pytest.mark.asyncio
+async def test_crawler_writes_profile_next_to_task_file(mock_job_store, make_crawler):
+    fetcher = StaticFetcher(
+        {
+            "https://test.com": "<html><title>Home</title><a href='/page2'>next</a></html>",
+            "https://test.com/page2": "<html><title>Page 2</title><p>Second page body</p></html>",
+        }
+    )
+    crawler = make_crawler(fetcher=fetcher)
+
+    task_id = "test-profile"
+    job = await run_crawl(
+        crawler, task_id, max_depth=1, profile=True, profile_parse=True
+    )
+
+    assert job["status"] == "completed"
+    assert job["trace_file"] == mock_job_store.artifact_path(task_id, ".trace.json")
+    assert os.path.exists(job["profile_file"])
+
+    with open(job["trace_file"], encoding="utf-8") as f:
+        events = json.load(f)["traceEvents"]
+    lanes = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert {"fetch-0", "parse-0", "writer"} <= lanes
+    spans = {(e["name"], e["args"].get("url")) for e in events if e["ph"] == "X"}
+    for name in ("http_fetch", "fetch", "parse", "save_html", "save_markdown"):
+        assert (name, "https://test.com/page2") in spans
+    assert ("enqueue_links", "https://test.com") in spans
+    assert ("job_store_update", "https://test.com") in spans
+
+
+@pytest.mark.asyncio
+async def test_crawler_writes_to_blob_storage(tmp_path, make_crawler):
+    store = BlobStorage(str(tmp_path / "blobs"))
+    pages = {
+        "https://test.com": "<html><title>Home</title><a href='/p?id=1'>1</a><a href='/p?id=2'>2</a></html>",
+        "https://test.com/p?id=1": "<html><title>One</title><p>First page body</p></html>",
+        "https://test.com/p?id=2": "<html><title>Two</title><p>Second page body</p></html>",
+    }
+    crawler = make_crawler(
+        storage=store, md_storage=store, fetcher=StaticFetcher(pages)
+    )
+
+    await run_crawl(crawler, "test-blob-storage", max_depth=1)
+
+    # Query strings no longer map both pages onto one file
+    for url in ("https://test.com/p?id=1", "https://test.com/p?id=2"):
+        assert await store.retrieve(store.generate_filename(url)) == pages[url]
+    md = await store.retrieve(store.generate_filename("https://test.com/p?id=2", ".md"))
+    assert "Second page body" in md
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_crawler_nodes_share_frontier(tmp_path, mock_job_store, make_crawler):
+    frontier = MemorySharedFrontier()
+    body = "<p>" + "Body text of the page. " * 5 + "</p>"
+    pages = {
+        "https://test.com": "<html><title>Home</title>"
+        + "".join(f"<a href='/p{i}'>{i}</a>" for i in range(6))
+        + "</html>",
+        **{
+            f"https://test.com/p{i}": f"<html><title>P{i}</title>{body}{i}</html>"
+            for i in range(6)
+        },
+    }
+    fetcher = StaticFetcher(pages)
+
+    def node(name):
+        crawler = make_crawler(fetcher=fetcher, shared_frontier=frontier)
+        crawler.node_id = name
+        crawler.MAX_WORKERS = 2
+        crawler.poll_interval = 0.01
+        crawler.claim_batch = 1
+        return crawler
+
+    task_id = "test-distributed"
+    await queue_task(mock_job_store, task_id)
+    first, second = node("node-1"), node("node-2")
+    with mock_browser():
+        await asyncio.gather(
+            first.start("https://test.com", task_id, max_depth=1),
+            second.start("https://test.com", task_id, max_depth=1),
+        )
+
+    # Every page was fetched by exactly one node
+    assert sorted(fetcher.fetched) == sorted(pages)
+    assert first.processed_links + second.processed_links == 7
+
+    job = await mock_job_store.get_job(task_id)
+    assert job["status"] == "completed"
+    assert job["processed_links"] == 7
+    assert job["total_links_found"] == 7
+    assert (tmp_path / "md" / "p5.md").exists()
+
+
+@pytest.mark.asyncio
+async def test_crawler_renews_leases_of_slow_pages(make_crawler):
+    frontier = MemorySharedFrontier()
+    fetcher = StaticFetcher({"https://test.com": "<html><title>Home</title></html>"})
+    fetch = fetcher.fetch
+    stolen = []
+
+    async def slow_fetch(url, block_indicators, validators=None):
+        # Outlives several leases while another node keeps claiming
+        for _ in range(5):
+            await asyncio.sleep(0.05)
+            stolen.extend(await frontier.claim(task_id, "node-2", 1, lease=60))
+        return await fetch(url, block_indicators, validators)
+
+    fetcher.fetch = slow_fetch
+    crawler = make_crawler(fetcher=fetcher, shared_frontier=frontier)
+    crawler.poll_interval = 0.01
+    crawler.lease_seconds = 0.06
+
+    task_id = "test-lease-renewal"
+    job = await run_crawl(crawler, task_id, max_depth=0)
+
+    assert stolen == []
+    assert job["status"] == "completed"
+    assert (await frontier.progress(task_id))["done"] == 1
+
+
+class GatedParseExecutor:
+    """Parses the start page at once, later pages only after the gate opens"""
+
+    max_workers = 1
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.calls = 0
+
+    async def parse(self, parser, html, fingerprint=False, profile=False):
+        self.calls += 1
+        if self.calls > 1:
+            await self.gate.wait()
+        return _run_parse(parser, html, fingerprint, profile)
+
+
+@pytest.mark.asyncio
+async def test_crawler_fetches_while_parse_stage_is_busy(mock_job_store, make_crawler):
+    body = "<p>" + "Body text of the page. " * 5 + "</p>"
+    pages = {
+        "https://test.com": "<html><title>Home</title>"
+        + "".join(f"<a href='/p{i}'>{i}</a>" for i in range(4))
+        + "</html>",
+        **{
+            f"https://test.com/p{i}": f"<html><title>P{i}</title>{body}{i}</html>"
+            for i in range(4)
+        },
+    }
+    fetcher = StaticFetcher(pages)
+    executor = GatedParseExecutor()
+    crawler = make_crawler(parse_executor=executor, fetcher=fetcher)
+
+    task_id = "test-pipeline"
+    await queue_task(mock_job_store, task_id)
+    with mock_browser():
+        crawl = asyncio.create_task(
+            crawler.start("https://test.com", task_id, max_depth=1)
+        )
+        for _ in range(100):
+            if len(fetcher.fetched) == 5:
+                break
+            await asyncio.sleep(0.01)
+
+        # The single fetch worker got through all pages while parsing was stuck
+        assert len(fetcher.fetched) == 5
+        assert crawler.processed_links == 1
+        stats = crawler.pipeline_stats()
+        assert stats["parsing"] == 1
+        assert stats["parse_queue"] == 3
+
+        executor.gate.set()
+        await crawl
+
+    job = await mock_job_store.get_job(task_id)
+    assert job["status"] == "completed"
+    assert job["processed_links"] == 5
+    assert set(job["pipeline"]) == {
+        "frontier_queue",
+        "fetching",
+        "parse_queue",
+        "parsing",
+        "write_queue",
+    }
+
+
+@pytest.mark.asyncio
+async def test_crawler_cancel_closes_tabs(tmp_path, mock_job_store, make_crawler):
+    opened = asyncio.Event()
+    closed = []
+
+    class HangingTab(MockTab):
+        async def get_content(self):
+            opened.set()
+            await asyncio.Event().wait()
+
+        async def close(self):
+            closed.append(True)
+
+    browser = MockBrowser()
+    browser.get = AsyncMock(return_value=HangingTab())
+    crawler = make_crawler(checkpoint_dir=str(tmp_path / "frontier"))
+
+    task_id = "test-cancel"
+    await queue_task(mock_job_store, task_id)
+    with mock_browser(browser):
+        crawl = asyncio.create_task(crawler.start("https://test.com", task_id))
+        await asyncio.wait_for(opened.wait(), timeout=1)
+        crawl.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await crawl
+
+    assert closed == [True]
+    assert (await mock_job_store.get_job(task_id))["status"] == "cancelled"
+    # The interrupted URL is still to do on resume
+    checkpoint = FrontierCheckpoint(task_id, str(tmp_path / "frontier"))
+    assert checkpoint.load()[1] == [("https://test.com", 0)]
+    await checkpoint.close()
+
+
+@pytest.mark.asyncio
+async def test_crawler_resumes_from_checkpoint(tmp_path, make_crawler):
+    checkpoint_dir = str(tmp_path / "frontier")
+    task_id = "test-resume"
+
+    checkpoint = FrontierCheckpoint(task_id, checkpoint_dir)
+    checkpoint.set_meta({"start_url": "https://test.com", "max_depth": 1})
+    checkpoint.add("https://test.com", 0)
+    checkpoint.mark_done("https://test.com", 0)
+    checkpoint.mark_in_flight("https://test.com/page2", 1)
+    await checkpoint.close()
+
+    fetched = []
+
+    class RecordingFetcher:
+        async def fetch(self, url, block_indicators, validators=None):
+            fetched.append(url)
+            return FetchedPage(
+                "<html><title>Page 2</title><a href='/'>home</a> resumed</html>"
+            )
+
+    crawler = make_crawler(fetcher=RecordingFetcher(), checkpoint_dir=checkpoint_dir)
+
+    job = await run_crawl(crawler, task_id, resume=True)
+
+    assert fetched == ["https://test.com/page2"]
+    assert job["status"] == "completed"
+    assert job["processed_links"] == 2
+
+    # A completed task has nothing left to resume
+    assert not FrontierCheckpoint.exists(task_id, checkpoint_dir)
+    assert os.listdir(checkpoint_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_crawler_incremental_recrawl(tmp_path, make_crawler):
+    manifest = CrawlManifest(str(tmp_path / "manifest.sqlite"))
+    pages = {
+        "https://test.com": "<html><title>Home</title><a href='/a'>a</a><a href='/b'>b</a></html>",
+        "https://test.com/a": "<html><title>A</title><p>Page A body text</p></html>",
+        "https://test.com/b": "<html><title>B</title><p>Page B body text</p></html>",
+    }
+
+    async def crawl(task_id, max_depth=1):
+        crawler = make_crawler(fetcher=StaticFetcher(pages), manifest=manifest)
+        return await run_crawl(crawler, task_id, max_depth=max_depth)
+
+    job = await crawl("first")
+    assert job["changed_pages"] == 3
+    assert job["unchanged_pages"] == 0
+
+    pages["https://test.com"] = "<html><title>Home</title><a href='/a'>a</a></html>"
+    (tmp_path / "md" / "a.md").unlink()
+
+    job = await crawl("second")
+    assert job["changed_pages"] == 2
+    assert job["unchanged_pages"] == 0
+    assert job["removed_pages"] == 1
+    # Unchanged content whose file is gone is written again
+    assert (tmp_path / "md" / "a.md").exists()
+    assert manifest.get("https://test.com/b") is None
+
+    job = await crawl("third")
+    assert job["changed_pages"] == 0
+    assert job["unchanged_pages"] == 2
+
+    # A shallower crawl does not see the whole site, nothing is pruned
+    job = await crawl("shallow", max_depth=0)
+    assert job["removed_pages"] is None
+    assert manifest.get("https://test.com/a") is not None
+    await manifest.close()
+
+
+@pytest.mark.asyncio
+async def test_crawler_rewrites_unchanged_pages_after_storage_switch(
+    tmp_path, make_crawler
+):
+    manifest = CrawlManifest(str(tmp_path / "manifest.sqlite"))
+    pages = {
+        "https://test.com": "<html><title>Home</title><p>Home body text</p></html>"
+    }
+    job = await run_crawl(
+        make_crawler(fetcher=StaticFetcher(pages), manifest=manifest),
+        "filesystem",
+        max_depth=0,
+    )
+    assert job["changed_pages"] == 1
+
+    blobs = BlobStorage(str(tmp_path / "blobs"))
+    crawler = make_crawler(
+        storage=blobs,
+        md_storage=blobs,
+        fetcher=StaticFetcher(pages),
+        manifest=manifest,
+    )
+    job = await run_crawl(crawler, "blob", max_depth=0)
+    assert job["changed_pages"] == 1
+    assert job["unchanged_pages"] == 0
+    assert await blobs.exists(blobs.generate_filename("https://test.com", ".md"))
+    blobs.close()
+    await manifest.close()
+
+
+class FailingStorage(FileSystemStorage):
+    async def save_many(self, items, fsync=False):
+        raise OSError("disk full")
+
+
+@pytest.mark.asyncio
+async def test_crawler_failed_write_is_not_recorded_in_manifest(tmp_path, make_crawler):
+    manifest = CrawlManifest(str(tmp_path / "manifest.sqlite"))
+    pages = {
+        "https://test.com": "<html><title>Home</title><p>Home body text</p></html>"
+    }
+
+    async def crawl(task_id, storage):
+        crawler = make_crawler(
+            storage=storage,
+            md_storage=storage,
+            fetcher=StaticFetcher(pages),
+            manifest=manifest,
+        )
+        return await run_crawl(crawler, task_id, max_depth=0)
+
+    job = await crawl("broken-disk", FailingStorage(str(tmp_path / "broken")))
+    assert job["failed_writes"] == 2
+    assert manifest.get("https://test.com") is None
+
+    # The next run writes the page instead of calling it unchanged
+    job = await crawl("retry", FileSystemStorage(str(tmp_path / "out")))
+    assert job["changed_pages"] == 1
+    assert job["unchanged_pages"] == 0
+    assert (tmp_path / "out" / "index.md").exists()
+    await manifest.close()
+
+
+@pytest.mark.asyncio
+async def test_crawler_politeness_retries_throttled_and_obeys_robots(make_crawler):
+    fetched = []
+
+    class ThrottlingFetcher:
+        async def fetch(self, url, block_indicators, validators=None):
+            fetched.append(url)
+            if len(fetched) == 1:
+                raise ThrottledError(url, 429, retry_after=0)
+            return FetchedPage(
+                "<html><title>Home</title><a href='/private/a'>a</a>"
+                "<a href='/docs'>docs</a> some page body</html>"
+            )
+
+    async def robots_txt(url):
+        return "User-agent: *\nDisallow: /private\n"
+
+    politeness = PolitenessScheduler(fetch_text=robots_txt, rate=1000, burst=100)
+    crawler = make_crawler(fetcher=ThrottlingFetcher(), politeness=politeness)
+    # The throttled first attempt is retried
+    crawler.MAX_RETRIES = 3
+
+    job = await run_crawl(crawler, "test-politeness", max_depth=1)
+
+    assert fetched == ["https://test.com", "https://test.com", "https://test.com/docs"]
+    assert politeness.host("https://test.com").limit < 4
+    assert job["processed_links"] == 2
+
+
+@pytest.mark.asyncio
+async def test_crawler_stops_at_page_budget(tmp_path, make_crawler):
+    links = "".join(f"<a href='/p{i}'>p{i}</a>" for i in range(10))
+    pages = {"https://test.com": f"<html><title>Home</title>{links}</html>"}
+    pages.update(
+        {
+            f"https://test.com/p{i}": f"<html><title>P{i}</title><p>page body number {i}</p></html>"
+            for i in range(10)
+        }
+    )
+    crawler = make_crawler(fetcher=StaticFetcher(pages))
+    crawler.MAX_WORKERS = 2
+
+    job = await run_crawl(crawler, "test-budget", max_depth=1, max_pages=4)
+
+    assert job["status"] == "completed"
+    assert job["processed_links"] == 4
+    assert job["budget_exhausted"] is True
+    assert len(list((tmp_path / "md").iterdir())) == 4
+
+
+@pytest.mark.asyncio
+async def test_crawler_seeds_from_sitemap_and_skips_unchanged(tmp_path, make_crawler):
+    sitemap = {"lastmod": "2024-05-01"}
+
+    async def fetch_bytes(url):
+        if url.endswith("sitemap.xml"):
+            return (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                "<url><loc>https://test.com/orphan</loc>"
+                f"<lastmod>{sitemap['lastmod']}</lastmod></url></urlset>"
+            ).encode()
+        return None
+
+    fetcher = StaticFetcher(
+        {
+            "https://test.com": "<html><title>Home</title><p>No links here at all</p></html>",
+            "https://test.com/orphan": "<html><title>Orphan</title><p>Only in the sitemap</p></html>",
+        }
+    )
+    fetched = fetcher.fetched
+    manifest = CrawlManifest(str(tmp_path / "manifest.sqlite"))
+
+    async def crawl(task_id):
+        crawler = make_crawler(
+            fetcher=fetcher, manifest=manifest, seeder=SitemapSeeder(fetch_bytes)
+        )
+        return await run_crawl(crawler, task_id, max_depth=1)
+
+    await crawl("first")
+    assert fetched == ["https://test.com", "https://test.com/orphan"]
+    assert (tmp_path / "md" / "orphan.md").exists()
+
+    fetched.clear()
+    job = await crawl("second")
+    assert fetched == ["https://test.com"]
+    assert job["unchanged_pages"] == 2
+
+    sitemap["lastmod"] = "2024-06-01"
+    fetched.clear()
+    await crawl("third")
+    assert fetched == ["https://test.com", "https://test.com/orphan"]
+    await manifest.close()
+
+
+@pytest.mark.asyncio
+async def test_crawler_does_not_seed_sitemap_beyond_max_depth(make_crawler):
+    async def fetch_bytes(url):
+        if url.endswith("sitemap.xml"):
+            return (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                + "".join(
+                    f"<url><loc>https://test.com/s{i}</loc></url>" for i in range(5)
+                )
+                + "</urlset>"
+            ).encode()
+        return None
+
+    pages = {
+        "https://test.com": "<html><title>Home</title><p>No links here at all</p></html>"
+    }
+    pages.update(
+        {
+            f"https://test.com/s{i}": f"<html><title>S{i}</title><p>Sitemap page {i}</p></html>"
+            for i in range(5)
+        }
+    )
+    fetcher = StaticFetcher(pages)
+    crawler = make_crawler(fetcher=fetcher, seeder=SitemapSeeder(fetch_bytes))
+    job = await run_crawl(crawler, "depth-0", max_depth=0)
+
+    assert fetcher.fetched == ["https://test.com"]
+    assert job["changed_pages"] == 1
+
+
+@pytest.mark.asyncio
+async def test_crawler_skips_duplicate_pages(tmp_path, make_crawler):
+    article = "<p>" + "Same article body published under two URLs. " * 10 + "</p>"
+    fetcher = StaticFetcher(
+        {
+            "https://test.com": "<html><title>Home</title>"
+            "<a href='/post'>post</a><a href='/amp/post'>amp</a></html>",
+            "https://test.com/post": f"<html><title>Post</title>{article}</html>",
+            "https://test.com/amp/post": f"<html><title>Post</title>{article}"
+            "<a href='/amp/more'>more</a></html>",
+        }
+    )
+    crawler = make_crawler(fetcher=fetcher, duplicate_distance=3)
+    crawler.skip_duplicate_links = True
+
+    job = await run_crawl(crawler, "test-duplicates", max_depth=2)
+
+    assert job["duplicate_pages"] == 1
+    assert job["duplicates"] == {"https://test.com/amp/post": "https://test.com/post"}
+    assert job["total_links_found"] == 3
+    assert (tmp_path / "md" / "post.md").exists()
+    assert not (tmp_path / "md" / "amp_post.md").exists()
+
+
+@pytest.mark.asyncio
+async def test_crawler_recycles_pooled_browser_mid_crawl(mock_job_store, make_crawler):
+    pool = BrowserPool(size=1, headless=True, max_pages=1)
+    crawler = make_crawler(browser_pool=pool)
 
-        assert (tmp_path / "html" / "index.html").exists()
-        assert (tmp_path / "md" / "index.md").exists()
+    task_id = "test-pool-recycle"
+    await queue_task(mock_job_store, task_id)
+    with patch("app.services.browser_pool.uc") as mock_uc:
+        mock_uc.start = AsyncMock(side_effect=lambda **kwargs: MockBrowser())
+        await crawler.start("https://test.com", task_id, max_depth=1)
 
-        md_content = (tmp_path / "md" / "index.md").read_text(encoding="utf-8")
-        assert "Source: https://test.com" in md_content
+    assert (await mock_job_store.get_job(task_id))["status"] == "completed"
+    # Two rendered pages with a limit of one: the second got a fresh browser
+    assert mock_uc.start.call_count == 2
+    await pool.close()
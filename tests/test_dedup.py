@@ -0,0 +1,50 @@
+from app.services.dedup import DuplicateIndex, hamming_distance, simhash
+
+ARTICLE = (
+    "The crawler downloads every page of the documentation site, converts the "
+    "HTML into Markdown and stores both versions on disk so that the search "
+    "index can be rebuilt later without fetching anything again. Workers share "
+    "a single browser and the HTTP tier handles static pages. "
+) * 3
+OTHER = (
+    "Scheduling runs once a day at noon and triggers a crawl of the configured "
+    "target. Progress is written to the task file and can be streamed to a "
+    "dashboard, while logs are rotated at ten megabytes with five backups kept "
+    "next to the application. "
+) * 3
+
+
+def test_simhash_distance():
+    near = ARTICLE.replace("later", "tomorrow", 1) + " Updated yesterday."
+
+    assert hamming_distance(simhash(ARTICLE), simhash(near)) <= 3
+    assert hamming_distance(simhash(ARTICLE), simhash(OTHER)) > 10
+    assert simhash("too short to compare") is None
+
+
+def test_duplicate_index():
+    index = DuplicateIndex(max_distance=3)
+
+    assert index.check("https://t.com/a", ARTICLE, simhash(ARTICLE)) is None
+    assert index.check("https://t.com/b", OTHER, simhash(OTHER)) is None
+    assert index.check("https://t.com/a?ref=1", ARTICLE) == "https://t.com/a"
+
+    near = ARTICLE + " Share this page."
+    assert index.check("https://t.com/copy", near, simhash(near)) == "https://t.com/a"
+
+
+def test_duplicate_index_maps_copies_of_duplicates_to_the_original():
+    index = DuplicateIndex(max_distance=3)
+    near = ARTICLE + " Share this page."
+
+    assert index.check("https://t.com/a", ARTICLE, simhash(ARTICLE)) is None
+    assert index.check("https://t.com/b", near, simhash(near)) == "https://t.com/a"
+    assert index.check("https://t.com/c", near, simhash(near)) == "https://t.com/a"
+
+
+def test_duplicate_index_exact_only():
+    index = DuplicateIndex(max_distance=0)
+    near = ARTICLE + " Share this page."
+
+    assert index.check("https://t.com/a", ARTICLE, simhash(ARTICLE)) is None
+    assert index.check("https://t.com/copy", near, simhash(near)) is None
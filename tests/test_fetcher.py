@@ -0,0 +1,162 @@
+import httpx
+import pytest
+from app.services.fetcher import (
+    TIER_BROWSER,
+    TIER_HTTP,
+    HttpFetcher,
+    ThrottledError,
+)
+
+BLOCK_INDICATORS = ["Just a moment", "Access denied"]
+ARTICLE = "<html><body><p>" + "Static documentation text. " * 20 + "</p></body></html>"
+SPA_SHELL = (
+    "<html><body><div id='root'></div>"
+    + "<script>"
+    + "renderApp();" * 200
+    + "</script></body></html>"
+)
+CHALLENGE = "<html><body>Just a moment..." + " " * 2000 + "</body></html>"
+
+
+def make_fetcher(routes, **kwargs):
+    calls = []
+
+    def handler(request):
+        calls.append(str(request.url))
+        status, body = routes[request.url.path]
+        if status is None:
+            raise httpx.ConnectError("connection reset", request=request)
+        return httpx.Response(
+            status, text=body, headers={"content-type": "text/html; charset=utf-8"}
+        )
+
+    fetcher = HttpFetcher(
+        min_content_length=100,
+        min_text_length=100,
+        transport=httpx.MockTransport(handler),
+        **kwargs,
+    )
+    return fetcher, calls
+
+
+@pytest.mark.asyncio
+async def test_fetcher_returns_static_page():
+    fetcher, _ = make_fetcher({"/docs/intro": (200, ARTICLE)})
+
+    page = await fetcher.fetch("https://test.com/docs/intro", BLOCK_INDICATORS)
+
+    assert page.html == ARTICLE
+    assert fetcher.tier_for("https://test.com/docs/other") == TIER_HTTP
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status, body",
+    [(200, SPA_SHELL), (200, CHALLENGE), (500, ARTICLE), (200, "<p>tiny</p>")],
+    ids=["js-rendered", "blocked", "unavailable", "too-small"],
+)
+async def test_fetcher_escalates_to_browser(status, body):
+    fetcher, calls = make_fetcher(
+        {"/app/page": (status, body), "/app/next": (status, body)}, pin_misses=2
+    )
+
+    assert await fetcher.fetch("https://test.com/app/page", BLOCK_INDICATORS) is None
+    fetcher.browser_worked("https://test.com/app/page")
+    # One miss is not enough to pin the prefix
+    assert fetcher.tier_for("https://test.com/app/next") is None
+
+    assert await fetcher.fetch("https://test.com/app/next", BLOCK_INDICATORS) is None
+    assert fetcher.tier_for("https://test.com/app/next") is None
+    fetcher.browser_worked("https://test.com/app/next")
+    assert fetcher.tier_for("https://test.com/app/other") == TIER_BROWSER
+
+    # Same path prefix goes straight to the browser without another request
+    assert await fetcher.fetch("https://test.com/app/next", BLOCK_INDICATORS) is None
+    assert len(calls) == 2
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_fetcher_pin_expires():
+    fetcher, calls = make_fetcher(
+        {"/app/page": (200, SPA_SHELL)}, pin_misses=1, pin_ttl=0
+    )
+
+    await fetcher.fetch("https://test.com/app/page", BLOCK_INDICATORS)
+    fetcher.browser_worked("https://test.com/app/page")
+    # Expired at once: the prefix is probed over HTTP again
+    assert fetcher.tier_for("https://test.com/app/page") is None
+    await fetcher.fetch("https://test.com/app/page", BLOCK_INDICATORS)
+    assert len(calls) == 2
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_fetcher_transport_error_does_not_count():
+    fetcher, calls = make_fetcher({"/docs/page": (None, "")}, pin_misses=1)
+
+    for _ in range(2):
+        assert await fetcher.fetch("https://test.com/docs/page", []) is None
+        fetcher.browser_worked("https://test.com/docs/page")
+
+    assert fetcher.tier_for("https://test.com/docs/page") is None
+    assert len(calls) == 2
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_fetcher_not_found_is_final():
+    fetcher, _ = make_fetcher({"/docs/missing": (404, ARTICLE)})
+
+    page = await fetcher.fetch("https://test.com/docs/missing", [])
+    assert page.gone
+    assert page.html is None
+    assert fetcher.tier_for("https://test.com/docs/missing") is None
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_fetcher_conditional_request_not_modified():
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(request.headers)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200, text=ARTICLE, headers={"content-type": "text/html", "etag": '"v1"'}
+        )
+
+    fetcher = HttpFetcher(
+        min_content_length=100,
+        min_text_length=100,
+        transport=httpx.MockTransport(handler),
+    )
+
+    page = await fetcher.fetch("https://test.com/docs/intro", BLOCK_INDICATORS)
+    assert page.etag == '"v1"'
+    assert not page.not_modified
+
+    page = await fetcher.fetch(
+        "https://test.com/docs/intro", BLOCK_INDICATORS, {"etag": '"v1"'}
+    )
+    assert page.not_modified
+    assert page.html is None
+    assert seen_headers[1]["if-none-match"] == '"v1"'
+    await fetcher.close()
+
+
+@pytest.mark.asyncio
+async def test_fetcher_raises_on_throttling():
+    def handler(request):
+        return httpx.Response(429, headers={"retry-after": "7"})
+
+    fetcher = HttpFetcher(transport=httpx.MockTransport(handler))
+
+    with pytest.raises(ThrottledError) as error:
+        await fetcher.fetch("https://test.com/docs/intro", BLOCK_INDICATORS)
+
+    assert error.value.retry_after == 7
+    assert fetcher.tier_for("https://test.com/docs/intro") is None
+    await fetcher.close()
@@ -0,0 +1,42 @@
+import pytest
+from app.services.frontier import FrontierCheckpoint
+
+
+@pytest.mark.asyncio
+async def test_frontier_checkpoint_roundtrip(tmp_path):
+    path = str(tmp_path / "frontier")
+    checkpoint = FrontierCheckpoint("task-1", path)
+    checkpoint.set_meta({"start_url": "https://test.com", "max_depth": 2})
+
+    checkpoint.add("https://test.com", 0)
+    checkpoint.add("https://test.com/a", 1)
+    checkpoint.add("https://test.com/b", 1)
+    checkpoint.mark_done("https://test.com", 0)
+    checkpoint.mark_in_flight("https://test.com/a", 1)
+    await checkpoint.close()
+
+    assert FrontierCheckpoint.exists("task-1", path)
+    assert not FrontierCheckpoint.exists("task-2", path)
+
+    restored = FrontierCheckpoint("task-1", path)
+    known, todo, done = restored.load()
+
+    assert known == {"https://test.com", "https://test.com/a", "https://test.com/b"}
+    assert sorted(todo) == [("https://test.com/a", 1), ("https://test.com/b", 1)]
+    assert done == 1
+    assert restored.get_meta("max_depth") == "2"
+    await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_frontier_checkpoint_is_batched(tmp_path):
+    checkpoint = FrontierCheckpoint("task-1", str(tmp_path))
+    checkpoint.interval = 3600
+
+    checkpoint.add("https://test.com", 0)
+    await checkpoint.maybe_checkpoint()
+    assert checkpoint.load()[0] == set()
+
+    await checkpoint.checkpoint()
+    assert checkpoint.load()[0] == {"https://test.com"}
+    await checkpoint.close()
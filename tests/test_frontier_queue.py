@@ -0,0 +1,55 @@
+import pytest
+from app.services.frontier_queue import (
+    CrawlStrategy,
+    FifoStrategy,
+    FrontierQueue,
+    PriorityStrategy,
+    get_strategy,
+)
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait()[0])
+    return items
+
+
+def test_fifo_keeps_discovery_order():
+    queue = FrontierQueue(FifoStrategy())
+    for url, depth in [("/deep", 2), ("/a", 1), ("/b", 1)]:
+        queue.put_nowait((url, depth))
+
+    assert drain(queue) == ["/deep", "/a", "/b"]
+
+
+def test_priority_orders_by_depth_weights_and_hints():
+    strategy = PriorityStrategy(pattern_weights={r"/docs/": 1.5, r"/tag/": -2})
+    strategy.add_hint("https://t.com/news/1", 1.0)
+    queue = FrontierQueue(strategy)
+
+    for url, depth in [
+        ("https://t.com/tag/x", 1),
+        ("https://t.com/a", 2),
+        ("https://t.com/docs/deep", 3),
+        ("https://t.com/b", 1),
+        ("https://t.com/news/1", 2),
+    ]:
+        queue.put_nowait((url, depth))
+
+    assert drain(queue) == [
+        "https://t.com/b",
+        "https://t.com/news/1",
+        "https://t.com/docs/deep",
+        "https://t.com/a",
+        "https://t.com/tag/x",
+    ]
+
+
+def test_unknown_strategy():
+    assert isinstance(get_strategy("fifo"), FifoStrategy)
+    with pytest.raises(ValueError):
+        get_strategy("random")
+    # A strategy without score() fails when built, not on the first URL
+    with pytest.raises(TypeError):
+        CrawlStrategy()
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from app.services.job_manager import JobManager, QueueFullError
+
+
+def job(log, name, gate=None):
+    async def run():
+        log.append(f"start {name}")
+        try:
+            if gate is not None:
+                await gate.wait()
+        finally:
+            log.append(f"end {name}")
+
+    return run
+
+
+@pytest.mark.asyncio
+async def test_job_manager_limits_and_orders_by_priority():
+    manager = JobManager(max_running=1, max_queued=2)
+    gate = asyncio.Event()
+    log = []
+
+    manager.submit("first", job(log, "first", gate))
+    manager.submit("low", job(log, "low"), priority=0)
+    manager.submit("high", job(log, "high"), priority=5)
+    with pytest.raises(QueueFullError):
+        manager.submit("extra", job(log, "extra"))
+
+    await asyncio.sleep(0)
+    assert log == ["start first"]
+    assert (manager.running, manager.queued) == (1, 2)
+
+    gate.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert log == [
+        "start first",
+        "end first",
+        "start high",
+        "end high",
+        "start low",
+        "end low",
+    ]
+    assert (manager.running, manager.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_job_manager_cancels_queued_and_running_jobs():
+    manager = JobManager(max_running=1, max_queued=5)
+    gate = asyncio.Event()
+    log = []
+
+    manager.submit("running", job(log, "running", gate))
+    manager.submit("queued", job(log, "queued"))
+    await asyncio.sleep(0)
+
+    assert await manager.cancel("queued")
+    assert await manager.cancel("running")
+    # The running job's cleanup ran before cancel() returned
+    assert log == ["start running", "end running"]
+    assert not await manager.cancel("running")
+
+    manager.submit("queued", job(log, "queued"))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    assert log[-2:] == ["start queued", "end queued"]
+    await manager.close()
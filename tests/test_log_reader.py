@@ -0,0 +1,59 @@
+from app.services.log_reader import read_since, tail
+
+
+def write_log(path, count):
+    lines = [
+        f"2024-01-01 10:00:{i % 60:02d} - app.services.crawler - "
+        f"{'WARNING' if i % 10 == 0 else 'INFO'} - task-{i % 3} line {i}"
+        for i in range(count)
+    ]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return lines
+
+
+def test_tail_matches_readlines(tmp_path):
+    log_file = tmp_path / "scraper.log"
+    lines = write_log(log_file, 500)
+
+    result, cursor, end = tail(str(log_file), 50, block_size=64)
+
+    assert result == lines[-50:]
+    assert end == log_file.stat().st_size
+    assert log_file.read_bytes()[cursor:].decode().splitlines() == lines[-50:]
+
+
+def test_tail_pages_backwards_with_filters(tmp_path):
+    log_file = tmp_path / "scraper.log"
+    lines = write_log(log_file, 500)
+    expected = [line for line in lines if "WARNING" in line and "task-1 " in line]
+
+    newest, page_start, _ = tail(
+        str(log_file), 5, task_id="task-1 ", level="warning", block_size=100
+    )
+    older, cursor, end = tail(
+        str(log_file), 100, before=page_start, task_id="task-1 ", level="warning"
+    )
+
+    assert newest == expected[-5:]
+    assert older == expected[:-5]
+    assert cursor == 0
+    assert end == page_start
+
+
+def test_read_since_follows_appends_and_rotation(tmp_path):
+    log_file = tmp_path / "scraper.log"
+    log_file.write_text("first\nsecond\npart", encoding="utf-8")
+
+    lines, offset = read_since(str(log_file), 0)
+    assert lines == ["first", "second"]
+
+    with open(log_file, "a", encoding="utf-8") as f:
+        f.write("ial\nthird\n")
+    lines, offset = read_since(str(log_file), offset, limit=1)
+    assert lines == ["partial"]
+    lines, offset = read_since(str(log_file), offset)
+    assert lines == ["third"]
+
+    log_file.write_text("rotated\n", encoding="utf-8")
+    lines, _ = read_since(str(log_file), offset)
+    assert lines == ["rotated"]
@@ -0,0 +1,76 @@
+import json
+import logging
+import sys
+
+import queue
+
+from app.core.logging import (
+    JsonFormatter,
+    SamplingFilter,
+    TracebackQueueHandler,
+    text_formatter,
+)
+from app.services.log_reader import line_matches
+
+
+def make_record(name="app.services.crawler", level=logging.INFO, **extra):
+    record = logging.LogRecord(name, level, __file__, 1, "Parsed %s", ("x",), None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_keeps_extras():
+    record = make_record(task_id="task-1", url="https://test.com", parse_time=0.12)
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Parsed x"
+    assert entry["level"] == "INFO"
+    assert entry["task_id"] == "task-1"
+    assert entry["parse_time"] == 0.12
+    assert "depth" not in entry
+    assert line_matches(JsonFormatter().format(record), task_id="task-1", level="info")
+
+
+def test_text_formatter_renders_task_id():
+    with_task = text_formatter().format(make_record(task_id="task-1"))
+    without_task = text_formatter().format(make_record())
+
+    assert " - INFO - task-1 - Parsed x" in with_task
+    assert " - INFO - - - Parsed x" in without_task
+    assert line_matches(with_task, task_id="task-1", level="info")
+    assert not line_matches(without_task, task_id="task-1")
+
+
+def test_queued_record_keeps_traceback():
+    log_queue = queue.SimpleQueue()
+    handler = TracebackQueueHandler(log_queue)
+    try:
+        raise ValueError("broken page")
+    except ValueError:
+        record = logging.LogRecord(
+            "app", logging.ERROR, __file__, 1, "Failed %s", ("x",), sys.exc_info()
+        )
+    handler.emit(record)
+    queued = log_queue.get_nowait()
+
+    entry = json.loads(JsonFormatter().format(queued))
+    assert entry["message"] == "Failed x"
+    assert "ValueError: broken page" in entry["exception"]
+    text = text_formatter().format(queued)
+    assert text.splitlines()[0].endswith("Failed x")
+    assert "ValueError: broken page" in text
+
+
+def test_sampling_filter():
+    sampling = SamplingFilter({"app.services": 1.0, "app.services.crawler": 0.1})
+
+    kept = sum(sampling.filter(make_record()) for _ in range(100))
+    warnings = sum(
+        sampling.filter(make_record(level=logging.WARNING)) for _ in range(100)
+    )
+    other = sum(sampling.filter(make_record("app.services.parser")) for _ in range(10))
+
+    assert kept == 10
+    assert warnings == 100
+    assert other == 10
@@ -0,0 +1,83 @@
+import pytest
+from app.services.manifest import CrawlManifest, content_hash
+
+
+@pytest.mark.asyncio
+async def test_manifest_record_flush_and_prune(tmp_path):
+    path = str(tmp_path / "manifest.sqlite")
+    manifest = CrawlManifest(path)
+
+    manifest.record(
+        "https://test.com",
+        scope="https://test.com",
+        task_id="task-1",
+        html_hash=content_hash("<html>home</html>"),
+        content_hash=content_hash("# Home"),
+        links=["/a"],
+        etag='"abc"',
+    )
+    manifest.record(
+        "https://test.com/old",
+        scope="https://test.com",
+        task_id="task-1",
+        html_hash=None,
+        content_hash=None,
+        links=[],
+    )
+    assert manifest.get("https://test.com")["etag"] == '"abc"'
+    await manifest.close()
+
+    restored = CrawlManifest(path)
+    entry = restored.get("https://test.com")
+    assert entry["links"] == ["/a"]
+    assert entry["html_hash"] == content_hash("<html>home</html>")
+
+    restored.record(
+        "https://test.com",
+        scope="https://test.com",
+        task_id="task-2",
+        html_hash=entry["html_hash"],
+        content_hash=entry["content_hash"],
+        links=entry["links"],
+    )
+    assert restored.crawl_depth("https://test.com") is None
+    assert await restored.prune("https://test.com", "task-2", max_depth=2) == 1
+    assert restored.crawl_depth("https://test.com") == 2
+    assert restored.get("https://test.com/old") is None
+    assert restored.get("https://test.com") is not None
+    await restored.close()
+
+
+@pytest.mark.asyncio
+async def test_manifest_prunes_only_the_crawled_scope(tmp_path):
+    manifest = CrawlManifest(str(tmp_path / "manifest.sqlite"))
+    docs, blog = "https://test.com/docs", "https://test.com/blog"
+    for url, scope, task_id in (
+        ("https://test.com/docs/a", docs, "docs-1"),
+        ("https://test.com/docs/old", docs, "docs-1"),
+        ("https://test.com/blog/post", blog, "blog-1"),
+    ):
+        manifest.record(
+            url,
+            scope=scope,
+            task_id=task_id,
+            html_hash=None,
+            content_hash=None,
+            links=[],
+        )
+    manifest.record(
+        "https://test.com/docs/a",
+        scope=docs,
+        task_id="docs-2",
+        html_hash=None,
+        content_hash=None,
+        links=[],
+    )
+
+    # A complete crawl of /docs leaves the nightly /blog crawl's pages alone
+    assert await manifest.prune(docs, "docs-2", max_depth=3) == 1
+    assert manifest.get("https://test.com/docs/old") is None
+    assert manifest.get("https://test.com/blog/post") is not None
+    assert manifest.crawl_depth(docs) == 3
+    assert manifest.crawl_depth(blog) is None
+    await manifest.close()
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.metrics import TaskMetrics
+from app.services.crawler import CrawlerService
+from app.services.parser import HtmlToMarkdownParser
+from app.services.storage import FileSystemStorage
+from tests.test_crawler import MockBrowser
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels)
+
+
+def test_task_metrics_gauges_follow_the_crawler():
+    stats = {
+        "frontier_queue": 3,
+        "fetching": 2,
+        "parse_queue": 1,
+        "parsing": 1,
+        "write_queue": 0,
+    }
+    crawler = SimpleNamespace(pipeline_stats=lambda: stats, open_tabs=2)
+    task_metrics = TaskMetrics("gauges")
+    task_metrics.track(crawler)
+
+    assert sample("scraper_queue_depth", task="gauges", queue="frontier_queue") == 3
+    assert sample("scraper_active_workers", task="gauges", stage="fetching") == 2
+    assert sample("scraper_open_tabs", task="gauges") == 2
+    stats["frontier_queue"] = 0
+    assert sample("scraper_queue_depth", task="gauges", queue="frontier_queue") == 0
+
+    task_metrics.release()
+    # Gauges go away with the task, its counters stay
+    assert sample("scraper_open_tabs", task="gauges") is None
+    assert sample("scraper_retries_total", task="gauges") == 0
+
+
+def test_task_metrics_keep_last_finished_tasks(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_RETAIN_TASKS", 2)
+    monkeypatch.setattr(metrics, "_finished", metrics.deque())
+
+    for task_id in ("old", "mid", "new"):
+        task_metrics = TaskMetrics(task_id)
+        task_metrics.retries.inc()
+        task_metrics.release()
+
+    assert sample("scraper_retries_total", task="old") is None
+    assert sample("scraper_retries_total", task="mid") == 1
+    assert sample("scraper_retries_total", task="new") == 1
+
+
+@pytest.mark.asyncio
+async def test_crawler_records_metrics(tmp_path, mock_job_store):
+    crawler = CrawlerService(
+        storage=FileSystemStorage(str(tmp_path / "html")),
+        job_store=mock_job_store,
+        parser=HtmlToMarkdownParser(),
+        md_storage=FileSystemStorage(str(tmp_path / "md")),
+    )
+    crawler.MAX_WORKERS = 1
+    crawler.MAX_RETRIES = 0
+
+    task_id = "test-metrics"
+    await mock_job_store.create_job(
+        task_id, {"task_id": task_id, "url": "https://test.com", "status": "queued"}
+    )
+    with patch("app.services.crawler.uc") as mock_uc:
+        mock_uc.start = AsyncMock(return_value=MockBrowser())
+        await crawler.start("https://test.com", task_id, max_depth=1)
+
+    assert (await mock_job_store.get_job(task_id))["status"] == "completed"
+    assert sample("scraper_fetch_seconds_count", task=task_id, tier="browser") == 2
+    assert sample("scraper_page_load_wait_seconds_count", task=task_id) == 2
+    for phase in ("soup", "markdown"):
+        assert sample("scraper_parse_seconds_count", task=task_id, phase=phase) == 2
+    assert sample("scraper_storage_write_seconds_count", task=task_id) >= 1
+    assert sample("scraper_job_store_update_seconds_count") >= 2
+    assert sample("scraper_open_tabs", task=task_id) is None
+
+
+def test_metrics_endpoint(client):
+    TaskMetrics("endpoint").retries.inc()
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'scraper_retries_total{task="endpoint"} 1.0' in response.text
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from app.core.config import settings
+from app.services.page_ready import READY, TIMEOUT, looks_blocked, wait_until_ready
+
+
+class ScriptedTab:
+    def __init__(self, results):
+        self.results = list(results)
+        self.scripts = []
+
+    async def evaluate(self, expression, await_promise=False, return_by_value=False):
+        self.scripts.append(expression)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def sleep(self, seconds):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_wait_until_ready_survives_navigation(monkeypatch):
+    monkeypatch.setattr(settings, "READY_SELECTORS", {"test.com": "main article"})
+    tab = ScriptedTab([Exception("Execution context was destroyed"), READY])
+
+    state = await wait_until_ready(tab, "https://test.com/page")
+
+    assert state == READY
+    assert len(tab.scripts) == 2
+    assert '"main article"' in tab.scripts[-1]
+    # Attribute changes (carousels, tickers) do not count as activity
+    assert "attributes" not in tab.scripts[-1]
+
+
+@pytest.mark.asyncio
+async def test_wait_until_ready_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_LOAD_TIMEOUT", 0.05)
+    tab = ScriptedTab([None] * 10_000)
+
+    assert await wait_until_ready(tab, "https://test.com") == TIMEOUT
+
+
+class ChallengeTab:
+    """Settles after PAGE_QUIET_MAX_WAIT, shows a challenge until clears_at"""
+
+    def __init__(self, clears_after):
+        self.clears_at = time.monotonic() + clears_after
+        self.checks = 0
+
+    async def evaluate(self, expression, await_promise=False, return_by_value=False):
+        if "indicators" in expression:
+            self.checks += 1
+            return time.monotonic() < self.clears_at
+        await asyncio.sleep(settings.PAGE_QUIET_MAX_WAIT)
+        return READY
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_wait_until_ready_waits_out_slow_challenge(monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_QUIET_MAX_WAIT", 0.02)
+    monkeypatch.setattr(settings, "PAGE_LOAD_TIMEOUT", 2)
+    # The challenge outlasts several quiet-wait caps
+    tab = ChallengeTab(clears_after=0.3)
+
+    state = await wait_until_ready(tab, "https://test.com", ["Just a moment"])
+
+    assert state == READY
+    assert time.monotonic() >= tab.clears_at
+    assert tab.checks > 1
+
+
+@pytest.mark.asyncio
+async def test_wait_until_ready_times_out_on_stuck_challenge(monkeypatch):
+    monkeypatch.setattr(settings, "PAGE_QUIET_MAX_WAIT", 0.01)
+    monkeypatch.setattr(settings, "PAGE_LOAD_TIMEOUT", 0.1)
+    tab = ChallengeTab(clears_after=60)
+
+    assert await wait_until_ready(tab, "https://test.com", ["Just a moment"]) == (
+        TIMEOUT
+    )
+
+
+def test_looks_blocked_only_for_challenge_pages():
+    indicators = ["Just a moment", "403 Forbidden"]
+    challenge = (
+        "<html><body><h1>Just a moment...</h1><script>solve()</script></body></html>"
+    )
+    article = (
+        "<html><body><h1>HTTP status codes</h1><p>"
+        + "A server answers 403 Forbidden when access is refused. " * 40
+        + "</p></body></html>"
+    )
+
+    assert looks_blocked(challenge, indicators)
+    assert not looks_blocked(article, indicators)
+    assert not looks_blocked("<html><body>Short page</body></html>", indicators)
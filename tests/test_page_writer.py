@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from app.services.base import BaseStorageBackend
+from app.services.page_writer import PageWriter
+from app.services.storage import FileSystemStorage
+
+
+class SlowStorage(BaseStorageBackend):
+    def __init__(self):
+        self.batches = []
+        self.release = asyncio.Event()
+
+    async def save(self, filename, content):
+        pass
+
+    async def save_many(self, items, fsync=False):
+        await self.release.wait()
+        self.batches.append(list(items))
+
+    async def retrieve(self, key):
+        return None
+
+    @staticmethod
+    def generate_filename(url, extension=".html"):
+        return url + extension
+
+
+@pytest.mark.asyncio
+async def test_page_writer_batches_and_applies_backpressure():
+    storage = SlowStorage()
+    writer = PageWriter(max_queue=2, batch_size=10)
+    writer.start()
+
+    # The writer holds the first file, the queue takes two more
+    await asyncio.sleep(0)
+    await writer.put(storage, "0.html", "x")
+    await asyncio.sleep(0)
+    for i in (1, 2):
+        await writer.put(storage, f"{i}.html", "x")
+    blocked = asyncio.create_task(writer.put(storage, "3.html", "x"))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert writer.stalls == 1
+
+    storage.release.set()
+    await blocked
+    await writer.close()
+
+    sizes = [len(batch) for batch in storage.batches]
+    assert sizes[0] == 1
+    assert sum(sizes) == 4
+    # Files queued while the disk was busy went out together
+    assert len(sizes) < 4
+    assert writer.written == 4
+
+
+@pytest.mark.asyncio
+async def test_page_writer_drains_on_close(tmp_path):
+    storage = FileSystemStorage(str(tmp_path))
+    writer = PageWriter(max_queue=8, batch_size=4, fsync=True)
+    writer.start()
+    for i in range(10):
+        await writer.put(storage, f"{i}.md", f"page {i}")
+    await writer.close()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        f"{i}.md" for i in range(10)
+    )
+    assert (tmp_path / "7.md").read_text(encoding="utf-8") == "page 7"
+    assert writer.failed == 0
+
+
+class FailingStorage(SlowStorage):
+    async def save_many(self, items, fsync=False):
+        raise OSError("disk full")
+
+
+@pytest.mark.asyncio
+async def test_page_writer_calls_back_only_after_successful_writes(tmp_path):
+    written = []
+    writer = PageWriter(max_queue=8, batch_size=4)
+    writer.start()
+    await writer.put(
+        FileSystemStorage(str(tmp_path)), "ok.md", "x", lambda: written.append("ok")
+    )
+    await writer.put(FailingStorage(), "lost.md", "x", lambda: written.append("lost"))
+    await writer.close()
+
+    assert written == ["ok"]
+    assert writer.written == 1
+    assert writer.failed == 1
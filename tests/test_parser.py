@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import pytest
+from app.services.parse_executor import ParseExecutor
+from app.services.parser import HtmlToMarkdownParser
+
+SAMPLE_HTML = """
+<html>
+<head><title>Sample</title><meta name="description" content="Desc"></head>
+<body><nav>Menu</nav><h1>Header</h1><p>Paragraph text</p>
+<div><p>One</p><p>Two</p><p>Three</p><p>Four</p><p>Five</p></div></body>
+</html>
+"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+async def test_parse_executor_modes(mode):
+    executor = ParseExecutor(mode=mode, max_workers=1)
+    parser = HtmlToMarkdownParser()
+
+    try:
+        result = await executor.parse(parser, SAMPLE_HTML)
+    finally:
+        executor.shutdown()
+
+    assert result["title"] == "Sample"
+    assert result["metadata"]["description"] == "Desc"
+    assert "# Header" in result["content"]
+    assert "Menu" not in result["content"]
+    assert result["parse_time"] >= 0
+    assert set(result["parse_timings"]) == {"soup", "markdown"}
+    assert result == {
+        **(await parser.parse(SAMPLE_HTML)),
+        "parse_time": result["parse_time"],
+        "parse_timings": result["parse_timings"],
+    }
+
+
+def test_parse_executor_unknown_mode():
+    with pytest.raises(ValueError):
+        ParseExecutor(mode="gpu")
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+FIXTURES = sorted(FIXTURES_DIR.glob("*.html"))
+
+
+class LegacyParser(HtmlToMarkdownParser):
+    """Multi-pass cleaner the single-pass one has to stay byte-identical with"""
+
+    def _clean(self, soup):
+        for tag in soup(self.TAGS_TO_REMOVE):
+            tag.decompose()
+
+        for tag in soup.find_all(["div", "span"]):
+            if not tag.get_text(strip=True) and not tag.find("img"):
+                tag.decompose()
+
+        for tag in soup.select(".ad, .advertisement, .cookie-banner"):
+            tag.decompose()
+
+        return soup
+
+
+def _keep_images(parser):
+    parser.TAGS_TO_REMOVE = [t for t in parser.TAGS_TO_REMOVE if t != "img"]
+    return parser
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda p: p.name)
+@pytest.mark.parametrize("configure", [lambda p: p, _keep_images])
+def test_clean_matches_legacy_output(fixture, configure):
+    html = fixture.read_text(encoding="utf-8")
+
+    expected = configure(LegacyParser()).parse_sync(html)
+    result = configure(HtmlToMarkdownParser()).parse_sync(html)
+
+    assert result == expected
+
+
+def test_clean_deeply_nested_divs():
+    # Empty chain is pruned by the cleaner, markdownify only sees the short one
+    html = (
+        "<html><head><title>Deep</title></head><body>"
+        + "<div>" * 100
+        + "<span></span><p>Leaf</p>"
+        + "</div>" * 100
+        + "<div>" * 5000
+        + "</div>" * 5000
+        + "</body></html>"
+    )
+    parser = HtmlToMarkdownParser()
+
+    result = parser.parse_sync(html)
+
+    assert result["content"] == "Deep\n\nLeaf"
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+from app.services.parser import (
+    HtmlToMarkdownParser,
+    LxmlHtmlToMarkdownParser,
+    get_parser,
+)
+
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "html").glob("*.html"))
+
+PAGES = {
+    "empty_title": "<html><head><title></title></head><body><p>Body</p></body></html>",
+    "no_head": "<body><h1>Only body</h1><p>Text &amp; entities &lt;ok&gt;</p></body>",
+    "entities": "<p>Non&nbsp;breaking &copy; 2025 &#8212; dash</p>",
+    "lists": "<ul><li>One<ul><li>Nested</li></ul></li><li>Two</li></ul><ol><li>A</li></ol>",
+    "code": "<pre><code class='language-py'>def f():\n    return 1\n</code></pre>",
+    "inline": "<p>Mix of <b>bold</b>, <i>italic</i>, <code>code</code> and <a href='/a'>links</a>.</p>",
+    "headings": "".join(f"<h{i}>Heading {i}</h{i}><p>text</p>" for i in range(1, 7)),
+}
+
+
+def _assert_parity(html):
+    expected = HtmlToMarkdownParser().parse_sync(html)
+    result = LxmlHtmlToMarkdownParser().parse_sync(html)
+
+    assert result["title"] == expected["title"]
+    assert result["metadata"] == expected["metadata"]
+    assert result["content"] == expected["content"]
+
+
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda p: p.name)
+def test_lxml_parser_parity_fixtures(fixture):
+    _assert_parity(fixture.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("html", PAGES.values(), ids=PAGES.keys())
+def test_lxml_parser_parity_pages(html):
+    _assert_parity(html)
+
+
+def test_get_parser():
+    assert isinstance(get_parser("lxml"), LxmlHtmlToMarkdownParser)
+    assert type(get_parser("html.parser")) is HtmlToMarkdownParser
+    # lxml is opt-in, the default keeps the original tree builder
+    assert type(get_parser()) is HtmlToMarkdownParser
+
+    with pytest.raises(ValueError):
+        get_parser("regex")
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+from app.services.politeness import (
+    ERROR,
+    OK,
+    THROTTLED,
+    PolitenessScheduler,
+    TokenBucket,
+)
+
+
+def test_token_bucket_reservations():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_slot_caps_concurrency_per_host():
+    scheduler = PolitenessScheduler(max_concurrency=2, rate=1000, burst=100)
+    running = 0
+    peak = 0
+
+    async def fetch(url):
+        nonlocal running, peak
+        async with scheduler.slot(url):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(
+        *(fetch(f"https://a.com/{i}") for i in range(6)),
+        *(fetch(f"https://b.com/{i}") for i in range(6)),
+    )
+
+    assert peak == 4
+
+
+def test_aimd_limit_and_backoff():
+    scheduler = PolitenessScheduler(max_concurrency=4, rate=10, burst=1)
+    url = "https://test.com/page"
+
+    scheduler.report(url, THROTTLED, retry_after=30)
+    host = scheduler.host(url)
+    assert host.limit == 2
+    assert host.backoff_until - time.monotonic() == pytest.approx(30, abs=1)
+
+    scheduler.report(url, ERROR)
+    assert host.limit == 1
+
+    for _ in range(20):
+        scheduler.report(url, OK)
+    assert host.limit == 4
+    assert host.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_robots_rules_and_crawl_delay():
+    fetched = []
+
+    async def fetch_text(url):
+        fetched.append(url)
+        return "User-agent: *\nDisallow: /private\nCrawl-delay: 2\n"
+
+    scheduler = PolitenessScheduler(
+        fetch_text=fetch_text, rate=5, burst=2, respect_robots=True
+    )
+
+    assert await scheduler.allowed("https://test.com/docs")
+    assert not await scheduler.allowed("https://test.com/private/page")
+    assert fetched == ["https://test.com/robots.txt"]
+    assert scheduler.host("https://test.com/").bucket.rate == 0.5
+
+
+@pytest.mark.asyncio
+async def test_robots_txt_is_fetched_again_after_ttl():
+    robots = {"text": "User-agent: *\nDisallow: /private\nCrawl-delay: 2\n"}
+    fetched = []
+
+    async def fetch_text(url):
+        fetched.append(url)
+        return robots["text"]
+
+    scheduler = PolitenessScheduler(
+        fetch_text=fetch_text, rate=5, burst=2, respect_robots=True, robots_ttl=60
+    )
+    assert not await scheduler.allowed("https://test.com/private/page")
+
+    robots["text"] = "User-agent: *\nDisallow: /admin\n"
+    assert not await scheduler.allowed("https://test.com/private/page")
+    assert len(fetched) == 1
+
+    scheduler.host("https://test.com/").robots_expires = time.monotonic() - 1
+    assert await scheduler.allowed("https://test.com/private/page")
+    assert not await scheduler.allowed("https://test.com/admin")
+    assert len(fetched) == 2
+    assert scheduler.host("https://test.com/").bucket.rate == 5
@@ -0,0 +1,40 @@
+import os
+
+from app.services.seen_urls import BloomFilter, SeenUrls, url_fingerprint
+
+
+def test_seen_urls_in_memory():
+    seen = SeenUrls()
+
+    assert seen.add("https://test.com/a")
+    assert not seen.add("https://test.com/a")
+    assert "https://test.com/a" in seen
+    assert "https://test.com/b" not in seen
+    assert len(seen) == 1
+
+
+def test_seen_urls_spill_to_disk(tmp_path):
+    path = str(tmp_path / "seen" / "task.sqlite")
+    seen = SeenUrls(memory_limit=100, spill_path=path, bloom_capacity=1000)
+    urls = [f"https://test.com/page/{i}" for i in range(1050)]
+
+    assert all(seen.add(url) for url in urls)
+    assert len(seen._recent) < 100
+    assert not any(seen.add(url) for url in urls)
+    assert len(seen) == 1050
+    assert "https://test.com/page/other" not in seen
+
+    seen.close()
+    assert not os.path.exists(path)
+
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(url_fingerprint(f"https://test.com/{i}"))
+
+    assert all(url_fingerprint(f"https://test.com/{i}") in bloom for i in range(100))
+    false_positives = sum(
+        url_fingerprint(f"https://other.com/{i}") in bloom for i in range(10_000)
+    )
+    assert false_positives < 300
@@ -0,0 +1,92 @@
+import pytest
+
+from app.services.shared_frontier import (
+    MemorySharedFrontier,
+    RedisSharedFrontier,
+    SqliteSharedFrontier,
+    get_shared_frontier,
+)
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def frontier(request, tmp_path):
+    if request.param == "memory":
+        return MemorySharedFrontier()
+    if request.param == "sqlite":
+        return SqliteSharedFrontier(str(tmp_path / "shared.sqlite"))
+    fakeredis = pytest.importorskip("fakeredis")
+    # The claim and add scripts need fakeredis' Lua support
+    pytest.importorskip("lupa")
+    return RedisSharedFrontier(client=fakeredis.FakeAsyncRedis(decode_responses=True))
+
+
+@pytest.mark.asyncio
+async def test_shared_frontier_dedups_and_claims_by_score(frontier):
+    assert await frontier.add("t", [("a", 1, 1.0), ("b", 0, 0.0)]) == 2
+    assert await frontier.add("t", [("a", 1, 1.0), ("c", 2, 2.0)]) == 1
+
+    assert await frontier.claim("t", "node-1", 2, lease=60) == [("b", 0), ("a", 1)]
+    assert await frontier.claim("t", "node-2", 2, lease=60) == [("c", 2)]
+    assert await frontier.claim("t", "node-2", 2, lease=60) == []
+
+    await frontier.complete("t", "b")
+    assert await frontier.progress("t") == {
+        "seen": 3,
+        "queued": 0,
+        "in_flight": 2,
+        "done": 1,
+    }
+    # Tasks do not share URLs
+    assert await frontier.add("other", [("a", 0, 0.0)]) == 1
+    await frontier.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_frontier_expired_lease_is_reclaimed(frontier):
+    await frontier.add("t", [("a", 0, 0.0)])
+    assert await frontier.claim("t", "dead-node", 1, lease=-1) == [("a", 0)]
+
+    assert await frontier.claim("t", "node-2", 1, lease=60) == [("a", 0)]
+    progress = await frontier.progress("t")
+    assert progress["in_flight"] == 1
+    assert progress["queued"] == 0
+    await frontier.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_frontier_renew_keeps_lease(frontier):
+    await frontier.add("t", [("a", 0, 0.0), ("b", 0, 1.0)])
+    assert await frontier.claim("t", "node-1", 2, lease=-1) == [("a", 0), ("b", 0)]
+
+    # Only the holder can renew, and only URLs it still holds
+    await frontier.renew("t", "node-2", ["b"], lease=60)
+    await frontier.renew("t", "node-1", ["a"], lease=60)
+    assert await frontier.claim("t", "node-2", 2, lease=60) == [("b", 0)]
+    assert (await frontier.progress("t"))["in_flight"] == 2
+    await frontier.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_frontier_budget_and_counters(frontier):
+    await frontier.add("t", [(str(i), 1, 1.0) for i in range(5)])
+    assert len(await frontier.claim("t", "node-1", 2, 60, max_pages=3)) == 2
+    assert len(await frontier.claim("t", "node-2", 2, 60, max_pages=3)) == 1
+    assert await frontier.claim("t", "node-2", 2, 60, max_pages=3) == []
+
+    await frontier.incr("t", {"processed_links": 2, "changed_pages": 1})
+    totals = await frontier.incr("t", {"processed_links": 1, "changed_pages": 0})
+    assert totals == {"processed_links": 3, "changed_pages": 1}
+    await frontier.close()
+
+
+def test_get_shared_frontier_backends():
+    assert get_shared_frontier("local") is None
+    assert get_shared_frontier("memory") is get_shared_frontier("memory")
+    with pytest.raises(ValueError):
+        get_shared_frontier("zookeeper")
+
+
+def test_redis_frontier_keys_share_a_cluster_slot():
+    keys = RedisSharedFrontier._keys("task-1")
+    assert keys["queue"] == "frontier:{task-1}:queue"
+    assert all(key.startswith("frontier:{task-1}:") for key in keys.values())
@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+from app.services.sitemap import SitemapSeeder, parse_lastmod, parse_sitemap
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"'
+
+
+def urlset(*urls):
+    body = "".join(
+        f"<url><loc>{loc}</loc><lastmod>2024-05-01</lastmod>"
+        f"<priority>0.8</priority></url>"
+        for loc in urls
+    )
+    return f'<?xml version="1.0"?><urlset {NS}>{body}</urlset>'.encode()
+
+
+def test_parse_sitemap_and_index():
+    entries, nested = parse_sitemap(urlset("https://t.com/a", "https://t.com/b"))
+    assert [entry.url for entry in entries] == ["https://t.com/a", "https://t.com/b"]
+    assert entries[0].lastmod == "2024-05-01"
+    assert entries[0].priority == 0.8
+    assert nested == []
+
+    index = (
+        f"<sitemapindex {NS}><sitemap><loc>https://t.com/s1.xml.gz</loc></sitemap>"
+        f"</sitemapindex>"
+    ).encode()
+    assert parse_sitemap(gzip.compress(index)) == ([], ["https://t.com/s1.xml.gz"])
+
+
+def test_parse_sitemap_keeps_entries_of_broken_file():
+    entries, _ = parse_sitemap(urlset("https://t.com/a")[:-20])
+    assert entries == []
+
+    data = urlset("https://t.com/a", "https://t.com/b").replace(b"</urlset>", b"")
+    entries, _ = parse_sitemap(data)
+    assert [entry.url for entry in entries] == ["https://t.com/a", "https://t.com/b"]
+
+
+def test_parse_lastmod():
+    assert parse_lastmod("2024-05-01") < parse_lastmod("2024-05-01T10:00:00Z")
+    assert parse_lastmod("yesterday") is None
+
+
+@pytest.mark.asyncio
+async def test_seeder_follows_robots_and_nested_indexes():
+    files = {
+        "https://t.com/robots.txt": b"User-agent: *\nSitemap: /index.xml\n",
+        "https://t.com/index.xml": (
+            f"<sitemapindex {NS}>"
+            f"<sitemap><loc>https://t.com/pages.xml.gz</loc></sitemap>"
+            f"<sitemap><loc>https://t.com/index.xml</loc></sitemap>"
+            f"</sitemapindex>"
+        ).encode(),
+        "https://t.com/pages.xml.gz": gzip.compress(
+            urlset(*(f"https://t.com/p{i}" for i in range(5)))
+        ),
+    }
+    requested = []
+
+    async def fetch_bytes(url):
+        requested.append(url)
+        return files.get(url)
+
+    seeder = SitemapSeeder(fetch_bytes, max_urls=3)
+    urls = [entry.url async for entry in seeder.entries("https://t.com/docs/")]
+
+    assert urls == ["https://t.com/p0", "https://t.com/p1", "https://t.com/p2"]
+    assert requested.count("https://t.com/index.xml") == 1
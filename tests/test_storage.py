@@ -17,6 +17,24 @@ async def test_file_system_storage(tmp_path):
 
     await storage.save("test.html", "<html>content</html>")
     assert os.path.exists(os.path.join(storage_path, "test.html"))
+    assert await storage.retrieve("test.html") == "<html>content</html>"
+    assert await storage.retrieve("missing.html") is None
+    assert await storage.exists("test.html")
+    assert not await storage.exists("missing.html")
+
+
+def test_file_system_storage_filenames_do_not_collide():
+    names = {
+        FileSystemStorage.generate_filename(url)
+        for url in (
+            "https://example.com/foo/bar",
+            "https://example.com/foo_bar",
+            "https://example.com/foo-bar",
+            "https://example.com/foo/bar?page=2",
+        )
+    }
+    assert len(names) == 4
+    assert "foo-bar.html" in names
 
 
 @pytest.mark.asyncio
@@ -40,3 +58,60 @@ async def test_job_store(tmp_path):
 
     missing = await store.get_job("missing_id")
     assert missing is None
+
+
+@pytest.mark.asyncio
+async def test_job_store_batches_progress_writes(tmp_path):
+    storage_path = str(tmp_path / "tasks")
+    store = JobStore(storage_path, flush_interval=3600)
+
+    await store.create_job("task-1", {"status": "queued", "url": "http://test.com"})
+    await store.update_job("task-1", {"processed_links": 5})
+
+    # Progress is served from memory before it reaches the file
+    assert (await store.get_job("task-1"))["processed_links"] == 5
+    assert "processed_links" not in (await JobStore(storage_path).get_job("task-1"))
+
+    await store.update_job("task-1", {"status": "completed"})
+    on_disk = await JobStore(storage_path).get_job("task-1")
+    assert on_disk["status"] == "completed"
+    assert on_disk["processed_links"] == 5
+    assert os.listdir(storage_path) == ["task-1.json"]
+
+
+@pytest.mark.asyncio
+async def test_job_store_drops_finished_jobs_from_memory(tmp_path):
+    storage_path = str(tmp_path / "tasks")
+    store = JobStore(storage_path, flush_interval=3600)
+
+    await store.create_job("task-1", {"status": "queued", "url": "http://test.com"})
+    await store.update_job("task-1", {"status": "completed", "processed_links": 5})
+    assert "task-1" not in store._jobs
+    assert (await store.get_job("task-1"))["processed_links"] == 5
+
+    # Tasks written by another process are read again, not cached
+    other = JobStore(storage_path)
+    await other.create_job("task-2", {"status": "queued", "url": "http://test.com"})
+    assert (await store.get_job("task-2"))["status"] == "queued"
+    await other.update_job("task-2", {"status": "running"})
+    assert (await store.get_job("task-2"))["status"] == "running"
+    assert "task-2" not in store._jobs
+
+
+@pytest.mark.asyncio
+async def test_job_store_publishes_deltas(tmp_path):
+    store = JobStore(str(tmp_path / "tasks"))
+    await store.create_job("task-1", {"status": "queued", "url": "http://test.com"})
+
+    queue = store.subscribe("task-1", maxsize=2)
+    await store.update_job("task-1", {"processed_links": 1})
+    store.publish("task-1", {"current_url": "http://test.com/a"})
+    await store.update_job("task-1", {"processed_links": 2})
+
+    # Oldest delta is dropped for a subscriber that fell behind
+    assert queue.get_nowait() == {"current_url": "http://test.com/a"}
+    assert queue.get_nowait() == {"processed_links": 2}
+
+    store.unsubscribe("task-1", queue)
+    await store.update_job("task-1", {"processed_links": 3})
+    assert queue.empty()
@@ -0,0 +1,46 @@
+import pytest
+from app.services.urls import canonicalize_url, normalize_url
+
+BASE = "https://test.com/docs/intro"
+
+
+@pytest.mark.parametrize(
+    "href, expected",
+    [
+        ("/docs/next#section", "https://test.com/docs/next"),
+        ("guide", "https://test.com/docs/guide"),
+        ("  ../about  ", "https://test.com/about"),
+        ("#top", BASE),
+        ("https://other.com/page", None),
+        ("mailto:team@test.com", None),
+        ("javascript:void(0)", None),
+        ("/static/logo.PNG", None),
+        ("/files/report.pdf?download=1", None),
+        ("", None),
+        (None, None),
+        ("http://test.com:8080/", None),
+        # Fetched as linked, only the dedup key is canonical
+        ("guide/?b=2&a", "https://test.com/docs/guide/?b=2&a"),
+        ("HTTPS://Test.COM:443/Docs/", "https://Test.COM:443/Docs/"),
+    ],
+)
+def test_normalize_url(href, expected):
+    assert normalize_url(href, BASE, host="test.com") == expected
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("HTTPS://Test.COM:443/Docs/", "https://test.com/Docs"),
+        (
+            "https://test.com/docs/?b=2&a=1&utm_source=x&fbclid=y",
+            "https://test.com/docs?a=1&b=2",
+        ),
+        ("https://test.com/search?q=%e2%82%ac", "https://test.com/search?q=%E2%82%AC"),
+        ("https://test.com/path%2fpart", "https://test.com/path%2Fpart"),
+        ("https://test.com/search?q=a%20b&x", "https://test.com/search?q=a%20b&x"),
+        ("https://test.com/", "https://test.com"),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected